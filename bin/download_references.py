@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+
+"""
+Download reference files over HTTP(S) in parallel byte ranges.
+
+Every file is fetched into <name>.part in chunks, over a pool of keep-alive connections per
+host shared by all files, and the chunks completed are recorded in <name>.part.json so an
+interrupted download resumes with the chunks missing. Failed requests are retried with
+backoff. Completed files are verified against the published checksums given, md5sum/shasum
+lists or Ensembl CHECKSUMS files (BSD sum), before they are moved in place, and the
+throughput of every file is reported.
+
+Only the Python standard library is used, so the script runs in any container with Python 3.
+"""
+
+import argparse
+import contextlib
+import functools
+import hashlib
+import http.client
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import ssl
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger()
+
+USER_AGENT = "nf-core-rnafusion-download/1.0"
+BLOCK_SIZE = 1 << 20
+MIB = 2**20
+
+# Hex digest lengths of the hashes of md5sum, sha1sum, sha256sum and sha512sum lists
+DIGEST_LENGTHS = {32: "md5", 40: "sha1", 64: "sha256", 128: "sha512"}
+
+
+class DownloadError(Exception):
+    pass
+
+
+@dataclass
+class Remote:
+    """A file served at url, after redirects, with its size and ETag or Last-Modified."""
+
+    url: str
+    size: int = None
+    ranges: bool = False
+    validator: str = None
+
+
+def probe(url, context=None, timeout=60):
+    """Resolve url and find the size of the file and whether byte ranges of it can be requested."""
+    request = urllib.request.Request(url, headers={"Range": "bytes=0-0", "User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout, context=context) as response:
+        validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        if response.status == 206:
+            match = re.match(r"bytes \d+-\d+/(\d+)", response.headers.get("Content-Range", ""))
+            size = int(match.group(1)) if match else None
+            return Remote(response.geturl(), size, size is not None, validator)
+        length = response.headers.get("Content-Length")
+        return Remote(response.geturl(), int(length) if length else None, False, validator)
+
+
+class ConnectionPool:
+    """Keep-alive connections to one host, reused by the threads downloading from it."""
+
+    def __init__(self, scheme, netloc, context=None, timeout=60):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.context = context
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        with self._lock:
+            self.opened += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.netloc, timeout=self.timeout, context=self.context)
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    @contextlib.contextmanager
+    def connection(self):
+        """An idle connection, or a new one, returned to the pool unless the request failed."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        self._idle.put(conn)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class Pools:
+    """Connection pools by host."""
+
+    def __init__(self, context=None, timeout=60):
+        self.context = context
+        self.timeout = timeout
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        with self._lock:
+            if key not in self._pools:
+                self._pools[key] = ConnectionPool(parts.scheme, parts.netloc, self.context, self.timeout)
+            return self._pools[key]
+
+    @property
+    def opened(self):
+        return sum(pool.opened for pool in self._pools.values())
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.close()
+
+
+def retrying(call, what, retries=5, delay=2):
+    """Result of call(), retried with doubling delays when it fails with a transient error."""
+    for attempt in range(retries + 1):
+        try:
+            return call()
+        except (OSError, http.client.HTTPException, DownloadError) as e:
+            permanent = isinstance(e, urllib.error.HTTPError) and 400 <= e.code < 500 and e.code not in (408, 429)
+            if permanent or attempt == retries:
+                raise
+            wait = min(delay * 2**attempt, 120)
+            logger.warning(f"{what} failed ({e}), retrying in {wait} s")
+            time.sleep(wait)
+
+
+def fetch(pools, url, fd, start=0, end=None, ranged=True):
+    """
+    Write bytes start to end (inclusive) of url to fd at their offsets, or the whole file
+    when not ranged. Returns the number of bytes written.
+    """
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    headers = {"User-Agent": USER_AGENT}
+    if ranged:
+        headers["Range"] = f"bytes={start}-{end}"
+    with pools.get(url).connection() as conn:
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        if response.status != (206 if ranged else 200):
+            response.read()
+            raise DownloadError(f"{url} answered {response.status} {response.reason}")
+        offset = start
+        for block in iter(lambda: response.read(BLOCK_SIZE), b""):
+            os.pwrite(fd, block, offset)
+            offset += len(block)
+    if ranged and offset != end + 1:
+        raise DownloadError(f"{url} sent bytes {start}-{offset - 1} of {start}-{end}")
+    return offset - start
+
+
+def bsd_sum(path):
+    """BSD checksum and 1 KiB block count of a file, as `sum -r` and Ensembl CHECKSUMS give them."""
+    if shutil.which("sum"):
+        checksum, blocks = subprocess.run(
+            ["sum", "-r", str(path)], check=True, capture_output=True, text=True
+        ).stdout.split()[:2]
+        return f"{int(checksum)} {int(blocks)}"
+    # Every step rotates the 16-bit checksum right and adds a byte, which carries into the
+    # next rotation, so the bytes are summed in order. The table rotates the unmasked sum of
+    # the previous step, leaving a single lookup and addition per byte.
+    rotate = bsd_sum_table()
+    checksum = 0
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            size += len(block)
+            for byte in block:
+                checksum = rotate[checksum] + byte
+    return f"{checksum & 0xFFFF} {(size + 1023) // 1024}"
+
+
+@functools.lru_cache(maxsize=None)
+def bsd_sum_table():
+    """16-bit right rotations of every value a step of the BSD checksum can reach."""
+    return [((value & 0xFFFF) >> 1) | ((value & 1) << 15) for value in range((1 << 16) + 256)]
+
+
+def file_checksum(path, algorithm):
+    if algorithm == "sum":
+        return bsd_sum(path)
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 22), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_checksums(text):
+    """
+    (algorithm, value) by file name of a checksum list: md5sum/shasum lines "<hex>  <name>",
+    Ensembl CHECKSUMS lines "<sum> <blocks> <name>", or a lone "<hex>" stored under "".
+    """
+    checksums = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) == 3 and fields[0].isdigit() and fields[1].isdigit():
+            checksums[fields[2]] = ("sum", f"{int(fields[0])} {int(fields[1])}")
+        elif fields and len(fields) <= 2 and len(fields[0]) in DIGEST_LENGTHS:
+            if re.fullmatch(r"[0-9a-fA-F]+", fields[0]):
+                name = fields[1].lstrip("*") if len(fields) == 2 else ""
+                checksums[Path(name).name] = (DIGEST_LENGTHS[len(fields[0])], fields[0].lower())
+    return checksums
+
+
+def read_checksums(sources, context=None, timeout=60, retries=5, delay=2):
+    """Checksums by file name of the lists at the given URLs or paths; lists not published are skipped."""
+    checksums = {}
+    for source in sources:
+        try:
+            if urllib.parse.urlsplit(source).scheme in ("http", "https", "ftp"):
+
+                def read(source=source):
+                    request = urllib.request.Request(source, headers={"User-Agent": USER_AGENT})
+                    with urllib.request.urlopen(request, timeout=timeout, context=context) as response:
+                        return response.read().decode()
+
+                text = retrying(read, f"Fetching {source}", retries, delay)
+            else:
+                text = Path(source).read_text()
+        except (OSError, http.client.HTTPException, DownloadError) as e:
+            logger.warning(f"No checksums read from {source} ({e}), not verifying against them")
+            continue
+        checksums.update(parse_checksums(text))
+    return checksums
+
+
+class Download:
+    """
+    A file downloaded into partial_dir/<name>.part in chunks of chunk_size, resumed from the
+    chunks recorded in <name>.part.json when the remote file is unchanged, and moved to
+    out_file once complete and verified.
+    """
+
+    def __init__(self, source, out_file, partial_dir, chunk_size):
+        self.source = source
+        self.out_file = Path(out_file)
+        self.part_file = Path(partial_dir) / f"{self.out_file.name}.part"
+        self.state_file = Path(partial_dir) / f"{self.out_file.name}.part.json"
+        self.chunk_size = chunk_size
+        self.remote = None
+        self.done = set()
+        self.resumed = 0
+        self.fetched = 0
+        self.started = None
+        self.finished = None
+        self._fd = None
+        self._lock = threading.Lock()
+
+    def state(self):
+        return {
+            "source": self.source,
+            "size": self.remote.size,
+            "validator": self.remote.validator,
+            "chunk_size": self.chunk_size,
+        }
+
+    def chunks(self):
+        """Byte ranges (index, start, end) of the chunks of the file."""
+        return [
+            (index, start, min(start + self.chunk_size, self.remote.size) - 1)
+            for index, start in enumerate(range(0, self.remote.size, self.chunk_size))
+        ]
+
+    def open(self, remote):
+        """Open the partial file for remote and return the chunks left to fetch, all of them unless resuming."""
+        self.remote = remote
+        self.part_file.parent.mkdir(parents=True, exist_ok=True)
+        if not remote.ranges:
+            self._fd = os.open(self.part_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+            return [(0, 0, None)]
+
+        try:
+            saved = json.loads(self.state_file.read_text())
+        except (OSError, ValueError):
+            saved = None
+        if saved is not None and self.part_file.exists() and {k: saved.get(k) for k in self.state()} == self.state():
+            self.done = set(saved["done"])
+        else:
+            self.done = set()
+            self.part_file.unlink(missing_ok=True)
+            self._save()
+
+        self._fd = os.open(self.part_file, os.O_WRONLY | os.O_CREAT)
+        os.ftruncate(self._fd, remote.size)
+        pending = [chunk for chunk in self.chunks() if chunk[0] not in self.done]
+        self.resumed = sum(end + 1 - start for index, start, end in self.chunks() if index in self.done)
+        if self.resumed:
+            logger.info(f"Resuming {self.out_file.name} with {self.resumed / MIB:.1f} MiB already downloaded")
+        return pending
+
+    def _save(self):
+        state = dict(self.state(), done=sorted(self.done))
+        tmp_file = self.state_file.with_name(f"{self.state_file.name}.tmp")
+        tmp_file.write_text(json.dumps(state))
+        os.replace(tmp_file, self.state_file)
+
+    def fetch(self, pools, chunk, retries=5, delay=2):
+        index, start, end = chunk
+        with self._lock:
+            self.started = self.started or time.monotonic()
+
+        def call():
+            return fetch(pools, self.remote.url, self._fd, start, end, ranged=self.remote.ranges)
+
+        n_bytes = retrying(call, f"Downloading {self.out_file.name} bytes {start}-{end}", retries, delay)
+        with self._lock:
+            self.fetched += n_bytes
+            self.finished = time.monotonic()
+            if self.remote.ranges:
+                self.done.add(index)
+                self._save()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def complete(self):
+        return not self.remote.ranges or len(self.done) == len(self.chunks())
+
+    def finish(self, checksum=None):
+        """
+        Verify the complete file against checksum (algorithm, value), if given, and move it in
+        place. A file that does not match is removed so that it is downloaded again.
+        """
+        self.close()
+        if checksum is not None:
+            algorithm, expected = checksum
+            found = file_checksum(self.part_file, algorithm)
+            if found != expected:
+                self.part_file.unlink()
+                self.state_file.unlink(missing_ok=True)
+                raise DownloadError(f"{self.out_file.name} has {algorithm} checksum {found}, not {expected}")
+        # partial_dir may be on another filesystem than out_dir
+        shutil.move(self.part_file, self.out_file)
+        self.state_file.unlink(missing_ok=True)
+
+    def report(self, verified):
+        seconds = (self.finished - self.started) if self.started and self.finished else 0.0
+        return {
+            "name": self.out_file.name,
+            "url": self.remote.url,
+            "size": self.out_file.stat().st_size,
+            "fetched": self.fetched,
+            "resumed": self.resumed,
+            "seconds": round(seconds, 3),
+            "mib_per_second": round(self.fetched / MIB / seconds, 2) if seconds else None,
+            "verified": verified,
+        }
+
+
+def download(
+    urls,
+    out_dir=".",
+    partial_dir=None,
+    connections=8,
+    chunk_size=32 * MIB,
+    checksums=None,
+    context=None,
+    timeout=60,
+    retries=5,
+    delay=2,
+    progress=30,
+):
+    """
+    Download every url into out_dir, in chunks fetched over connections threads, and
+    return a report of the files. Files already in out_dir are kept when they match their
+    checksum or, without one, the size of the remote file.
+    """
+    out_dir = Path(out_dir)
+    partial_dir = Path(partial_dir) if partial_dir else out_dir
+    checksums = checksums or {}
+    pools = Pools(context, timeout)
+    downloads = []
+    report = {"files": [], "skipped": []}
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        futures = {}
+        for url in urls:
+            out_file = out_dir / Path(urllib.parse.urlsplit(url).path).name
+            checksum = checksums.get(out_file.name, checksums.get("") if len(urls) == 1 else None)
+            remote = retrying(lambda: probe(url, context, timeout), f"Requesting {url}", retries, delay)
+            if out_file.exists() and (
+                file_checksum(out_file, checksum[0]) == checksum[1]
+                if checksum
+                else out_file.stat().st_size == remote.size
+            ):
+                logger.info(f"{out_file} is already downloaded")
+                report["skipped"].append(out_file.name)
+                continue
+            item = Download(url, out_file, partial_dir, chunk_size)
+            downloads.append((item, checksum))
+            for chunk in item.open(remote):
+                futures[pool.submit(item.fetch, pools, chunk, retries, delay)] = item
+
+        stop = threading.Event()
+        reporter = threading.Thread(target=report_progress, args=(downloads, stop, progress), daemon=True)
+        reporter.start()
+        errors = []
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(f"{futures[future].out_file.name}: {e}")
+        stop.set()
+    pools.close()
+    for item, _ in downloads:
+        item.close()
+    if errors:
+        raise DownloadError("; ".join(errors))
+
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        # Checksums of the completed files are computed in parallel
+        list(pool.map(lambda entry: entry[0].finish(entry[1]), downloads))
+
+    for item, checksum in downloads:
+        if checksum is None:
+            logger.warning(f"No published checksum of {item.out_file.name}, it is not verified")
+        entry = item.report(verified=checksum is not None)
+        report["files"].append(entry)
+        logger.info(
+            f"Downloaded {entry['name']}: {entry['fetched'] / MIB:.1f} MiB in {entry['seconds']:.1f} s"
+            f" ({entry['mib_per_second'] or 0:.1f} MiB/s), {entry['resumed'] / MIB:.1f} MiB resumed"
+        )
+    seconds = time.monotonic() - started
+    fetched = sum(entry["fetched"] for entry in report["files"])
+    report.update(
+        fetched=fetched,
+        seconds=round(seconds, 3),
+        mib_per_second=round(fetched / MIB / seconds, 2) if seconds else None,
+        connections=pools.opened,
+    )
+    logger.info(
+        f"Downloaded {len(report['files'])} files, {fetched / MIB:.1f} MiB in {seconds:.1f} s"
+        f" ({report['mib_per_second'] or 0:.1f} MiB/s) over {pools.opened} connections"
+    )
+    return report
+
+
+def report_progress(downloads, stop, interval):
+    """Log the bytes downloaded so far and the current rate every interval seconds."""
+    last = sum(item.fetched for item, _ in downloads)
+    while not stop.wait(interval):
+        fetched = sum(item.fetched for item, _ in downloads)
+        total = sum(item.remote.size or 0 for item, _ in downloads) - sum(item.resumed for item, _ in downloads)
+        logger.info(
+            f"Downloaded {fetched / MIB:.1f} of {total / MIB:.1f} MiB ({(fetched - last) / MIB / interval:.1f} MiB/s)"
+        )
+        last = fetched
+
+
+def parse_args(argv=None):
+    """Define and immediately parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Download reference files in parallel byte ranges, resuming and verifying them.",
+    )
+    parser.add_argument("urls", metavar="URL", nargs="+", help="HTTP(S) URLs of the files to download.")
+    parser.add_argument("--out_dir", type=Path, default=Path("."), help="Directory to download into (default .).")
+    parser.add_argument(
+        "--partial_dir",
+        type=Path,
+        help="Directory of the partial downloads and their state, to resume from (default out_dir).",
+    )
+    parser.add_argument(
+        "--checksums",
+        metavar="URL_OR_FILE",
+        action="append",
+        default=[],
+        help="Published checksum list (md5sum/shasum format or Ensembl CHECKSUMS), repeated for every list.",
+    )
+    parser.add_argument("--connections", type=int, default=8, help="Number of parallel connections (default 8).")
+    parser.add_argument("--chunk_size", type=int, default=32, help="MiB requested per range (default 32).")
+    parser.add_argument("--retries", type=int, default=5, help="Retries of every failed request (default 5).")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait on a connection (default 60).")
+    parser.add_argument("--progress", type=float, default=30, help="Seconds between progress reports (default 30).")
+    parser.add_argument("--no_check_certificate", action="store_true", help="Do not verify HTTPS certificates.")
+    parser.add_argument("--report", type=Path, help="Write the files downloaded and their throughput as JSON.")
+    parser.add_argument(
+        "-l",
+        "--log-level",
+        help="The desired log level (default INFO).",
+        choices=("CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"),
+        default="INFO",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Coordinate argument parsing and program execution."""
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="[%(levelname)s] %(message)s")
+    context = ssl._create_unverified_context() if args.no_check_certificate else None
+    checksums = read_checksums(args.checksums, context, args.timeout, args.retries)
+    try:
+        report = download(
+            args.urls,
+            out_dir=args.out_dir,
+            partial_dir=args.partial_dir,
+            connections=args.connections,
+            chunk_size=args.chunk_size * MIB,
+            checksums=checksums,
+            context=context,
+            timeout=args.timeout,
+            retries=args.retries,
+            progress=args.progress,
+        )
+    except (OSError, http.client.HTTPException, DownloadError) as e:
+        logger.error(f"Download failed: {e}")
+        sys.exit(2)
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
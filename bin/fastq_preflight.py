@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+"""
+Estimate the read count, read length and sequenced bases of a sample from samples of its
+gzipped FASTQ files, without decompressing them entirely, and assign the sample a size tier
+that scales the resources of the aligners and fusion callers.
+
+A file is sampled from its start, and for BGZF (bgzip) files, whose blocks can be
+decompressed independently, also from blocks spread evenly over the file. The reads per
+compressed byte of the samples are extrapolated to the size of the file. On files of
+uniform records the read count is within ESTIMATE_ERROR of the true count; files whose
+composition changes along the file (e.g. concatenated runs) are only sampled from their
+start unless they are BGZF.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import zlib
+from pathlib import Path
+
+logger = logging.getLogger()
+
+# Relative error of the read count estimates on files of uniform records
+ESTIMATE_ERROR = 0.05
+
+# Size tiers by total sequenced bases of a sample, smallest first
+TIERS = [
+    ("small", 2e9),
+    ("medium", 10e9),
+    ("large", 25e9),
+    ("xlarge", float("inf")),
+]
+
+BGZF_MAGIC = b"\x1f\x8b\x08\x04"
+READ_SIZE = 1 << 16
+
+
+def is_bgzf(path):
+    with open(path, "rb") as f:
+        header = f.read(16)
+    return header[:4] == BGZF_MAGIC and header[12:14] == b"BC"
+
+
+def next_bgzf_block(f, offset):
+    """Offset of the first BGZF block header at or after offset, None if there is none."""
+    f.seek(offset)
+    buffer = f.read(READ_SIZE * 2)
+    start = 0
+    while True:
+        found = buffer.find(BGZF_MAGIC, start)
+        if found < 0 or found + 14 > len(buffer):
+            return None
+        if buffer[found + 12 : found + 14] == b"BC":
+            return offset + found
+        start = found + 1
+
+
+def inflate(f, offset, n_bytes):
+    """
+    Decompress the gzip members starting at offset until n_bytes compressed bytes are read.
+    Returns the decompressed data and the compressed bytes it came from.
+    """
+    f.seek(offset)
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    chunks = []
+    consumed = 0
+    while consumed < n_bytes:
+        data = f.read(min(READ_SIZE, n_bytes - consumed))
+        if not data:
+            break
+        while data:
+            chunks.append(decompressor.decompress(data))
+            if decompressor.eof:
+                # Next gzip member, e.g. the next BGZF block
+                used = len(data) - len(decompressor.unused_data)
+                consumed += used
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            else:
+                consumed += len(data)
+                data = b""
+    return b"".join(chunks), consumed
+
+
+def count_records(data, resync=False):
+    """
+    Number of complete FASTQ records in data, the bases of their sequences and the bytes
+    they span. When resync, data may start within a record, which is skipped.
+    """
+    lines = data.split(b"\n")
+    start = 0
+    if resync:
+        # A header line is followed by a sequence line and a "+" line, a quality line never is
+        start = next(
+            (
+                i
+                for i in range(len(lines) - 3)
+                if lines[i].startswith(b"@")
+                and lines[i + 2].startswith(b"+")
+                and len(lines[i + 1]) == len(lines[i + 3])
+            ),
+            len(lines),
+        )
+    # The last line is incomplete unless data ends with a newline, and is never counted
+    n_records = max(0, (len(lines) - 1 - start) // 4)
+    records = lines[start : start + 4 * n_records]
+    bases = sum(len(line) for line in records[1::4])
+    return n_records, bases, sum(len(line) + 1 for line in records)
+
+
+def estimate_file(path, sample_bytes=4 << 20, n_samples=8):
+    """Estimated reads and bases of a FASTQ file, gzipped or not, from samples of sample_bytes."""
+    path = Path(path)
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        gzipped = f.read(2) == b"\x1f\x8b"
+    bgzf = gzipped and is_bgzf(path)
+
+    samples = []
+    with open(path, "rb") as f:
+        if not gzipped:
+            data = f.read(sample_bytes)
+            samples.append((data, len(data), False))
+        else:
+            # Only the start of the file when it is not much larger than the samples
+            n_samples = n_samples if bgzf and size > 2 * n_samples * sample_bytes else 1
+            for i in range(n_samples):
+                offset = next_bgzf_block(f, size * i // n_samples) if i else 0
+                if offset is None:
+                    continue
+                data, consumed = inflate(f, offset, sample_bytes)
+                samples.append((data, consumed, i > 0))
+
+    inflated = sum(len(data) for data, _, _ in samples)
+    consumed = sum(consumed for _, consumed, _ in samples)
+    n_records = bases = record_bytes = 0
+    for data, _, resync in samples:
+        counts = count_records(data, resync)
+        n_records += counts[0]
+        bases += counts[1]
+        record_bytes += counts[2]
+    if not n_records or not consumed:
+        return {"path": str(path), "size": size, "bgzf": bgzf, "reads": 0, "read_length": 0, "bases": 0}
+
+    # Uncompressed bytes of the file, from the compression ratio of the samples
+    total_bytes = size * inflated / consumed
+    if consumed >= size:
+        # The whole file was read, the counts are exact
+        reads = n_records
+    else:
+        reads = round(total_bytes * n_records / record_bytes)
+    read_length = bases / n_records
+    return {
+        "path": str(path),
+        "size": size,
+        "bgzf": bgzf,
+        "sampled_reads": n_records,
+        "reads": reads,
+        "read_length": round(read_length, 1),
+        "bases": round(reads * read_length),
+    }
+
+
+def tier_of(bases):
+    return next(name for name, limit in TIERS if bases < limit)
+
+
+def preflight(sample, fastqs, sample_bytes=4 << 20, n_samples=8):
+    """Estimates of the read pairs (or reads), read length and bases of a sample, with its tier."""
+    files = [estimate_file(fastq, sample_bytes, n_samples) for fastq in fastqs]
+    bases = sum(file["bases"] for file in files)
+    reads = files[0]["reads"] if files else 0
+    read_length = max((file["read_length"] for file in files), default=0)
+    return {
+        "sample": sample,
+        "reads": reads,
+        "read_length": read_length,
+        "bases": bases,
+        "tier": tier_of(bases),
+        "estimate_error": ESTIMATE_ERROR,
+        "files": files,
+    }
+
+
+def parse_args(argv=None):
+    """Define and immediately parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Estimate the reads and size tier of a sample from samples of its FASTQ files.",
+    )
+    parser.add_argument("fastqs", metavar="FASTQ", type=Path, nargs="+", help="FASTQ files of the sample.")
+    parser.add_argument("--sample", required=True, help="Sample name.")
+    parser.add_argument("--out", type=Path, required=True, help="JSON file to write the estimates to.")
+    parser.add_argument(
+        "--sample_size", type=int, default=4, help="MiB of compressed FASTQ read per sample (default 4)."
+    )
+    parser.add_argument(
+        "--samples", type=int, default=8, help="Number of places a BGZF file is sampled from (default 8)."
+    )
+    parser.add_argument(
+        "-l",
+        "--log-level",
+        help="The desired log level (default WARNING).",
+        choices=("CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"),
+        default="WARNING",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Coordinate argument parsing and program execution."""
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="[%(levelname)s] %(message)s")
+    missing = [str(fastq) for fastq in args.fastqs if not fastq.is_file()]
+    if missing:
+        logger.error(f"The given FASTQ files {', '.join(missing)} were not found!")
+        sys.exit(2)
+    try:
+        estimates = preflight(args.sample, args.fastqs, args.sample_size << 20, args.samples)
+    except (OSError, zlib.error) as e:
+        logger.error(f"Could not read the FASTQ files of {args.sample}: {e}")
+        sys.exit(2)
+    logger.info(
+        f"{args.sample}: ~{estimates['reads']:,} reads of {estimates['read_length']} bp, "
+        f"{estimates['bases'] / 1e9:.2f} Gbp, tier {estimates['tier']}"
+    )
+    with open(args.out, "w") as f:
+        json.dump(estimates, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,175 @@
 #!/usr/bin/env python3
 
 import argparse
+import gzip
 import logging
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+logger = logging.getLogger()
 
-def get_rrna_intervals(file_in, file_out):
+
+RRNA_MATCH = re.compile(rb'transcript_biotype "(?:Mt_rRNA|rRNA|rRNA_pseudogene)"')
+GENE_ID_MATCH = re.compile(rb'gene_id "([^"]*)"')
+CHROMOSOME_PREFIXES = (b"MT", b"1", b"2", b"3", b"4", b"5", b"6", b"7", b"8", b"9")
+
+
+def open_gtf(file_in):
+    """Open a plain or gzip compressed GTF file for binary reading, detected by its magic bytes."""
+    return gzip.open(file_in, "rb") if is_gzip(file_in) else file_in.open("rb")
+
+
+def iter_rrna_lines(block):
+    """
+    Yield each line of a block of GTF lines containing ``#`` or matching RRNA_MATCH once, in
+    file order, if it lies on a chromosome in CHROMOSOME_PREFIXES. Only the matches are
+    visited, not every line; ``#`` is searched separately so the matcher keeps its literal prefix.
+    """
+    starts = {
+        block.rfind(b"\n", 0, match.start()) + 1 for match in RRNA_MATCH.finditer(block)
+    }
+    pos = block.find(b"#")
+    while pos >= 0:
+        starts.add(block.rfind(b"\n", 0, pos) + 1)
+        pos = block.find(b"#", pos + 1)
+    for start in sorted(starts):
+        if block.startswith(CHROMOSOME_PREFIXES, start):
+            end = block.find(b"\n", start)
+            yield block[start:] if end < 0 else block[start : end + 1]
+
+
+def gtf_to_bed(line):
+    """
+    Convert a GTF line to a BED line like ``convert2bed -i gtf``: 0-based start, the gene_id as
+    name, then score, strand, source, feature, frame and attributes. Returns None for lines
+    with fewer than nine columns.
+    """
+    fields = line.rstrip(b"\n").split(b"\t", 8)
+    if len(fields) < 9:
+        return None
+    chrom, source, feature, start, end, score, strand, frame, attributes = fields
+    gene_id = GENE_ID_MATCH.search(attributes)
+    return b"\t".join(
+        [
+            chrom,
+            b"%d" % (int(start) - 1),
+            end,
+            gene_id.group(1) if gene_id else b".",
+            score,
+            strand,
+            source,
+            feature,
+            frame,
+            attributes,
+        ]
+    )
+
+
+def scan_block(block):
+    """Return the rRNA GTF lines of a block of whole lines and their BED records."""
+    lines = list(iter_rrna_lines(block))
+    bed = [record for record in map(gtf_to_bed, lines) if record is not None]
+    return b"".join(lines), bed
+
+
+def scan_range(job):
     """
-    Get lines containing ``#`` or ``gene_type rRNA`` or ```` or ``gene_type rRNA_pseudogene`` or ``gene_type MT_rRNA``
-    Create output file
+    Scan the lines of a plain GTF file that start within the byte range [begin, end).
+    The line running across end is completed, the one running across begin is left
+    to the previous range, so consecutive ranges cover every line exactly once.
+    """
+    file_in, begin, end = job
+    with open(file_in, "rb") as f:
+        if begin:
+            f.seek(begin - 1)
+            f.readline()
+        start = f.tell()
+        if start >= end:
+            return b"", []
+        block = f.read(end - start)
+        if not block.endswith(b"\n"):
+            block += f.readline()
+    return scan_block(block)
+
+
+def iter_blocks(file_in, chunk_size):
+    """Yield whole-line blocks of about chunk_size bytes of a plain or gzip compressed GTF."""
+    tail = b""
+    with open_gtf(file_in) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            block = tail + chunk
+            cut = block.rfind(b"\n") + 1
+            yield block[:cut]
+            tail = block[cut:]
+    if tail:
+        yield tail
+
+
+def is_gzip(file_in):
+    """Whether a file starts with the gzip magic bytes."""
+    with file_in.open("rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+
+def bed_sort_key(record):
+    """Sort BED records by chromosome name, then numerically by start and end."""
+    chrom, start, end = record.split(b"\t", 3)[:3]
+    return chrom, int(start), int(end)
+
+
+def get_rrna_intervals(file_in, file_out, bed_out=None, threads=1, chunk_size=1 << 24):
+    """
+    Write lines of chromosomes MT or 1-9 containing ``#`` or ``transcript_biotype`` ``rRNA``,
+    ``Mt_rRNA`` or ``rRNA_pseudogene`` to the output file, each line at most once and in
+    file order, and optionally the same intervals as a sorted BED file.
+
+    Plain GTF files are split into byte ranges aligned on line starts that are scanned in a
+    pool of processes; gzip compressed files cannot be split and are streamed in one process.
+    Either way the output is the same as a single-threaded run.
 
     Args:
-        file_in (pathlib.Path): The given GTF file.
+        file_in (pathlib.Path): The given GTF file, optionally gzip compressed.
         file_out (pathlib.Path): Where the ribosomal RNA GTF file should
             be created; always in GTF format.
+        bed_out (pathlib.Path): Where the ribosomal RNA BED file should be created, sorted
+            by chromosome, start and end like convert2bed output.
+        threads (int): Number of processes scanning byte ranges.
+        chunk_size (int): Bytes per range or block.
     """
+    if is_gzip(file_in) or threads <= 1:
+        pool = None
+        results = map(scan_block, iter_blocks(file_in, chunk_size))
+    else:
+        size = file_in.stat().st_size
+        jobs = [
+            (file_in, begin, min(begin + chunk_size, size))
+            for begin in range(0, size, chunk_size)
+        ]
+        pool = ProcessPoolExecutor(max_workers=threads)
+        results = pool.map(scan_range, jobs)
 
-    patterns = {
-        "#",
-        'transcript_biotype "Mt_rRNA"',
-        'transcript_biotype "rRNA"',
-        'transcript_biotype "rRNA_pseudogene"',
-    }
-    line_starts = {"MT", "1", "2", "3", "4", "5", "6", "7", "8", "9"}
-    out_lines = []
-    with file_in.open() as f:
-        data = f.readlines()
-        for line in data:
-            for pattern in patterns:
-                if pattern in line:
-                    for line_start in line_starts:
-                        if line.startswith(line_start):
-                            out_lines.append(line)
+    kept = 0
+    bed = []
+    try:
+        with file_out.open(mode="wb") as out_file:
+            for lines, records in results:
+                out_file.write(lines)
+                kept += len(records)
+                bed.extend(records)
+    finally:
+        if pool:
+            pool.shutdown()
+    logger.info(f"Wrote {kept} ribosomal RNA intervals to {file_out}")
 
-    with file_out.open(mode="w") as out_file:
-        out_file.writelines(out_lines)
+    if bed_out:
+        bed.sort(key=bed_sort_key)
+        with bed_out.open(mode="wb") as out_file:
+            out_file.writelines(record + b"\n" for record in bed)
 
 
 def parse_args(argv=None):
@@ -48,7 +182,7 @@ def parse_args(argv=None):
         "file_in",
         metavar="FILE_IN",
         type=Path,
-        help="Input in GTF format.",
+        help="Input in GTF format, optionally gzip compressed.",
     )
     parser.add_argument(
         "file_out",
@@ -56,6 +190,18 @@ def parse_args(argv=None):
         type=Path,
         help="Transformed output intervals in GTF format.",
     )
+    parser.add_argument(
+        "--bed",
+        metavar="BED",
+        type=Path,
+        help="Also write the intervals in BED format, sorted like convert2bed output.",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="Number of processes scanning an uncompressed GTF (default 1).",
+    )
     parser.add_argument(
         "-l",
         "--log-level",
@@ -74,7 +220,7 @@ def main(argv=None):
         logger.error(f"The given input file {args.file_in} was not found!")
         sys.exit(2)
     args.file_out.parent.mkdir(parents=True, exist_ok=True)
-    get_rrna_intervals(args.file_in, args.file_out)
+    get_rrna_intervals(args.file_in, args.file_out, args.bed, args.threads)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+"""
+Record and verify manifests of the reference components built under genomes_base.
+
+A manifest lists the top-level items a component publishes (files or directories, relative to
+its location under genomes_base) with their sizes and SHA-256 checksums, and the provenance
+it was built with. Directories are checksummed over the relative paths, sizes and checksums of
+their files. Files are hashed in parallel threads.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger()
+
+SCHEMA = "rnafusion.reference_manifest"
+SCHEMA_VERSION = 1
+
+# Manifests are kept in this directory of genomes_base, one <component>.json per component
+MANIFEST_DIR = "manifests"
+
+
+def file_digest(path):
+    """SHA-256 of a file as hex."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 22), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_files(item):
+    """Files of an item, itself if it is a file, with their paths relative to the item."""
+    item = Path(item)
+    if not item.is_dir():
+        return [(item, item.name)]
+    files = []
+    for dirpath, _, filenames in os.walk(item, followlinks=True):
+        for name in filenames:
+            path = Path(dirpath) / name
+            files.append((path, path.relative_to(item).as_posix()))
+    return sorted(files, key=lambda file: file[1])
+
+
+def describe_items(items, checksum=True, threads=4):
+    """
+    Type, size and, when checksum, SHA-256 of the items given by key, by the same keys.
+    The files of all items are hashed together in a pool of threads.
+    """
+    files = {key: list_files(item) for key, item in items.items()}
+    paths = [path for item_files in files.values() for path, _ in item_files]
+    sizes = {path: path.stat().st_size for path in paths}
+    digests = {}
+    if checksum:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            digests = dict(zip(paths, pool.map(file_digest, paths)))
+
+    descriptions = {}
+    for key, item in items.items():
+        item = Path(item)
+        item_files = files[key]
+        description = {
+            "type": "dir" if item.is_dir() else "file",
+            "size": sum(sizes[path] for path, _ in item_files),
+        }
+        if item.is_dir():
+            description["files"] = len(item_files)
+        if checksum:
+            if item.is_dir():
+                tree = "".join(f"{name}\t{sizes[path]}\t{digests[path]}\n" for path, name in item_files)
+                description["sha256"] = hashlib.sha256(tree.encode()).hexdigest()
+            else:
+                description["sha256"] = digests[item]
+        descriptions[key] = description
+    return descriptions
+
+
+def record(component, location, items, provenance, out_file, threads=4):
+    """Write the manifest of a component from its items, as they are published under location."""
+    manifest = {
+        "schema": SCHEMA,
+        "schema_version": SCHEMA_VERSION,
+        "component": component,
+        "location": location,
+        "recorded": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "provenance": provenance,
+        "items": describe_items({Path(item).name: item for item in items}, threads=threads),
+    }
+    with open(out_file, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    logger.info(
+        f"Recorded {len(manifest['items'])} items, "
+        f"{sum(item['size'] for item in manifest['items'].values()) / 2**30:.2f} GiB, of {component}"
+    )
+    return manifest
+
+
+def read_manifests(genomes_base, components=None):
+    """Manifests under genomes_base by component, all of them or those of components."""
+    manifests = {}
+    for manifest_file in sorted((Path(genomes_base) / MANIFEST_DIR).glob("*.json")):
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+        if manifest.get("schema") != SCHEMA:
+            logger.warning(f"Skipping {manifest_file}, not a reference manifest")
+            continue
+        if components is None or manifest["component"] in components:
+            manifests[manifest["component"]] = manifest
+    return manifests
+
+
+def verify(genomes_base, manifests, provenance=None, checksum=False, threads=4):
+    """
+    Problems found with every component, an empty list when it is valid: items missing or
+    differing in type or size from the manifest, or in checksum when checksum, and recorded
+    provenance differing from the given one.
+    """
+    provenance = provenance or {}
+    problems = {}
+    present = {}
+    for component, manifest in manifests.items():
+        problems[component] = [
+            f"{key} is {manifest['provenance'].get(key)!r}, not {value!r}"
+            for key, value in provenance.items()
+            if key in manifest["provenance"] and str(manifest["provenance"][key]) != str(value)
+        ]
+        for name, recorded in manifest["items"].items():
+            path = Path(genomes_base) / manifest["location"] / name
+            if not path.exists():
+                problems[component].append(f"{name} is missing")
+            elif ("dir" if path.is_dir() else "file") != recorded["type"]:
+                problems[component].append(f"{name} is not a {recorded['type']}")
+            else:
+                present[(component, name)] = path
+
+    # Sizes and checksums of all present items are described in one pool
+    descriptions = describe_items(present, checksum=checksum, threads=threads)
+    for (component, name), found in descriptions.items():
+        recorded = manifests[component]["items"][name]
+        for key in ("size", "files", "sha256"):
+            if key in found and key in recorded and found[key] != recorded[key]:
+                problems[component].append(f"{name} {key} is {found[key]}, not {recorded[key]}")
+    return problems
+
+
+def parse_provenance(values):
+    provenance = {}
+    for value in values or []:
+        key, sep, setting = value.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Provenance must be given as KEY=VALUE, not {value!r}")
+        provenance[key] = setting
+    return provenance
+
+
+def parse_args(argv=None):
+    """Define and immediately parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Record and verify checksummed manifests of the references under genomes_base.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Write the manifest of a built component.")
+    record_parser.add_argument("items", metavar="ITEM", type=Path, nargs="+", help="Files and directories built.")
+    record_parser.add_argument("--component", required=True, help="Name of the component, e.g. ensembl.")
+    record_parser.add_argument(
+        "--location",
+        default="",
+        help="Directory the items are published to, relative to genomes_base (default genomes_base itself).",
+    )
+    record_parser.add_argument("--out", type=Path, required=True, help="Manifest JSON to write.")
+
+    verify_parser = subparsers.add_parser(
+        "verify", help="Verify the components of genomes_base against their manifests."
+    )
+    verify_parser.add_argument("components", metavar="COMPONENT", nargs="*", help="Components to verify (default all).")
+    verify_parser.add_argument("--genomes_base", type=Path, required=True, help="Reference directory.")
+    verify_parser.add_argument(
+        "--checksum", action="store_true", help="Also compare checksums, reading every file, not only sizes."
+    )
+    verify_parser.add_argument("--valid", type=Path, help="Write the names of the valid components to this file.")
+
+    for subparser in (record_parser, verify_parser):
+        subparser.add_argument(
+            "--provenance",
+            metavar="KEY=VALUE",
+            action="append",
+            default=[],
+            help="Setting the references are built with, e.g. genome=GRCh38, repeated for every setting.",
+        )
+        subparser.add_argument("--threads", type=int, default=4, help="Number of files hashed at once (default 4).")
+        subparser.add_argument(
+            "-l",
+            "--log-level",
+            help="The desired log level (default WARNING).",
+            choices=("CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"),
+            default="WARNING",
+        )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Coordinate argument parsing and program execution."""
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="[%(levelname)s] %(message)s")
+    try:
+        provenance = parse_provenance(args.provenance)
+    except argparse.ArgumentTypeError as e:
+        logger.error(str(e))
+        sys.exit(2)
+
+    if args.command == "record":
+        missing = [str(item) for item in args.items if not item.exists()]
+        if missing:
+            logger.error(f"The given items {', '.join(missing)} were not found!")
+            sys.exit(2)
+        record(args.component, args.location, args.items, provenance, args.out, args.threads)
+        return 0
+
+    manifests = read_manifests(args.genomes_base, args.components or None)
+    for component in set(args.components) - set(manifests):
+        logger.warning(f"No manifest of {component} under {args.genomes_base}")
+    problems = verify(args.genomes_base, manifests, provenance, args.checksum, args.threads)
+    valid = sorted(component for component, found in problems.items() if not found)
+    for component, found in sorted(problems.items()):
+        print(f"{component}\t{'valid' if not found else 'invalid'}\t{'; '.join(found)}".rstrip("\t"))
+    if args.valid:
+        args.valid.write_text("".join(f"{component}\n" for component in valid))
+    return 0 if len(valid) == len(problems) and not set(args.components) - set(manifests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
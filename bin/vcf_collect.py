@@ -1,209 +1,906 @@
 #!/usr/bin/env python3
 
 import argparse
+import ast
+import cProfile
+import csv
+import hashlib
+import heapq
+import importlib.util
+import itertools
+import json
 import logging
+import os
+import pickle
+import resource
+import struct
 import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
-import pandas as pd
-import ast
+
 import numpy as np
-import csv
+import pandas as pd
 
 logger = logging.getLogger()
 
+# Working dtypes of the vcf_collect frames, applied by apply_schema when a stage
+# produces them. Left_/Right_ columns inherit the dtype of their source column.
+SCHEMA = {
+    "ChromosomeA": "category",
+    "ChromosomeB": "category",
+    "Strand1": "category",
+    "Strand2": "category",
+    "GeneA": "category",
+    "GeneB": "category",
+    "PosA": "Int32",
+    "PosB": "Int32",
+    "JunctionReadCount": "Int32",
+    "SpanningFragCount": "Int32",
+    "hgnc_id": "Int32",
+    "exon_number": "Int32",
+    "transcript_version": "Int32",
+    # Float, as TOOL_HITS has always been written, so that single and chunked runs
+    # agree whether or not some fusion lacks a fusion-report row
+    "TOOLS_HITS": "float64",
+}
+
+# Columns read from each text input and their dtypes at parse time; all other columns
+# are skipped by the parser. Integer columns (None) are inferred and cast by
+# apply_schema, which is faster than parsing them as nullable integers.
+FUSIONINSPECTOR_COLUMNS = {
+    "#FusionName": str,
+    "JunctionReadCount": None,
+    "SpanningFragCount": None,
+    "LeftGene": str,
+    "LeftBreakpoint": str,
+    "RightGene": str,
+    "RightBreakpoint": str,
+    "FFPM": float,
+    "annots": str,
+    "CDS_LEFT_ID": str,
+    "CDS_RIGHT_ID": str,
+    "PROT_FUSION_TYPE": str,
+}
+GTF_TSV_COLUMNS = {
+    "transcript_id": str,
+    "transcript_version": None,
+    "exon_number": None,
+    "orig_coord_info": str,
+}
+HGNC_COLUMNS = {"hgnc_id": str, "ensembl_gene_id": str, "symbol": str}
+FUSIONREPORT_CSV_COLUMNS = {
+    "Fusion": str,
+    "starfusion": str,
+    "arriba": str,
+    "fusioncatcher": str,
+}
+
+# Leading VCF columns, followed by one genotype column per sample
+VCF_COLUMNS = [
+    "ChromosomeA",
+    "PosA",
+    "ID",
+    "REF",
+    "ALT",
+    "QUAL",
+    "FILTER",
+    "INFO",
+    "FORMAT",
+]
+
+# Default number of fusions per batch in chunked mode, and the most spilled batches
+# merged at once
+CHUNK_FUSIONS = 1000
+MAX_OPEN_SPILLS = 256
+
+# Input suffixes read as columnar tables (these need pyarrow) instead of parsed as text
+COLUMNAR_READERS = {
+    ".parquet": pd.read_parquet,
+    ".pq": pd.read_parquet,
+    ".feather": pd.read_feather,
+    ".arrow": pd.read_feather,
+}
+
 
 def vcf_collect(
     fusioninspector_in_file: str,
     fusionreport_in_file: str,
     gtf: str,
     fusionreport_csv: str,
-    hgnc: str,
+    hgnc,
     sample: str,
     out_file,
-) -> None:
+    tabix: bool = False,
+    monitor: "StageMonitor" = None,
+    parquet: str = None,
+    cache: "ParseCache" = None,
+) -> pd.DataFrame:
     """
     Process FusionInspector and FusionReport data,
     merge with GTF from FusionInspector and HGNC database,
-    and write a VCF file.
+    and write a VCF file. Returns the VCF records.
 
     Args:
         fusioninspector_in_file (str): Path to FusionInspector input file.
         fusionreport_in_file (str): Path to Fusion-report input file.
         sample (str): Sample name for the header.
-        hgnc (str): Path to HGNC file.
+        hgnc (str or pd.DataFrame): Path to HGNC file, or an HGNC table already loaded
+            with build_hgnc_dataframe.
         gtf (str): Path to output GTF file from FusionInspector in TSV format.
         fusionreport_csv (str): Path to Fusion-report CSV output file.
-        out (str): Output VCF file path.
+        out (str): Output VCF file path, BGZF compressed if it ends in ".gz".
+        tabix (bool): Write a tabix index next to the compressed VCF.
+        monitor (StageMonitor): Records the time and peak memory of each stage.
+        parquet (str): Also write the typed, annotated fusion table to this Parquet
+            file.
+        cache (ParseCache): Reuses the parsed inputs of earlier runs with identical
+            input files.
+
+    Each input table may also be given as Parquet or Arrow with the columns of its text
+    format.
 
     Adapted from: https://github.com/J35P312/MegaFusion
     """
-    merged_df = (
-        build_fusioninspector_dataframe(fusioninspector_in_file)
-        .join(read_build_fusionreport(fusionreport_in_file), how="outer", on="FUSION")
-        .reset_index()
-    )
-    hgnc_df = build_hgnc_dataframe(hgnc)
-    df_symbol = merged_df[merged_df["Left_ensembl_gene_id"].isna()]
-    df_not_symbol = merged_df[merged_df["Left_ensembl_gene_id"].notna()]
+    monitor = monitor or StageMonitor()
+    cache = cache or ParseCache()
+    with monitor.stage("read_fusioninspector") as stage:
+        fusioninspector_df = cache.load(
+            "fusioninspector", fusioninspector_in_file, build_fusioninspector_dataframe
+        )
+        stage["rows"] = len(fusioninspector_df)
+    with monitor.stage("parse_fusionreport_html") as stage:
+        fusionreport_df = cache.load(
+            "fusionreport", fusionreport_in_file, read_build_fusionreport
+        )
+        stage["rows"] = len(fusionreport_df)
+    with monitor.stage("load_hgnc") as stage:
+        hgnc_df = (
+            hgnc
+            if isinstance(hgnc, pd.DataFrame)
+            else cache.load("hgnc", hgnc, build_hgnc_dataframe)
+        )
+        stage["rows"] = len(hgnc_df)
 
-    df_not_symbol = hgnc_df.merge(
-        df_not_symbol,
-        how="right",
-        left_on="ensembl_gene_id",
-        right_on="Left_ensembl_gene_id",
-    )
-    df_symbol = hgnc_df.merge(
-        df_symbol, how="right", left_on="symbol", right_on="GeneA"
-    )
-    df = pd.concat([df_not_symbol, df_symbol])
-    df = df.rename(columns={"hgnc_id": "Left_hgnc_id"})
+    with monitor.stage("read_gtf") as stage:
+        exon_index = cache.load("exon_index", gtf, build_exon_index)
+        stage["rows"] = len(exon_index.gtf_df)
 
-    df_symbol = df[df["Right_ensembl_gene_id"].isna()]
-    df_not_symbol = df[df["Right_ensembl_gene_id"].notna()]
+    with monitor.stage("parse_fusionreport_csv") as stage:
+        fusionreport_csv_df = cache.load(
+            "fusionreport_csv", fusionreport_csv, read_fusionreport_csv
+        )
+        stage["rows"] = len(fusionreport_csv_df)
 
-    df_not_symbol = hgnc_df.merge(
-        df_not_symbol,
-        how="right",
-        left_on="ensembl_gene_id",
-        right_on="Right_ensembl_gene_id",
-    )
-    df_symbol = hgnc_df.merge(
-        df_symbol, how="right", left_on="symbol", right_on="GeneB"
+    all_df = annotate_fusions(
+        fusioninspector_df,
+        fusionreport_df,
+        hgnc_df,
+        exon_index,
+        fusionreport_csv_df,
+        monitor,
     )
-    df = pd.concat([df_not_symbol, df_symbol])
-    df = df.rename(columns={"hgnc_id": "Right_hgnc_id"})
 
-    gtf_df = build_gtf_dataframe(gtf)
-    all_df = df.merge(
-        gtf_df, how="left", left_on="CDS_LEFT_ID", right_on="Transcript_id"
-    )
-    all_df[["PosA", "orig_start", "orig_end"]] = (
-        all_df[["PosA", "orig_start", "orig_end"]].fillna(0).astype(int)
-    )
+    if parquet:
+        with monitor.stage("write_parquet") as stage:
+            write_fusion_table(all_df, parquet)
+            stage["rows"] = len(all_df)
 
-    all_df = all_df[
-        (
-            (all_df["PosA"] >= all_df["orig_start"])
-            & (all_df["PosA"] <= all_df["orig_end"])
+    with monitor.stage("format_records") as stage:
+        records = column_manipulation(all_df)
+        stage["rows"] = len(records)
+    with monitor.stage("write_vcf") as stage:
+        write_vcf(records, header_def(sample), out_file, index=tabix)
+        stage["rows"] = len(records)
+    monitor.stop()
+    return records
+
+
+def annotate_fusions(
+    fusioninspector_df: pd.DataFrame,
+    fusionreport_df: pd.DataFrame,
+    hgnc_df: pd.DataFrame,
+    exon_index: "ExonIndex",
+    fusionreport_csv_df: pd.DataFrame,
+    monitor: "StageMonitor",
+) -> pd.DataFrame:
+    """
+    Join the parsed FusionInspector and fusion-report tables, annotate both breakpoints
+    with HGNC ids and the exons containing them, and fill in the fusion-report CSV
+    breakpoints. Returns one row per record, indexed and sorted by fusion, before string
+    formatting.
+    """
+    with monitor.stage("merge_hgnc") as stage:
+        merged_df = fusioninspector_df.join(
+            fusionreport_df, how="outer", on="FUSION"
+        ).reset_index()
+
+        df_symbol = merged_df[merged_df["Left_ensembl_gene_id"].isna()]
+        df_not_symbol = merged_df[merged_df["Left_ensembl_gene_id"].notna()]
+
+        df_not_symbol = hgnc_df.merge(
+            df_not_symbol,
+            how="right",
+            left_on="ensembl_gene_id",
+            right_on="Left_ensembl_gene_id",
+        )
+        df_symbol = hgnc_df.merge(
+            df_symbol, how="right", left_on="symbol", right_on="GeneA"
+        )
+        df = apply_schema(pd.concat([df_not_symbol, df_symbol]))
+        df = df.rename(columns={"hgnc_id": "Left_hgnc_id"})
+
+        df_symbol = df[df["Right_ensembl_gene_id"].isna()]
+        df_not_symbol = df[df["Right_ensembl_gene_id"].notna()]
+
+        df_not_symbol = hgnc_df.merge(
+            df_not_symbol,
+            how="right",
+            left_on="ensembl_gene_id",
+            right_on="Right_ensembl_gene_id",
+        )
+        df_symbol = hgnc_df.merge(
+            df_symbol, how="right", left_on="symbol", right_on="GeneB"
+        )
+        df = apply_schema(pd.concat([df_not_symbol, df_symbol]))
+        df = df.rename(columns={"hgnc_id": "Right_hgnc_id"})
+        stage["rows"] = len(df)
+
+    with monitor.stage("resolve_left_exons") as stage:
+        all_df = apply_schema(exon_index.resolve(df, "CDS_LEFT_ID", "PosA"))
+
+        all_df = replace_empty_strings(all_df).drop_duplicates()
+
+        all_df[["exon_number", "transcript_version"]] = all_df[
+            ["exon_number", "transcript_version"]
+        ].replace(0, np.nan)
+        # Fill non-empty values within each group for 'exon_number' and
+        # 'transcript_version'
+        all_df[["exon_number", "transcript_version"]] = fill_within_groups(
+            all_df, "PosA", ["exon_number", "transcript_version"]
+        )
+
+        all_df = all_df.rename(
+            columns={"transcript_version": "Left_transcript_version"}
+        )
+        all_df = all_df.rename(columns={"exon_number": "Left_exon_number"})
+        all_df = all_df[
+            [
+                "FUSION",
+                "GeneA",
+                "GeneB",
+                "PosA",
+                "PosB",
+                "ChromosomeA",
+                "ChromosomeB",
+                "TOOLS_HITS",
+                "SCORE",
+                "FOUND_DB",
+                "FOUND_IN",
+                "JunctionReadCount",
+                "SpanningFragCount",
+                "FFPM",
+                "PROT_FUSION_TYPE",
+                "CDS_LEFT_ID",
+                "CDS_RIGHT_ID",
+                "Left_transcript_version",
+                "Left_exon_number",
+                "Left_hgnc_id",
+                "Right_hgnc_id",
+                "Strand1",
+                "Strand2",
+                "annots",
+            ]
+        ].drop_duplicates()
+        stage["rows"] = len(all_df)
+
+    with monitor.stage("resolve_right_exons") as stage:
+        all_df["CDS_RIGHT_ID"] = all_df["CDS_RIGHT_ID"].astype("str")
+        all_df = apply_schema(exon_index.resolve(all_df, "CDS_RIGHT_ID", "PosB"))
+
+        all_df[["PosA", "PosB"]] = all_df[["PosA", "PosB"]].replace(0, np.nan)
+        all_df = replace_empty_strings(all_df)
+
+        all_df[["exon_number", "transcript_version"]] = all_df[
+            ["exon_number", "transcript_version"]
+        ].replace(0, np.nan)
+        # Fill non-empty values within each group for 'exon_number' and
+        # 'transcript_version'
+        all_df[["exon_number", "transcript_version"]] = fill_within_groups(
+            all_df, "PosB", ["exon_number", "transcript_version"]
+        )
+
+        all_df = all_df.rename(
+            columns={"transcript_version": "Right_transcript_version"}
+        )
+        all_df = all_df.rename(columns={"exon_number": "Right_exon_number"})
+
+        all_df = all_df[
+            [
+                "FUSION",
+                "GeneA",
+                "GeneB",
+                "PosA",
+                "PosB",
+                "ChromosomeA",
+                "ChromosomeB",
+                "TOOLS_HITS",
+                "SCORE",
+                "FOUND_DB",
+                "FOUND_IN",
+                "JunctionReadCount",
+                "SpanningFragCount",
+                "FFPM",
+                "PROT_FUSION_TYPE",
+                "CDS_LEFT_ID",
+                "CDS_RIGHT_ID",
+                "Left_transcript_version",
+                "Left_exon_number",
+                "Left_hgnc_id",
+                "Right_transcript_version",
+                "Right_exon_number",
+                "Right_hgnc_id",
+                "Strand1",
+                "Strand2",
+                "annots",
+            ]
+        ].drop_duplicates()
+        all_df = all_df.rename(columns={"FUSION": "Fusion"})
+        all_df = all_df.set_index("Fusion")
+        stage["rows"] = len(all_df)
+
+    with monitor.stage("combine_fusionreport_csv") as stage:
+        # combine_first loses values of categoricals whose categories differ, so combine
+        # as objects
+        all_df = drop_categories(all_df).combine_first(
+            drop_categories(fusionreport_csv_df)
         )
-        | ((all_df["orig_start"] == 0) & (all_df["orig_end"] == 0))
+        # combine_first only sorts the fusions when some came from FusionInspector,
+        # sort them always so single and chunked runs write records in the same order
+        all_df = all_df.sort_index(kind="stable")
+        stage["rows"] = len(all_df)
+    return all_df
+
+
+def vcf_collect_chunked(
+    fusioninspector_in_file: str,
+    fusionreport_in_file: str,
+    gtf: str,
+    fusionreport_csv: str,
+    hgnc,
+    sample: str,
+    out_file,
+    tabix: bool = False,
+    chunk_size: int = None,
+    max_memory: float = None,
+    monitor: "StageMonitor" = None,
+    cache: "ParseCache" = None,
+) -> None:
+    """
+    Write the same VCF as vcf_collect while holding the FusionInspector rows and the
+    merge intermediates of only one batch of fusions in memory at a time. The HGNC,
+    exon, and fusion-report lookups are loaded once, the FusionInspector TSV is split
+    into batches on disk, and the formatted records of each batch are spilled and merged
+    into the VCF.
+
+    Fusions sharing a breakpoint position always land in the same batch, since exon
+    numbers and transcript versions are filled across the records of a breakpoint
+    position.
+
+    Args:
+        chunk_size (int): Number of fusions per batch (default CHUNK_FUSIONS).
+        max_memory (float): Size the batches so their traced peak memory stays within
+            this many MiB on top of the resident lookups, measured on a first batch of
+            chunk_size fusions.
+
+    The other arguments are those of vcf_collect.
+    """
+    monitor = monitor or StageMonitor()
+    cache = cache or ParseCache()
+    chunk_size = chunk_size or CHUNK_FUSIONS
+    with monitor.stage("parse_fusionreport_html") as stage:
+        fusionreport_df = cache.load(
+            "fusionreport", fusionreport_in_file, read_build_fusionreport
+        )
+        stage["rows"] = len(fusionreport_df)
+    with monitor.stage("load_hgnc") as stage:
+        hgnc_df = (
+            hgnc
+            if isinstance(hgnc, pd.DataFrame)
+            else cache.load("hgnc", hgnc, build_hgnc_dataframe)
+        )
+        stage["rows"] = len(hgnc_df)
+    with monitor.stage("read_gtf") as stage:
+        exon_index = cache.load("exon_index", gtf, build_exon_index)
+        stage["rows"] = len(exon_index.gtf_df)
+    with monitor.stage("parse_fusionreport_csv") as stage:
+        fusionreport_csv_df = cache.load(
+            "fusionreport_csv", fusionreport_csv, read_fusionreport_csv
+        )
+        stage["rows"] = len(fusionreport_csv_df)
+
+    with tempfile.TemporaryDirectory(
+        prefix="vcf_collect_", dir=Path(out_file).parent
+    ) as spill_dir:
+        spill_dir = Path(spill_dir)
+        with monitor.stage("split_fusioninspector") as stage:
+            components = fusion_components(fusioninspector_in_file)
+            known = {fusion for component in components for fusion in component}
+            components.extend(
+                [fusion]
+                for fusion in sorted(
+                    set(fusionreport_df.index) | set(fusionreport_csv_df.index)
+                )
+                if fusion not in known
+            )
+            buckets = pack_components(components, chunk_size)
+            bucket_files = split_fusioninspector(
+                fusioninspector_in_file, buckets, spill_dir
+            )
+            stage["rows"] = len(known)
+        logger.info(
+            f"Collecting {sum(map(len, buckets))} fusions in {len(buckets)} batches "
+            f"of up to {chunk_size} fusions"
+        )
+
+        spills = []
+        written = 0
+        batch_size = 1
+        first = 0
+        while first < len(buckets):
+            batch = range(first, min(first + batch_size, len(buckets)))
+            calibrating = max_memory is not None and first == 0
+            if calibrating and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            else:
+                started_tracing = False
+            baseline = tracemalloc.get_traced_memory()[0] if calibrating else 0
+            stages = len(monitor.stages)
+
+            fusions = [fusion for bucket in batch for fusion in buckets[bucket]]
+            frames = [
+                build_fusioninspector_dataframe(bucket_files[bucket])
+                for bucket in batch
+            ]
+            # Buckets of fusion-report only fusions give empty frames, left out unless
+            # all are
+            fusioninspector_df = pd.concat(
+                [frame for frame in frames if len(frame)] or frames[:1]
+            )
+            del frames
+            all_df = annotate_fusions(
+                fusioninspector_df,
+                fusionreport_df[fusionreport_df.index.isin(fusions)],
+                hgnc_df,
+                exon_index,
+                fusionreport_csv_df[fusionreport_csv_df.index.isin(fusions)],
+                monitor,
+            )
+            del fusioninspector_df
+            with monitor.stage("format_records") as stage:
+                records = column_manipulation(all_df)
+                del all_df
+                spills.append(spill_dir / f"records_{len(spills)}.tsv")
+                spill_records(records, spills[-1], tabix)
+                stage["rows"] = len(records)
+                written += len(records)
+                del records
+            for bucket in batch:
+                os.remove(bucket_files[bucket])
+
+            if calibrating:
+                peaks = [
+                    record["peak_traced_mib"] for record in monitor.stages[stages:]
+                ]
+                if started_tracing:
+                    tracemalloc.stop()
+                batch_size = batch_size_for(max(peaks) - baseline / 2**20, max_memory)
+                logger.info(
+                    f"Batches of {batch_size * chunk_size} fusions fit in "
+                    f"{max_memory} MiB"
+                )
+            first = batch.stop
+
+        with monitor.stage("write_vcf") as stage:
+            write_vcf_text(
+                merge_spills(spills, tabix, spill_dir),
+                header_def(sample),
+                out_file,
+                tabix,
+            )
+            stage["rows"] = written
+    monitor.stop()
+
+
+def fusion_components(file: str, read_size: int = 100000) -> list:
+    """
+    Group the fusions of a FusionInspector TSV that share a left or a right breakpoint
+    position, reading only the fusion names and breakpoints. Returns the groups in order
+    of first appearance, each listing its fusions in order of first appearance.
+    """
+    parent = {}
+
+    def find(node):
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    def union(a, b):
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    order = {}
+    columns = ["#FusionName", "LeftBreakpoint", "RightBreakpoint"]
+    for chunk in pd.read_csv(
+        file, sep="\t", usecols=columns, dtype=str, chunksize=read_size
+    ):
+        for fusion, left, right in chunk[columns].itertuples(index=False):
+            order.setdefault(fusion, len(order))
+            union(fusion, ("PosA", breakpoint_position(left)))
+            union(fusion, ("PosB", breakpoint_position(right)))
+
+    groups = {}
+    for fusion in order:
+        groups.setdefault(find(fusion), []).append(fusion)
+    return list(groups.values())
+
+
+def breakpoint_position(breakpoint) -> int:
+    """The position of a chr:pos:strand breakpoint, None when absent."""
+    fields = str(breakpoint).split(":")
+    return int(fields[1]) if len(fields) > 1 and fields[1].isdigit() else None
+
+
+def pack_components(components: list, size: int) -> list:
+    """
+    Pack groups of fusions into buckets of about size fusions, never splitting a group.
+    """
+    buckets = [[]]
+    for component in components:
+        if buckets[-1] and len(buckets[-1]) + len(component) > size:
+            buckets.append([])
+        buckets[-1].extend(component)
+    return [bucket for bucket in buckets if bucket]
+
+
+def split_fusioninspector(file: str, buckets: list, directory: Path) -> list:
+    """
+    Copy the rows of a FusionInspector TSV into one TSV per bucket of fusions, each with
+    the header of the input. Returns the bucket file paths.
+    """
+    bucket_of = {
+        fusion: bucket for bucket, fusions in enumerate(buckets) for fusion in fusions
+    }
+    paths = [
+        directory / f"fusioninspector_{bucket}.tsv" for bucket in range(len(buckets))
     ]
+    with open(file) as f:
+        header = f.readline()
+        for path in paths:
+            with open(path, "w") as out:
+                out.write(header)
+        pending = {}
+        for line in f:
+            bucket = bucket_of[line.split("\t", 1)[0]]
+            pending.setdefault(bucket, []).append(line)
+            if len(pending[bucket]) >= 1000:
+                with open(paths[bucket], "a") as out:
+                    out.writelines(pending.pop(bucket))
+        for bucket, lines in pending.items():
+            with open(paths[bucket], "a") as out:
+                out.writelines(lines)
+    return paths
 
-    all_df.replace("", np.nan, inplace=True)
-    all_df = all_df.drop_duplicates()
 
-    all_df[["exon_number", "transcript_version"]] = all_df[
-        ["exon_number", "transcript_version"]
-    ].replace(0, np.nan)
-    # Fill non-empty values within each group for 'exon_number' and 'transcript_version'
-    all_df["exon_number"] = all_df.groupby("PosA")["exon_number"].transform(
-        lambda x: x.fillna(method="ffill").fillna(method="bfill")
+def spill_records(records: pd.DataFrame, out_file: Path, index: bool) -> None:
+    """
+    Write formatted VCF records, each prefixed with its fusion name, in the order of
+    the VCF: by fusion, or by chromosome and position when it is tabix indexed.
+    """
+    if index:
+        records = sort_records(records)
+    records[["Fusion"] + VCF_COLUMNS + ["Sample"]].to_csv(
+        out_file, sep="\t", header=False, index=False, quoting=csv.QUOTE_NONE
     )
-    all_df["transcript_version"] = all_df.groupby("PosA")[
-        "transcript_version"
-    ].transform(lambda x: x.fillna(method="ffill").fillna(method="bfill"))
 
-    all_df = all_df.rename(columns={"transcript_version": "Left_transcript_version"})
-    all_df = all_df.rename(columns={"exon_number": "Left_exon_number"})
-    all_df = all_df[
-        [
-            "FUSION",
-            "GeneA",
-            "GeneB",
-            "PosA",
-            "PosB",
-            "ChromosomeA",
-            "ChromosomeB",
-            "TOOLS_HITS",
-            "SCORE",
-            "FOUND_DB",
-            "FOUND_IN",
-            "JunctionReadCount",
-            "SpanningFragCount",
-            "FFPM",
-            "PROT_FUSION_TYPE",
-            "CDS_LEFT_ID",
-            "CDS_RIGHT_ID",
-            "Left_transcript_version",
-            "Left_exon_number",
-            "Left_hgnc_id",
-            "Right_hgnc_id",
-            "Strand1",
-            "Strand2",
-            "annots",
-        ]
-    ].drop_duplicates()
-    all_df["CDS_RIGHT_ID"] = all_df["CDS_RIGHT_ID"].astype("str")
-    all_df = all_df.merge(
-        gtf_df, how="left", left_on="CDS_RIGHT_ID", right_on="Transcript_id"
-    )
-    all_df[["PosB", "orig_start", "orig_end"]] = all_df[
-        ["PosB", "orig_start", "orig_end"]
-    ].fillna(0)
-    all_df[["PosB", "orig_start", "orig_end"]] = all_df[
-        ["PosB", "orig_start", "orig_end"]
-    ].astype(int)
-    all_df = all_df[
+
+def merge_spills(spills: list, index: bool, directory: Path, chunk_size: int = 10000):
+    """
+    Merge spilled records into VCF text chunks, ordered as a single vcf_collect run
+    orders them. At most MAX_OPEN_SPILLS files are merged at once.
+    """
+    if index:
+
+        def key(line):
+            fusion, chrom, pos, _ = line.split("\t", 3)
+            return chrom, int(pos), fusion
+
+    else:
+
+        def key(line):
+            return line.split("\t", 1)[0]
+
+    while len(spills) > MAX_OPEN_SPILLS:
+        merged = []
+        for start in range(0, len(spills), MAX_OPEN_SPILLS):
+            merged.append(directory / f"merged_{len(merged)}_{len(spills)}.tsv")
+            with ExitStack() as stack, open(merged[-1], "w") as out:
+                files = [
+                    stack.enter_context(open(spill))
+                    for spill in spills[start : start + MAX_OPEN_SPILLS]
+                ]
+                out.writelines(heapq.merge(*files, key=key))
+        spills = merged
+
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(spill)) for spill in spills]
+        lines = (line.split("\t", 1)[1] for line in heapq.merge(*files, key=key))
+        while True:
+            text = "".join(itertools.islice(lines, chunk_size))
+            if not text:
+                break
+            yield text
+
+
+def batch_size_for(peak_per_bucket: float, max_memory: float) -> int:
+    """
+    Number of buckets per batch fitting in max_memory MiB next to the memory already
+    resident, given the traced peak of one bucket in MiB.
+    """
+    budget = max_memory - current_rss_mib()
+    if peak_per_bucket > budget:
+        logger.warning(
+            f"A batch of one bucket peaked at {peak_per_bucket:.1f} MiB, above the "
+            f"{budget:.1f} MiB left of --max_memory; use a smaller --chunk_size"
+        )
+    return max(1, int(budget // max(peak_per_bucket, 1)))
+
+
+def vcf_collect_cohort(
+    manifest: str,
+    hgnc: str,
+    out_dir: Path,
+    workers: int = 1,
+    tabix: bool = False,
+    merged_vcf: Path = None,
+    matrix: Path = None,
+    profile: bool = False,
+    cache: "ParseCache" = None,
+) -> None:
+    """
+    Run vcf_collect for every sample of a manifest, loading the HGNC database once
+    and processing the samples in a pool of worker processes. Optionally merge all
+    samples into a multi-sample VCF and a fusion by sample count matrix.
+
+    Args:
+        manifest (str): TSV with the columns sample, fusioninspector,
+            fusioninspector_gtf, fusionreport and fusionreport_csv, one row per sample.
+        hgnc (str): Path to HGNC file.
+        out_dir (Path): Directory receiving one <sample>_fusion_data.vcf.gz per sample.
+        workers (int): Number of samples processed in parallel.
+        tabix (bool): Write a tabix index next to each VCF.
+        merged_vcf (Path): Multi-sample VCF output path, see merge_cohort_records.
+        matrix (Path): Fusion by sample matrix output path (.npz), see
+            write_cohort_matrix.
+        profile (bool): Write a stage profile JSON next to each VCF, see StageMonitor.
+        cache (ParseCache): Reuses the parsed inputs of earlier runs, see ParseCache.
+    """
+    cache = cache or ParseCache()
+    samples = pd.read_csv(manifest, sep="\t", dtype=str)
+    missing = {
+        "sample",
+        "fusioninspector",
+        "fusioninspector_gtf",
+        "fusionreport",
+        "fusionreport_csv",
+    } - set(samples.columns)
+    if missing:
+        raise ValueError(f"Manifest {manifest} lacks the columns {sorted(missing)}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [
         (
-            (all_df["PosB"] >= all_df["orig_start"])
-            & (all_df["PosB"] <= all_df["orig_end"])
+            row.fusioninspector,
+            row.fusionreport,
+            row.fusioninspector_gtf,
+            row.fusionreport_csv,
+            row.sample,
+            out_dir / f"{row.sample}_fusion_data.vcf.gz",
+            tabix,
+            bool(merged_vcf or matrix),
+            profile,
+            cache,
         )
-        | ((all_df["orig_start"] == 0) & (all_df["orig_end"] == 0))
+        for row in samples.itertuples(index=False)
     ]
 
-    all_df[["PosA", "PosB"]] = all_df[["PosA", "PosB"]].replace(0, np.nan)
-    all_df = all_df.replace("", np.nan)
+    hgnc_df = cache.load("hgnc", hgnc, build_hgnc_dataframe)
+    cache.log_stats()
+    if workers <= 1:
+        init_cohort_worker(hgnc_df)
+        cohort = dict(map(collect_cohort_sample, jobs))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=init_cohort_worker, initargs=(hgnc_df,)
+        ) as pool:
+            cohort = dict(pool.map(collect_cohort_sample, jobs))
+
+    if merged_vcf or matrix:
+        sites, counts = merge_cohort_records(cohort)
+        if merged_vcf:
+            write_vcf(
+                sites,
+                header_def("\t".join(cohort)),
+                merged_vcf,
+                index=tabix and str(merged_vcf).endswith(".gz"),
+                sample_columns=list(cohort),
+            )
+        if matrix:
+            write_cohort_matrix(sites, counts, list(cohort), matrix)
+
 
-    all_df[["exon_number", "transcript_version"]] = all_df[
-        ["exon_number", "transcript_version"]
-    ].replace(0, np.nan)
-    # Fill non-empty values within each group for 'exon_number' and 'transcript_version'
-    all_df["exon_number"] = all_df.groupby("PosB")["exon_number"].transform(
-        lambda x: x.fillna(method="ffill").fillna(method="bfill")
+_cohort_hgnc_df = None
+
+
+def init_cohort_worker(hgnc_df: pd.DataFrame) -> None:
+    """
+    Share the HGNC table loaded once by vcf_collect_cohort with a worker process.
+    """
+    global _cohort_hgnc_df
+    _cohort_hgnc_df = hgnc_df
+
+
+def collect_cohort_sample(job: tuple) -> tuple:
+    """
+    Write the VCF of one manifest sample against the shared HGNC table.
+    Returns the sample name and, when they are to be merged, its VCF records.
+    """
+    (
+        fusioninspector,
+        fusionreport,
+        gtf,
+        fusionreport_csv,
+        sample,
+        out_file,
+        tabix,
+        keep_records,
+        profile,
+        cache,
+    ) = job
+    monitor = StageMonitor()
+    # Count the cache hits of this sample only, whichever process runs it
+    cache = ParseCache(cache.directory, cache.max_size)
+    records = vcf_collect(
+        fusioninspector,
+        fusionreport,
+        gtf,
+        fusionreport_csv,
+        _cohort_hgnc_df,
+        sample,
+        out_file,
+        tabix,
+        monitor,
+        cache=cache,
+    )
+    if profile:
+        monitor.write_profile(profile_path(out_file), sample, out_file)
+    logger.info(f"Wrote VCF for sample {sample}")
+    cache.log_stats()
+    if not keep_records:
+        return sample, None
+    return (
+        sample,
+        records[
+            [
+                "Fusion",
+                "ChromosomeA",
+                "PosA",
+                "ALT",
+                "INFO",
+                "Sample",
+                "JunctionReadCount",
+                "SpanningFragCount",
+                "FFPM",
+            ]
+        ],
     )
-    all_df["transcript_version"] = all_df.groupby("PosB")[
-        "transcript_version"
-    ].transform(lambda x: x.fillna(method="ffill").fillna(method="bfill"))
 
-    all_df = all_df.rename(columns={"transcript_version": "Right_transcript_version"})
-    all_df = all_df.rename(columns={"exon_number": "Right_exon_number"})
 
-    all_df = all_df[
-        [
-            "FUSION",
-            "GeneA",
-            "GeneB",
-            "PosA",
-            "PosB",
-            "ChromosomeA",
-            "ChromosomeB",
-            "TOOLS_HITS",
-            "SCORE",
-            "FOUND_DB",
-            "FOUND_IN",
-            "JunctionReadCount",
-            "SpanningFragCount",
-            "FFPM",
-            "PROT_FUSION_TYPE",
-            "CDS_LEFT_ID",
-            "CDS_RIGHT_ID",
-            "Left_transcript_version",
-            "Left_exon_number",
-            "Left_hgnc_id",
-            "Right_transcript_version",
-            "Right_exon_number",
-            "Right_hgnc_id",
-            "Strand1",
-            "Strand2",
-            "annots",
-        ]
-    ].drop_duplicates()
-    all_df = all_df.rename(columns={"FUSION": "Fusion"})
-    all_df = all_df.set_index("Fusion")
+def merge_cohort_records(cohort: dict) -> tuple:
+    """
+    Merge the VCF records of several samples into multi-sample sites keyed on the
+    breakpoint (CHROM, POS, ALT). Records without a breakpoint are also keyed on their
+    fusion name so they stay apart. ID, INFO and the site order come from the first
+    sample carrying a site, and samples without the site get a missing "./.:.:.:." call.
+
+    Returns the sites sorted by chromosome and position, with one FORMAT column per
+    sample, and a dict of site by sample DataFrames of JunctionReadCount,
+    SpanningFragCount and FFPM.
+    """
+    samples = list(cohort)
+    stacked = pd.concat(
+        [records.assign(sample_name=sample) for sample, records in cohort.items()],
+        ignore_index=True,
+    )
+    key = stacked["ChromosomeA"] + "\t" + stacked["PosA"] + "\t" + stacked["ALT"]
+    stacked["key"] = key.where(
+        stacked["PosA"] != "0", key + "\t" + stacked["Fusion"].astype(str)
+    )
+    stacked = stacked.drop_duplicates(["key", "sample_name"])
+    first = stacked.drop_duplicates("key").set_index("key")
+
+    sites = pd.DataFrame(
+        {
+            "ChromosomeA": first["ChromosomeA"],
+            "PosA": first["PosA"],
+            "ID": first["Fusion"].astype(str),
+            "REF": "N",
+            "ALT": first["ALT"],
+            "QUAL": ".",
+            "FILTER": "PASS",
+            "INFO": first["INFO"],
+            "FORMAT": "GT:DV:RV:FFPM",
+        },
+        index=first.index,
+    )
+    by_sample = stacked.pivot(index="key", columns="sample_name")
+    calls = by_sample["Sample"].reindex(index=sites.index, columns=samples)
+    for sample in samples:
+        sites[sample] = calls[sample].fillna("./.:.:.:.")
+    counts = {
+        column: by_sample[column]
+        .reindex(index=sites.index, columns=samples)
+        .astype(float)
+        for column in ["JunctionReadCount", "SpanningFragCount", "FFPM"]
+    }
+
+    order = (
+        sites.assign(_pos=sites["PosA"].astype(int))
+        .sort_values(["ChromosomeA", "_pos"], kind="stable")
+        .index
+    )
+    return sites.loc[order], {
+        column: values.loc[order] for column, values in counts.items()
+    }
 
-    all_df = all_df.combine_first(read_fusionreport_csv(fusionreport_csv))
 
-    return write_vcf(column_manipulation(all_df), header_def(sample), out_file)
+def write_cohort_matrix(
+    sites: pd.DataFrame, counts: dict, samples: list, out_file: Path
+) -> None:
+    """
+    Write the fusion by sample values of a merged cohort as a compressed .npz file
+    holding the site labels (fusion, chrom, pos, alt), the sample names, a detected mask
+    and the junction_read_count, spanning_frag_count (int32, 0 when not detected) and
+    ffpm (float32, NaN when not detected) matrices.
+    """
+    detected = counts["FFPM"].notna().to_numpy()
+    with open(out_file, "wb") as f:
+        np.savez_compressed(
+            f,
+            samples=np.array(samples, dtype=str),
+            fusion=sites["ID"].to_numpy(dtype=str),
+            chrom=sites["ChromosomeA"].to_numpy(dtype=str),
+            pos=sites["PosA"].astype(np.int64).to_numpy(),
+            alt=sites["ALT"].to_numpy(dtype=str),
+            detected=detected,
+            junction_read_count=counts["JunctionReadCount"]
+            .fillna(0)
+            .to_numpy(dtype=np.int32),
+            spanning_frag_count=counts["SpanningFragCount"]
+            .fillna(0)
+            .to_numpy(dtype=np.int32),
+            ffpm=counts["FFPM"].to_numpy(dtype=np.float32),
+        )
 
 
 def parse_args(argv=None):
@@ -242,6 +939,42 @@ def parse_args(argv=None):
         type=Path,
         help="HGNC database.",
     )
+    parser.add_argument(
+        "--manifest",
+        metavar="MANIFEST",
+        type=Path,
+        help="Cohort mode: TSV listing sample, fusioninspector, fusioninspector_gtf, "
+        "fusionreport and fusionreport_csv for each sample. --out is then the output "
+        "directory.",
+    )
+    parser.add_argument(
+        "--workers",
+        metavar="WORKERS",
+        type=int,
+        default=1,
+        help="Number of samples processed in parallel in cohort mode (default 1).",
+    )
+    parser.add_argument(
+        "--merged_vcf",
+        metavar="MERGED_VCF",
+        type=Path,
+        help="Cohort mode: also write all samples into one multi-sample VCF keyed on "
+        "the breakpoint.",
+    )
+    parser.add_argument(
+        "--matrix",
+        metavar="MATRIX",
+        type=Path,
+        help="Cohort mode: also write a fusion by sample matrix of read counts and "
+        "FFPM (.npz).",
+    )
+    parser.add_argument(
+        "--build_hgnc_index",
+        metavar="HGNC_INDEX",
+        type=Path,
+        help="Only convert the HGNC database into a prebuilt lookup (.npz) at this "
+        "path.",
+    )
     parser.add_argument(
         "--sample", metavar="SAMPLE", type=Path, help="Sample name.", default="Sample"
     )
@@ -249,7 +982,76 @@ def parse_args(argv=None):
         "--out",
         metavar="OUT",
         type=Path,
-        help="VCF output path.",
+        help="VCF output path. Paths ending in .gz are written BGZF compressed.",
+    )
+    parser.add_argument(
+        "--tabix",
+        action="store_true",
+        help="Write a tabix index (.tbi) for the BGZF compressed VCF output.",
+    )
+    parser.add_argument(
+        "--max_stage_memory",
+        metavar="MIB",
+        type=float,
+        help="Fail when the memory traced in any stage peaks above this many MiB.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write the wall time, CPU time, rows and peak RSS of each stage to "
+        "<out>.profile.json next to the VCF (also enabled by the VCF_COLLECT_PROFILE "
+        "environment variable).",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="CPROFILE",
+        type=Path,
+        help="Dump cProfile statistics of the run to this file, readable with pstats "
+        "or snakeviz.",
+    )
+    parser.add_argument(
+        "--parquet",
+        metavar="PARQUET",
+        type=Path,
+        help="Also write the annotated fusion table in Parquet format (requires "
+        "pyarrow).",
+    )
+    parser.add_argument(
+        "--chunk_size",
+        metavar="FUSIONS",
+        type=int,
+        help="Process the fusions in batches of about this many, holding one batch in "
+        f"memory at a time (default {CHUNK_FUSIONS} with --max_memory). Fusions "
+        "sharing a breakpoint position are kept in one batch.",
+    )
+    parser.add_argument(
+        "--max_memory",
+        metavar="MIB",
+        type=float,
+        help="Process the fusions in batches sized to stay within this many MiB, "
+        "measured on a first batch of --chunk_size fusions.",
+    )
+    parser.add_argument(
+        "--cache_dir",
+        metavar="CACHE_DIR",
+        type=Path,
+        help="Cache parsed inputs in this directory, keyed on the input file contents, "
+        "so reruns only parse the inputs that changed.",
+    )
+    parser.add_argument(
+        "--cache_size",
+        metavar="MIB",
+        type=float,
+        default=2048,
+        help="Evict the least recently used cache entries above this many MiB (default "
+        "2048).",
+    )
+    parser.add_argument(
+        "-l",
+        "--log-level",
+        help="The desired log level (default WARNING).",
+        choices=("CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"),
+        default="WARNING",
     )
     return parser.parse_args(argv)
 
@@ -286,9 +1088,7 @@ def header_def(sample: str) -> str:
 ##FORMAT=<ID=DV,Number=1,Type=Integer,Description="Number of paired-ends that support the event">\n\
 ##FORMAT=<ID=RV,Number=1,Type=Integer,Description="Number of split reads that support the event">\n\
 ##FORMAT=<ID=FFPM,Number=1,Type=Float,Description="Fusion fragments per million total RNA-seq fragments">\n\
-#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\t{}'.format(
-        sample
-    )
+#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\t{}'.format(sample)
 
 
 def convert_to_list(annots_str: str) -> list:
@@ -298,11 +1098,303 @@ def convert_to_list(annots_str: str) -> list:
         return np.nan
 
 
+def fill_within_groups(df: pd.DataFrame, by: str, columns: list) -> pd.DataFrame:
+    """
+    Forward then backward fill the given columns within each group of rows sharing the
+    value of `by`, all columns at once with the built-in grouped ffill/bfill.
+    """
+    filled = df.groupby(by, sort=False)[columns].ffill()
+    return filled.groupby(df[by], sort=False).bfill()
+
+
+def read_table(
+    file: str, columns: dict = None, required: bool = True, **kwargs
+) -> pd.DataFrame:
+    """
+    Read an input table as Parquet or Arrow (Feather) when its suffix is in
+    COLUMNAR_READERS, otherwise as delimited text with the given read_csv options. When
+    columns maps column names to dtypes, only those columns are read, text columns
+    parsed straight to their dtype. Columns that are not required may be absent from the
+    file.
+    """
+    reader = COLUMNAR_READERS.get(Path(file).suffix.lower())
+    if columns is None:
+        if reader is None:
+            return pd.read_csv(file, **kwargs)
+        return reader(file)
+    if reader is not None:
+        if required:
+            return reader(file, columns=list(columns))
+        df = reader(file)
+        return df[[column for column in df.columns if column in columns]]
+    dtype = {column: dtype for column, dtype in columns.items() if dtype is not None}
+    usecols = list(columns) if required else lambda column: column in columns
+    return pd.read_csv(file, usecols=usecols, dtype=dtype, **kwargs)
+
+
+def write_fusion_table(df: pd.DataFrame, out_file: str) -> None:
+    """
+    Write the annotated fusion table, one row per VCF record before string formatting,
+    as a compressed Parquet file keeping the SCHEMA dtypes.
+    """
+    apply_schema(df.reset_index()).to_parquet(out_file, index=False, compression="zstd")
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast the columns of a frame listed in SCHEMA to their working dtype, in place.
+    Integer columns are parsed from strings or floats into nullable Int32.
+    """
+    for column, dtype in SCHEMA.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        if dtype == "Int32":
+            df[column] = pd.to_numeric(df[column]).astype(dtype)
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def drop_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast the categorical columns of a frame back to object.
+    """
+    categories = df.select_dtypes("category").columns
+    return df.astype({column: object for column in categories})
+
+
+def replace_empty_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace empty strings by NaN in the string and categorical columns of a frame.
+    """
+    columns = df.select_dtypes(["object", "category"]).columns
+    df[columns] = df[columns].replace("", np.nan)
+    return df
+
+
+class StageMonitor:
+    """
+    Record the wall time, CPU time, row count and peak RSS of the stages of a
+    vcf_collect run. Python allocations are also traced while INFO logging is enabled or
+    a budget is set, and a stage whose traced peak exceeds max_memory (MiB) raises
+    MemoryError.
+    """
+
+    # Identifies the layout of the JSON written by write_profile, bumped on incompatible
+    # changes
+    PROFILE_SCHEMA = "nf-core/rnafusion/vcf_collect_profile"
+    PROFILE_VERSION = 1
+
+    def __init__(self, max_memory: float = None) -> None:
+        self.max_memory = max_memory
+        self.stages = []
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.tracing = (
+            max_memory is not None or logger.isEnabledFor(logging.INFO)
+        ) and not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Measure the enclosed block as the stage `name`. The yielded record takes the
+        number of rows the stage produced under "rows".
+        """
+        traced = tracemalloc.is_tracing()
+        if traced:
+            tracemalloc.reset_peak()
+        record = {"name": name, "rows": None}
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        yield record
+        record["wall_seconds"] = round(time.perf_counter() - started, 4)
+        record["cpu_seconds"] = round(time.process_time() - cpu_started, 4)
+        record["max_rss_mib"] = max_rss_mib()
+        record["peak_traced_mib"] = None
+        peak = ""
+        if traced:
+            record["peak_traced_mib"] = round(
+                tracemalloc.get_traced_memory()[1] / 2**20, 1
+            )
+            peak = f", peak traced memory {record['peak_traced_mib']:.1f} MiB"
+        self.stages.append(record)
+        logger.info(
+            f"Stage {name} took {record['wall_seconds']:.3f} s "
+            f"({record['cpu_seconds']:.3f} s CPU), {record['rows']} rows{peak}"
+        )
+        if traced and self.max_memory is not None:
+            if record["peak_traced_mib"] > self.max_memory:
+                raise MemoryError(
+                    f"Stage {name} peaked at {record['peak_traced_mib']:.1f} MiB, "
+                    f"above the budget of {self.max_memory} MiB"
+                )
+
+    def stop(self) -> None:
+        """Stop tracing memory if this monitor started it."""
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+
+    def write_profile(self, out_file: str, sample: str, vcf: str) -> None:
+        """
+        Write the stage records as JSON. Every stage holds name, rows, wall_seconds,
+        cpu_seconds, max_rss_mib and peak_traced_mib, with null for values not measured.
+        """
+        profile = {
+            "schema": self.PROFILE_SCHEMA,
+            "schema_version": self.PROFILE_VERSION,
+            "sample": str(sample),
+            "vcf": str(vcf),
+            "total": {
+                "wall_seconds": round(time.perf_counter() - self.started, 4),
+                "cpu_seconds": round(time.process_time() - self.cpu_started, 4),
+                "max_rss_mib": max_rss_mib(),
+            },
+            "stages": self.stages,
+        }
+        with open(out_file, "w") as f:
+            json.dump(profile, f, indent=2)
+            f.write("\n")
+
+
+def max_rss_mib() -> float:
+    """Peak resident set size of this process so far, in MiB."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def current_rss_mib() -> float:
+    """Resident set size of this process now, in MiB (its peak without /proc)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return max_rss_mib()
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+
+
+def profile_path(out_file) -> Path:
+    """The profile JSON next to a VCF: <name>.profile.json for <name>.vcf[.gz]."""
+    out_file = Path(out_file)
+    name = out_file.name
+    for suffix in (".gz", ".vcf"):
+        name = name[: -len(suffix)] if name.endswith(suffix) else name
+    return out_file.with_name(f"{name}.profile.json")
+
+
+def profiling_requested() -> bool:
+    """Whether the VCF_COLLECT_PROFILE environment variable asks for stage profiles."""
+    return os.environ.get("VCF_COLLECT_PROFILE", "").lower() not in (
+        "",
+        "0",
+        "false",
+        "no",
+    )
+
+
+class ParseCache:
+    """
+    Content-addressed on-disk cache of parsed inputs, so a rerun only parses the inputs
+    whose contents changed. Entries are pickles named after the kind of input and the
+    SHA-256 of the input file, and the least recently used entries are evicted once the
+    directory holds more than max_size MiB. Without a directory every input is parsed.
+    """
+
+    # Bumped whenever a cached parser changes its output, so older entries are skipped
+    VERSION = 2
+
+    def __init__(self, directory: Path = None, max_size: float = 2048) -> None:
+        self.directory = Path(directory) if directory else None
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def load(self, kind: str, file: str, parse):
+        """
+        Return parse(file), from the cache when an entry of this kind exists for the
+        contents of file.
+        """
+        if self.directory is None:
+            return parse(file)
+        entry = self.directory / f"{kind}-v{self.VERSION}-{file_digest(file)}.pkl"
+        try:
+            with open(entry, "rb") as f:
+                parsed = pickle.load(f)
+            # Reads refresh the modification time that eviction orders entries by
+            os.utime(entry)
+            self.hits += 1
+            logger.info(f"Parse cache hit for {kind} {file}")
+            return parsed
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            # Truncated, corrupt or stale entries (e.g. of another pandas version) are
+            # reparsed
+            logger.warning(
+                f"Parse cache entry {entry.name} could not be read ({e!r}), removing it"
+            )
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+        self.misses += 1
+        logger.info(f"Parse cache miss for {kind} {file}")
+        parsed = parse(file)
+        partial = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        with open(partial, "wb") as f:
+            pickle.dump(parsed, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, entry)
+        self.evict(keep=entry)
+        return parsed
+
+    def evict(self, keep: Path = None) -> None:
+        """Remove the least recently used entries until the cache fits max_size MiB."""
+        entries = []
+        for entry in self.directory.glob("*.pkl"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, entry in sorted(entries, key=lambda item: item[0]):
+            if size <= self.max_size * 2**20:
+                break
+            if entry == keep:
+                continue
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            logger.info(f"Parse cache evicted {entry.name}")
+
+    def log_stats(self) -> None:
+        """Log the hit and miss counts of this run."""
+        if self.directory is not None:
+            logger.info(
+                f"Parse cache {self.directory}: {self.hits} hits, {self.misses} misses"
+            )
+
+
+def file_digest(file: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 hex digest of the contents of a file."""
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def build_fusioninspector_dataframe(file: str) -> pd.DataFrame:
     """
     Read FusionInspector output from a CSV file, preprocess the data, and set 'FUSION' as the index.
+    Only the FUSIONINSPECTOR_COLUMNS are read.
     """
-    df = pd.read_csv(file, sep="\t")
+    df = read_table(file, FUSIONINSPECTOR_COLUMNS, sep="\t")
     df = df.rename(columns={"#FusionName": "FUSION"})
     if not (df.empty):
         df[["ChromosomeA", "PosA", "Strand1"]] = df["LeftBreakpoint"].str.split(
@@ -347,114 +1439,106 @@ def build_fusioninspector_dataframe(file: str) -> pd.DataFrame:
         ]:
             df[j] = np.nan
 
-    return df.set_index(["FUSION"])
+    return apply_schema(df).set_index(["FUSION"])
 
 
-def replace_value_with_column_name(
-    row: pd.Series, value_to_replace: str, column_name: str
-) -> str:
+def extract_fusionreport_rows(fusionreport_file: str) -> list:
     """
-    Replace a specific value in a row with the corresponding column name.
+    Decode the fusion_list rows embedded in a fusion-report index.html.
+    Only the line holding the table is decoded, starting at its "rows" array.
     """
-    new_values = ""
-    for col_name, value in row.items():
-        if col_name == column_name:
-            if value == value_to_replace:
-                new_values = col_name
-            else:
-                new_values = ""
-    return new_values
+    decoder = json.JSONDecoder()
+    with open(fusionreport_file) as f:
+        for line in f:
+            if 'name="fusion_list' not in line:
+                continue
+            start = line.find('rows": ')
+            if start != -1:
+                rows, _ = decoder.raw_decode(line, start + len('rows": '))
+                return rows
+    raise ValueError(f"No fusion_list table found in {fusionreport_file}")
 
 
-def concatenate_columns(row: pd.Series) -> str:
+def read_build_fusionreport(fusionreport_file: str) -> pd.DataFrame:
     """
-    Concatenate non-empty values in a row into a single string separated by commas.
+    Read fusion-report data from its index.html, treating absent tool entries as no hit.
+    FOUND_IN lists the tools that found each fusion and FOUND_DB the databases, both
+    comma separated. Logs the parse time and, at INFO level, the peak memory used.
     """
-    non_empty_values = [str(value) for value in row if value != ""]
-    return ",".join(non_empty_values)
+    started = time.perf_counter()
+    track_memory = logger.isEnabledFor(logging.INFO) and not tracemalloc.is_tracing()
+    if track_memory:
+        tracemalloc.start()
 
+    rows = extract_fusionreport_rows(fusionreport_file)
+    columns = {
+        "FUSION": [],
+        "GeneA": [],
+        "GeneB": [],
+        "TOOLS_HITS": [],
+        "SCORE": [],
+        "FOUND_DB": [],
+        "FOUND_IN": [],
+    }
+    for row in rows:
+        genes = row["fusion"].split("--", 1)
+        columns["FUSION"].append(row["fusion"])
+        columns["GeneA"].append(genes[0])
+        columns["GeneB"].append(genes[1] if len(genes) > 1 else None)
+        columns["TOOLS_HITS"].append(row.get("tools_hits"))
+        columns["SCORE"].append(row.get("score"))
+        columns["FOUND_DB"].append(",".join(row.get("found_db", [])))
+        columns["FOUND_IN"].append(
+            ",".join(
+                tool
+                for tool in ("arriba", "starfusion", "fusioncatcher")
+                if row.get(tool) in ("true", True)
+            )
+        )
+    fusion_report = apply_schema(pd.DataFrame(columns)).set_index(["FUSION"])
 
-def read_build_fusionreport(fusionreport_file: str) -> pd.DataFrame:
-    """
-    Read and preprocess fusion-report data from a file, including handling missing tool columns,
-    getting the columns with each tool and create a new FOUND_IN column with all the tool hits.
-    Convert the list of databases in FOUND_DB into a joined string with a comma separator.
-    Make all column headers uppercase.
-    """
-    with open(fusionreport_file) as f:
-        from_html = [
-            line.split('rows": ')[1] for line in f if 'name="fusion_list' in line
-        ]
-        tmp = str(from_html)[2:]
-        tmp2 = tmp.split(', "tools": ')[0]
-        fusion_report = pd.DataFrame(ast.literal_eval(tmp2))
-    if not "arriba" in fusion_report.columns:
-        fusion_report["arriba"] = ""
-    if not "fusioncatcher" in fusion_report.columns:
-        fusion_report["fusioncatcher"] = ""
-    if not "starfusion" in fusion_report.columns:
-        fusion_report["starfusion"] = ""
-    fusion_report["arriba"] = fusion_report[["arriba"]].apply(
-        replace_value_with_column_name, args=("true", "arriba"), axis=1
-    )
-    fusion_report["fusioncatcher"] = fusion_report[["fusioncatcher"]].apply(
-        replace_value_with_column_name, args=("true", "fusioncatcher"), axis=1
-    )
-    fusion_report["starfusion"] = fusion_report[["starfusion"]].apply(
-        replace_value_with_column_name, args=("true", "starfusion"), axis=1
-    )
-    fusion_report["FOUND_IN"] = fusion_report[
-        ["arriba", "starfusion", "fusioncatcher"]
-    ].apply(concatenate_columns, axis=1)
-    fusion_report.columns = fusion_report.columns.str.upper()
-    fusion_report["FOUND_DB"] = fusion_report["FOUND_DB"].apply(
-        lambda x: ",".join(x) if len(x) > 0 else ""
-    )
-    fusion_report[["GeneA", "GeneB"]] = fusion_report["FUSION"].str.split(
-        "--", expand=True
+    peak = ""
+    if track_memory:
+        peak = f", peak memory {tracemalloc.get_traced_memory()[1] / 2**20:.1f} MiB"
+        tracemalloc.stop()
+    logger.info(
+        f"Parsed {len(fusion_report)} fusion-report rows from {fusionreport_file} "
+        f"in {time.perf_counter() - started:.3f} s{peak}"
     )
-
-    return fusion_report[
-        ["FUSION", "GeneA", "GeneB", "TOOLS_HITS", "SCORE", "FOUND_DB", "FOUND_IN"]
-    ].set_index(["FUSION"])
+    return fusion_report
 
 
 def read_fusionreport_csv(file: str) -> pd.DataFrame:
-    df = pd.read_csv(file)
-    columns_to_iterate = ["starfusion", "arriba", "fusioncatcher"]
-    for column in columns_to_iterate:
+    """
+    Read fusion-report CSV output and parse the breakpoints of each fusion. Breakpoints
+    are taken from the first tool column, in starfusion, arriba, fusioncatcher order,
+    holding a "position: chr:pos:strand#chr:pos:strand" entry. Strands are left empty
+    when absent.
+    """
+    df = read_table(file, FUSIONREPORT_CSV_COLUMNS, required=False)
+    breakpoints = pd.Series(np.nan, index=df.index, dtype=object)
+    for column in reversed(["starfusion", "arriba", "fusioncatcher"]):
         if column not in df.columns:
-            df[column] = ""
-    df[["starfusion", "arriba", "fusioncatcher"]] = df[
-        ["starfusion", "arriba", "fusioncatcher"]
-    ].astype("str")
-    for index, row in df.iterrows():
-        for column in columns_to_iterate:
-            cell_value = row[column]
-
-            if "#" in cell_value:
-                df.at[index, column] = df.at[index, column].split(",")[0]
-                df.at[index, column] = df.at[index, column].replace("position: ", "")
-                df.at[index, "A"] = df.at[index, column].split("#")[0]
-                df.at[index, "B"] = df.at[index, column].split("#")[1]
-                df.at[index, "ChromosomeA"] = df.at[index, "A"].split(":")[0]
-                df.at[index, "PosA"] = df.at[index, "A"].split(":")[1]
-                if "+" in df.at[index, "A"] or "-" in df.at[index, "A"]:
-                    df.at[index, "StrandA"] = df.at[index, "A"].split(":")[2]
-                else:
-                    df.at[index, "StrandA"] = ""
-
-                df.at[index, "ChromosomeB"] = df.at[index, "B"].split(":")[0]
-                df.at[index, "PosB"] = df.at[index, "B"].split(":")[1]
-                if "+" in df.at[index, "B"] or "-" in df.at[index, "B"]:
-                    df.at[index, "StrandB"] = df.at[index, "B"].split(":")[2]
-                else:
-                    df.at[index, "StrandB"] = ""
-
-                break
+            continue
+        cell = df[column].astype(str)
+        breakpoints = breakpoints.mask(
+            cell.str.contains("#", regex=False),
+            cell.str.split(",", n=1).str[0].str.replace("position: ", "", regex=False),
+        )
+    sides = breakpoints.str.extract(r"^(?P<A>[^#]*)#(?P<B>[^#]*)")
+    for side in ["A", "B"]:
+        parsed = sides[side].str.extract(
+            r"^(?P<chromosome>[^:]*):(?P<pos>[^:]*)(?::(?P<strand>[^:]*))?"
+        )
+        df[f"Chromosome{side}"] = parsed["chromosome"]
+        df[f"Pos{side}"] = parsed["pos"]
+        df[f"Strand{side}"] = (
+            parsed["strand"]
+            .where(sides[side].str.contains(r"[+-]", na=False), "")
+            .where(sides[side].notna())
+        )
     df[["GeneA", "GeneB"]] = df["Fusion"].str.split("--", expand=True)
-    df = df.set_index("Fusion")
-    df.to_csv("tmp.csv")
+    df = apply_schema(df.set_index("Fusion"))
     return df[
         [
             "GeneA",
@@ -473,119 +1557,548 @@ def column_manipulation(df: pd.DataFrame) -> pd.DataFrame:
     """
     Manipulate and prepare DataFrame for VCF file creation.
     """
-    df["ALT"] = ""
     df = df.reset_index()
     df["FORMAT"] = "GT:DV:RV:FFPM"
     df["ID"] = "."
     df["QUAL"] = "."
     df["FILTER"] = "PASS"
     df["REF"] = "N"
-    df["INFO"] = ""
-    df["Sample"] = ""
+    df = drop_categories(df)
     df["Strand1"] = df["Strand1"].astype(str)
-    df["JunctionReadCount"] = df["JunctionReadCount"].fillna(0).astype(int).astype(str)
-    df["SpanningFragCount"] = df["SpanningFragCount"].fillna(0).astype(int).astype(str)
+    # Missing counts, ids and positions are written as 0
+    for column in [
+        "JunctionReadCount",
+        "SpanningFragCount",
+        "Left_hgnc_id",
+        "Right_hgnc_id",
+        "Left_exon_number",
+        "Right_exon_number",
+        "Left_transcript_version",
+        "Right_transcript_version",
+        "PosA",
+        "PosB",
+    ]:
+        df[column] = df[column].fillna(0).astype(np.int64).astype(str)
     df["FFPM"] = df["FFPM"].fillna(0).astype(float).astype(str)
     df["ChromosomeA"] = df["ChromosomeA"].fillna(0).astype(str)
     df["ChromosomeB"] = df["ChromosomeB"].fillna(0).astype(str)
-    df["Left_hgnc_id"] = df["Left_hgnc_id"].fillna(0).astype(int).astype(str)
-    df["Right_hgnc_id"] = df["Right_hgnc_id"].fillna(0).astype(int).astype(str)
-    df["Left_exon_number"] = df["Left_exon_number"].fillna(0).astype(int).astype(str)
-    df["Right_exon_number"] = df["Right_exon_number"].fillna(0).astype(int).astype(str)
-    df["Left_transcript_version"] = (
-        df["Left_transcript_version"].fillna(0).astype(int).astype(str)
-    )
-    df["Right_transcript_version"] = (
-        df["Right_transcript_version"].fillna(0).astype(int).astype(str)
-    )
-    df["PosA"] = df["PosA"].fillna(0).astype(int).astype(str)
-    df["PosB"] = df["PosB"].fillna(0).astype(int).astype(str)
     df["PROT_FUSION_TYPE"] = df["PROT_FUSION_TYPE"].replace(".", "nan")
     df["CDS_LEFT_ID"] = df["CDS_LEFT_ID"].replace(".", "nan")
     df["CDS_RIGHT_ID"] = df["CDS_RIGHT_ID"].replace(".", "nan")
 
-    for index, row in df.iterrows():
-        if row["Strand1"] == "-" and row["Strand2"] == "-":
-            df.loc[index, "ALT"] = f'[{row["ChromosomeB"]}:{row["PosB"]}[N'
-        elif row["Strand1"] == "+" and row["Strand2"] == "-":
-            df.loc[index, "ALT"] = f'N]{row["ChromosomeB"]}:{row["PosB"]}]'
-        elif row["Strand1"] == "-" and row["Strand2"] == "+":
-            df.loc[index, "ALT"] = f'N]{row["ChromosomeB"]}:{row["PosB"]}]'
-        else:
-            df.loc[index, "ALT"] = f'N[{row["ChromosomeB"]}:{row["PosB"]}['
-
-        df.loc[index, "INFO"] = (
-            f"SVTYPE=BND;CHRA={row['ChromosomeA']};CHRB={row['ChromosomeB']};GENEA={row['GeneA']};GENEB={row['GeneB']};"
-            f"POSA={row['PosA']};POSB={row['PosB']};ORIENTATION={row['Strand1']},{row['Strand2']};FOUND_DB={row['FOUND_DB']};"
-            f"FOUND_IN={row['FOUND_IN']};TOOL_HITS={row['TOOLS_HITS']};SCORE={row['SCORE']};FRAME_STATUS={row['PROT_FUSION_TYPE']};"
-            f"TRANSCRIPT_ID_A={row['CDS_LEFT_ID']};TRANSCRIPT_ID_B={row['CDS_RIGHT_ID']};"
-            f"TRANSCRIPT_VERSION_A={row['Left_transcript_version']};TRANSCRIPT_VERSION_B={row['Right_transcript_version']};"
-            f"HGNC_ID_A={row['Left_hgnc_id']};HGNC_ID_B={row['Right_hgnc_id']};"
-            f"EXON_NUMBER_A={row['Left_exon_number']};EXON_NUMBER_B={row['Right_exon_number']};"
-            f"ANNOTATIONS={row['annots']}"
-        )
-        df.loc[index, "Sample"] = (
-            f"./1:{row['JunctionReadCount']}:{row['SpanningFragCount']}:{row['FFPM']}"
-        )
+    df["ALT"] = build_alt(df["Strand1"], df["Strand2"], df["ChromosomeB"], df["PosB"])
+    df["INFO"] = build_info(df)
+    df["Sample"] = (
+        "./1:"
+        + df["JunctionReadCount"]
+        + ":"
+        + df["SpanningFragCount"]
+        + ":"
+        + df["FFPM"]
+    )
 
     return df
 
 
-def write_vcf(df_to_print: pd.DataFrame, header: str, out_file: str) -> None:
+def build_alt(
+    strand1: pd.Series, strand2: pd.Series, chromosome_b: pd.Series, pos_b: pd.Series
+) -> pd.Series:
     """
-    Write a VCF file with a specified DataFrame, header, and output file path.
+    Build the breakend ALT notation from the strands of both fusion partners.
     """
-    df_to_print[
-        [
-            "ChromosomeA",
-            "PosA",
-            "ID",
-            "REF",
-            "ALT",
-            "QUAL",
-            "FILTER",
-            "INFO",
-            "FORMAT",
-            "Sample",
-        ]
-    ].to_csv(
-        path_or_buf=out_file, sep="\t", header=None, index=False, quoting=csv.QUOTE_NONE
+    mate = chromosome_b + ":" + pos_b
+    return pd.Series(
+        np.select(
+            [
+                (strand1 == "-") & (strand2 == "-"),
+                ((strand1 == "+") & (strand2 == "-"))
+                | ((strand1 == "-") & (strand2 == "+")),
+            ],
+            ["[" + mate + "[N", "N]" + mate + "]"],
+            default="N[" + mate + "[",
+        ),
+        index=mate.index,
+        dtype=object,
     )
 
-    with open(out_file, "r+") as f:
-        content = f.read()
-        f.seek(0, 0)
-        f.write(header.rstrip("\r\n") + "\n" + content)
+
+def build_info(df: pd.DataFrame) -> pd.Series:
+    """
+    Build the INFO column from whole-column string conversions, joining each
+    record's fields once instead of growing the string field by field.
+    """
+    orientation = df["Strand1"].astype(str) + "," + df["Strand2"].astype(str)
+    fields = [["SVTYPE=BND"] * len(df)]
+    for key, column in [
+        ("CHRA", "ChromosomeA"),
+        ("CHRB", "ChromosomeB"),
+        ("GENEA", "GeneA"),
+        ("GENEB", "GeneB"),
+        ("POSA", "PosA"),
+        ("POSB", "PosB"),
+        ("ORIENTATION", None),
+        ("FOUND_DB", "FOUND_DB"),
+        ("FOUND_IN", "FOUND_IN"),
+        ("TOOL_HITS", "TOOLS_HITS"),
+        ("SCORE", "SCORE"),
+        ("FRAME_STATUS", "PROT_FUSION_TYPE"),
+        ("TRANSCRIPT_ID_A", "CDS_LEFT_ID"),
+        ("TRANSCRIPT_ID_B", "CDS_RIGHT_ID"),
+        ("TRANSCRIPT_VERSION_A", "Left_transcript_version"),
+        ("TRANSCRIPT_VERSION_B", "Right_transcript_version"),
+        ("HGNC_ID_A", "Left_hgnc_id"),
+        ("HGNC_ID_B", "Right_hgnc_id"),
+        ("EXON_NUMBER_A", "Left_exon_number"),
+        ("EXON_NUMBER_B", "Right_exon_number"),
+        ("ANNOTATIONS", "annots"),
+    ]:
+        value = orientation if column is None else df[column].astype(str)
+        fields.append((key + "=" + value).to_numpy())
+    return pd.Series(
+        [";".join(record) for record in zip(*fields)], index=df.index, dtype=object
+    )
+
+
+def write_vcf(
+    df_to_print: pd.DataFrame,
+    header: str,
+    out_file: str,
+    index: bool = False,
+    chunk_size: int = 10000,
+    sample_columns: list = None,
+) -> None:
+    """
+    Stream a VCF file with a specified DataFrame, header, and output file path,
+    with one genotype column per entry of sample_columns (default "Sample").
+    Output paths ending in ".gz" are BGZF compressed, and can be tabix indexed
+    in the same pass. Indexed output is sorted by chromosome and position.
+    """
+    records = df_to_print[VCF_COLUMNS + (sample_columns or ["Sample"])]
+    if index:
+        records = sort_records(records)
+    write_vcf_text(
+        (
+            records.iloc[start : start + chunk_size].to_csv(
+                sep="\t", header=None, index=False, quoting=csv.QUOTE_NONE
+            )
+            for start in range(0, len(records), chunk_size)
+        ),
+        header,
+        out_file,
+        index,
+    )
+
+
+def sort_records(records: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sort VCF records by chromosome and position for tabix, keeping the order of ties.
+    """
+    return records.assign(
+        _pos=pd.to_numeric(records["PosA"], errors="coerce").fillna(0)
+    ).sort_values(["ChromosomeA", "_pos"], kind="stable")[records.columns]
+
+
+def write_vcf_text(chunks, header: str, out_file: str, index: bool = False) -> None:
+    """
+    Write a VCF from its header and an iterable of text chunks holding whole records,
+    already sorted by chromosome and position when a tabix index is written.
+    """
+    compressed = str(out_file).endswith(".gz")
+    if index and not compressed:
+        raise ValueError(f"Cannot tabix index uncompressed VCF output {out_file}")
+
+    tabix = TabixIndexer() if index else None
+    with BgzfWriter(out_file) if compressed else open(out_file, "wb") as f:
+        f.write((header.rstrip("\r\n") + "\n").encode())
+        for text in chunks:
+            if tabix is None:
+                f.write(text.encode())
+                continue
+            for line in text.splitlines(keepends=True):
+                chrom, pos, _ = line.split("\t", 2)
+                begin = f.tell()
+                f.write(line.encode())
+                tabix.add(chrom, int(pos), begin, f.tell())
+    if tabix is not None:
+        tabix.write(f"{out_file}.tbi")
+
+
+class BgzfWriter:
+    """
+    Minimal BGZF (blocked gzip) writer, readable by gzip, bgzip and tabix.
+    """
+
+    BLOCK_SIZE = 0xFF00
+    EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+    def __init__(self, path: str, level: int = 6) -> None:
+        self._handle = open(path, "wb")
+        self._level = level
+        self._buffer = bytearray()
+        self._block_address = 0
+
+    def __enter__(self) -> "BgzfWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def tell(self) -> int:
+        """
+        Return the virtual offset of the next byte written.
+        """
+        return (self._block_address << 16) | len(self._buffer)
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+        while len(self._buffer) >= self.BLOCK_SIZE:
+            self._write_block(bytes(self._buffer[: self.BLOCK_SIZE]))
+            del self._buffer[: self.BLOCK_SIZE]
+
+    def close(self) -> None:
+        if self._buffer:
+            self._write_block(bytes(self._buffer))
+            self._buffer.clear()
+        self._handle.write(self.EOF)
+        self._handle.close()
+
+    def _write_block(self, data: bytes) -> None:
+        compressor = zlib.compressobj(self._level, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+        block = (
+            struct.pack(
+                "<4BI2BH2BHH",
+                0x1F,
+                0x8B,
+                8,
+                4,
+                0,
+                0,
+                0xFF,
+                6,
+                ord("B"),
+                ord("C"),
+                2,
+                len(compressed) + 25,
+            )
+            + compressed
+            + struct.pack("<2I", zlib.crc32(data), len(data))
+        )
+        self._handle.write(block)
+        self._block_address += len(block)
+
+
+class TabixIndexer:
+    """
+    Build a tabix (.tbi) index for VCF records as they are written to a BGZF file.
+    Records must arrive grouped by chromosome and sorted by position.
+    """
+
+    def __init__(self) -> None:
+        self._names = []
+        self._references = []
+        self._last_pos = 0
+
+    def add(self, chrom: str, pos: int, begin: int, end: int) -> None:
+        """
+        Register a record at 1-based position pos spanning virtual offsets [begin, end).
+        """
+        if not self._names or self._names[-1] != chrom:
+            if chrom in self._names:
+                raise ValueError(f"VCF records for {chrom} are not contiguous")
+            self._names.append(chrom)
+            self._references.append({"bins": {}, "linear": [], "meta": [begin, end, 0]})
+            self._last_pos = 0
+        if pos < self._last_pos:
+            raise ValueError(f"VCF records for {chrom} are not sorted by position")
+        self._last_pos = pos
+
+        reference = self._references[-1]
+        start = max(pos - 1, 0)
+        chunks = reference["bins"].setdefault(reg2bin(start, start + 1), [])
+        if chunks and chunks[-1][1] == begin:
+            chunks[-1][1] = end
+        else:
+            chunks.append([begin, end])
+        linear = reference["linear"]
+        window = start >> 14
+        if len(linear) <= window:
+            linear.extend([None] * (window + 1 - len(linear)))
+        if linear[window] is None:
+            linear[window] = begin
+        reference["meta"][1] = end
+        reference["meta"][2] += 1
+
+    def write(self, path: str) -> None:
+        names = b"".join(name.encode() + b"\0" for name in self._names)
+        data = [
+            b"TBI\1",
+            struct.pack("<8i", len(self._names), 2, 1, 2, 0, ord("#"), 0, len(names)),
+            names,
+        ]
+        for reference in self._references:
+            bins = reference["bins"]
+            data.append(struct.pack("<i", len(bins) + 1))
+            for bin_id, chunks in sorted(bins.items()):
+                data.append(struct.pack("<Ii", bin_id, len(chunks)))
+                data.extend(struct.pack("<2Q", *chunk) for chunk in chunks)
+            begin, end, n_mapped = reference["meta"]
+            data.append(struct.pack("<Ii4Q", 37450, 2, begin, end, n_mapped, 0))
+            linear, previous = [], 0
+            for offset in reference["linear"]:
+                previous = previous if offset is None else offset
+                linear.append(previous)
+            data.append(struct.pack(f"<i{len(linear)}Q", len(linear), *linear))
+        data.append(struct.pack("<Q", 0))
+        with BgzfWriter(path) as f:
+            f.write(b"".join(data))
+
+
+def reg2bin(start: int, end: int) -> int:
+    """
+    Compute the smallest UCSC/tabix bin containing the 0-based interval [start, end).
+    """
+    end -= 1
+    for shift, offset in ((14, 4681), (17, 585), (20, 73), (23, 9), (26, 1)):
+        if start >> shift == end >> shift:
+            return offset + (start >> shift)
+    return 0
 
 
 def build_hgnc_dataframe(file: str) -> pd.DataFrame:
     """
-    Build a DataFrame from HGNC input file, extracting 'hgnc_id' and 'ensembl_gene_id' columns.
+    Build a DataFrame from HGNC input file, extracting 'hgnc_id' and 'ensembl_gene_id'
+    columns. A prebuilt HGNC lookup (see write_hgnc_index) is loaded instead of the TSV
+    when it is given directly or found up to date next to the TSV.
     """
-    df = pd.read_csv(file, sep="\t", low_memory=False)
+    index = find_hgnc_index(file)
+    if index is not None:
+        logger.info(f"Loading HGNC lookup from {index}")
+        return read_hgnc_index(index)
+    return read_hgnc_tsv(file)
+
+
+def read_hgnc_tsv(file: str) -> pd.DataFrame:
+    """
+    Read the HGNC complete set TSV, keeping 'hgnc_id', 'ensembl_gene_id' and 'symbol'.
+    """
+    df = read_table(file, HGNC_COLUMNS, sep="\t")
     df["hgnc_id"] = df["hgnc_id"].str.replace("HGNC:", "")
-    return df[["hgnc_id", "ensembl_gene_id", "symbol"]].dropna()
+    df = df[["hgnc_id", "ensembl_gene_id", "symbol"]].dropna()
+    df["hgnc_id"] = pd.to_numeric(df["hgnc_id"]).astype(SCHEMA["hgnc_id"])
+    return df
+
+
+def find_hgnc_index(file: str):
+    """
+    Return the HGNC lookup for an HGNC input path, or None to fall back to the TSV.
+    A lookup next to the TSV is only used when it was built from the same TSV
+    contents, so a lookup left over from an older HGNC release is never read.
+    """
+    path = Path(file)
+    if path.suffix == ".npz":
+        return path
+    index = path.with_suffix(".npz")
+    if not index.is_file():
+        return None
+    with np.load(index) as lookup:
+        source = str(lookup["source_sha256"]) if "source_sha256" in lookup else None
+    if source != file_digest(path):
+        logger.warning(f"Ignoring {index}, it was not built from the current {path}")
+        return None
+    return index
+
+
+def write_hgnc_index(hgnc_df: pd.DataFrame, out_file: str, source=None) -> None:
+    """
+    Save the HGNC lookup as fixed-width string arrays in an uncompressed .npz file,
+    keeping the row order of the TSV so merges against it are unchanged. The SHA-256
+    of the source TSV is stored alongside so find_hgnc_index can tell it is current.
+    """
+    arrays = {
+        column: hgnc_df[column].to_numpy(dtype=str)
+        for column in ["hgnc_id", "ensembl_gene_id", "symbol"]
+    }
+    if source is not None:
+        arrays["source_sha256"] = np.array(file_digest(source))
+    with open(out_file, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def read_hgnc_index(file: str) -> pd.DataFrame:
+    """
+    Load an HGNC lookup written by write_hgnc_index.
+    """
+    with np.load(file) as lookup:
+        return apply_schema(
+            pd.DataFrame(
+                {
+                    column: lookup[column].astype(object)
+                    for column in ["hgnc_id", "ensembl_gene_id", "symbol"]
+                }
+            )
+        )
 
 
 def build_gtf_dataframe(file: str) -> pd.DataFrame:
     """
     Build a DataFrame from GTF file converted in TSV, extracting relevant columns.
+    Only the GTF_TSV_COLUMNS are read.
     """
-    df = pd.read_csv(file, sep="\t")
+    df = read_table(file, GTF_TSV_COLUMNS, sep="\t")
     df[["fusion_dump", "Transcript_id"]] = df["transcript_id"].str.split(
         "^", expand=True
     )
     df[["orig_chromosome", "orig_start", "orig_end", "orig_dir"]] = df[
         "orig_coord_info"
     ].str.split(",", expand=True)
-    return df[
+    return apply_schema(df)[
         ["Transcript_id", "transcript_version", "exon_number", "orig_start", "orig_end"]
     ]
 
 
+def build_exon_index(file: str) -> "ExonIndex":
+    """
+    Build the exon interval index of a FusionInspector GTF file converted in TSV.
+    """
+    return ExonIndex(build_gtf_dataframe(file))
+
+
+class ExonIndex:
+    """
+    Sorted per-transcript interval index over the exons of the FusionInspector GTF.
+    Breakpoints are resolved to the exons containing them by binary search, giving
+    the same rows as merging every exon of the transcript and filtering on position.
+    """
+
+    def __init__(self, gtf_df: pd.DataFrame) -> None:
+        self.gtf_df = gtf_df.reset_index(drop=True)
+        transcripts = self.gtf_df["Transcript_id"].astype(object)
+        transcripts = transcripts.where(transcripts.notna(), np.nan)
+        self.transcripts = pd.Index(transcripts.unique(), dtype=object)
+        codes = self.transcripts.get_indexer(transcripts)
+        starts = self.gtf_df["orig_start"].fillna(0).astype(np.int64).to_numpy()
+        ends = self.gtf_df["orig_end"].fillna(0).astype(np.int64).to_numpy()
+        rows = np.arange(len(self.gtf_df))
+        # Exons without original coordinates match every breakpoint of their transcript
+        unplaced = (starts == 0) & (ends == 0)
+        order = np.argsort(codes[unplaced], kind="stable")
+        self.unplaced_codes = codes[unplaced][order]
+        self.unplaced_rows = rows[unplaced][order]
+
+        order = np.lexsort((starts[~unplaced], codes[~unplaced]))
+        self.codes = codes[~unplaced][order]
+        self.starts = starts[~unplaced][order]
+        self.ends = ends[~unplaced][order]
+        self.rows = rows[~unplaced][order]
+        # Composite (transcript, coordinate) keys keep each transcript in its own sorted
+        # block
+        self.span = int(self.ends.max(initial=0)) + 2
+        self.start_keys = self.codes * self.span + self.starts
+        self.reach_keys = self.codes * self.span + (
+            pd.Series(self.ends).groupby(self.codes).cummax().to_numpy(dtype=np.int64)
+        )
+
+    def resolve(
+        self, df: pd.DataFrame, transcript_column: str, pos_column: str
+    ) -> pd.DataFrame:
+        """
+        Append the GTF columns of the exons containing each breakpoint. Rows whose
+        transcript is absent from the GTF are kept once without exon data, rows whose
+        breakpoint lies outside every exon of a known transcript are dropped. Positions
+        are filled with 0.
+        """
+        transcripts = df[transcript_column].astype(object)
+        transcripts = transcripts.where(transcripts.notna(), np.nan)
+        codes = self.transcripts.get_indexer(transcripts)
+        positions = df[pos_column].fillna(0).astype(np.int64).to_numpy()
+        known = codes >= 0
+        queries = codes * self.span + np.minimum(positions, self.span - 1)
+
+        first = np.where(known, np.searchsorted(self.reach_keys, queries, "left"), 0)
+        last = np.where(known, np.searchsorted(self.start_keys, queries, "right"), 0)
+        query_rows, candidates = expand_ranges(first, last)
+        contained = self.ends[candidates] >= positions[query_rows]
+        query_rows = query_rows[contained]
+        gtf_rows = self.rows[candidates[contained]]
+
+        first = np.where(known, np.searchsorted(self.unplaced_codes, codes, "left"), 0)
+        last = np.where(known, np.searchsorted(self.unplaced_codes, codes, "right"), 0)
+        unplaced_query_rows, candidates = expand_ranges(first, last)
+
+        missing = np.flatnonzero(~known)
+        query_rows = np.concatenate([query_rows, unplaced_query_rows, missing])
+        gtf_rows = np.concatenate(
+            [gtf_rows, self.unplaced_rows[candidates], np.full(len(missing), -1)]
+        )
+        order = np.lexsort((gtf_rows, query_rows))
+        query_rows, gtf_rows = query_rows[order], gtf_rows[order]
+
+        resolved = pd.concat(
+            [
+                df.take(query_rows).reset_index(drop=True),
+                self.gtf_df.reindex(gtf_rows).reset_index(drop=True),
+            ],
+            axis=1,
+        )
+        resolved[[pos_column, "orig_start", "orig_end"]] = (
+            resolved[[pos_column, "orig_start", "orig_end"]].fillna(0).astype(int)
+        )
+        return resolved
+
+
+def expand_ranges(first: np.ndarray, last: np.ndarray):
+    """
+    Expand the half-open ranges [first, last) into (range number, value) pairs.
+    """
+    counts = np.maximum(last - first, 0)
+    owners = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owners, first[owners] + offsets
+
+
 def main(argv=None):
     """Coordinate argument parsing and program execution."""
     args = parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="[%(levelname)s] %(message)s")
+    if args.build_hgnc_index:
+        if not args.hgnc or not args.hgnc.is_file():
+            logger.error(f"The given HGNC database {args.hgnc} was not found!")
+            sys.exit(2)
+        write_hgnc_index(
+            read_hgnc_tsv(args.hgnc), args.build_hgnc_index, source=args.hgnc
+        )
+        return
+    chunked = args.chunk_size is not None or args.max_memory is not None
+    if args.manifest:
+        if chunked:
+            logger.error(
+                "--chunk_size and --max_memory apply to single sample runs only"
+            )
+            sys.exit(2)
+        if (
+            not args.manifest.is_file()
+            or not args.hgnc
+            or not args.hgnc.is_file()
+            or not args.out
+        ):
+            logger.error(
+                f"The given manifest {args.manifest}, HGNC database {args.hgnc} or "
+                f"output directory {args.out} is missing!"
+            )
+            sys.exit(2)
+        vcf_collect_cohort(
+            args.manifest,
+            args.hgnc,
+            args.out,
+            args.workers,
+            args.tabix,
+            args.merged_vcf,
+            args.matrix,
+            args.profile or profiling_requested(),
+            ParseCache(args.cache_dir, args.cache_size),
+        )
+        return
     if (
         not args.fusioninspector.is_file()
         or not args.fusionreport.is_file()
@@ -597,15 +2110,75 @@ def main(argv=None):
             f"The given input file {args.fusioninspector} or {args.fusionreport} was not found!"
         )
         sys.exit(2)
-    vcf_collect(
-        args.fusioninspector,
-        args.fusionreport,
-        args.fusioninspector_gtf,
-        args.fusionreport_csv,
-        args.hgnc,
-        args.sample,
-        args.out,
-    )
+    if args.tabix and args.out.suffix != ".gz":
+        logger.error(f"Tabix indexing requires a .gz output path, got {args.out}")
+        sys.exit(2)
+    columnar = [
+        path
+        for path in [
+            args.fusioninspector,
+            args.fusioninspector_gtf,
+            args.fusionreport_csv,
+            args.hgnc,
+        ]
+        if path.suffix.lower() in COLUMNAR_READERS
+    ]
+    if (args.parquet or columnar) and importlib.util.find_spec("pyarrow") is None:
+        logger.error("Parquet and Arrow tables require pyarrow, which is not installed")
+        sys.exit(2)
+    if chunked and (args.parquet or args.fusioninspector in columnar):
+        logger.error(
+            "--chunk_size and --max_memory need a FusionInspector TSV and no "
+            "--parquet output"
+        )
+        sys.exit(2)
+    if args.chunk_size is not None and args.chunk_size < 1:
+        logger.error(f"--chunk_size must be positive, got {args.chunk_size}")
+        sys.exit(2)
+    monitor = StageMonitor(args.max_stage_memory)
+    cache = ParseCache(args.cache_dir, args.cache_size)
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler:
+        profiler.enable()
+    try:
+        if chunked:
+            vcf_collect_chunked(
+                args.fusioninspector,
+                args.fusionreport,
+                args.fusioninspector_gtf,
+                args.fusionreport_csv,
+                args.hgnc,
+                args.sample,
+                args.out,
+                args.tabix,
+                args.chunk_size,
+                args.max_memory,
+                monitor,
+                cache,
+            )
+        else:
+            vcf_collect(
+                args.fusioninspector,
+                args.fusionreport,
+                args.fusioninspector_gtf,
+                args.fusionreport_csv,
+                args.hgnc,
+                args.sample,
+                args.out,
+                args.tabix,
+                monitor,
+                args.parquet,
+                cache,
+            )
+    except MemoryError as error:
+        logger.error(error)
+        sys.exit(1)
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+    cache.log_stats()
+    if args.profile or profiling_requested():
+        monitor.write_profile(profile_path(args.out), args.sample, args.out)
 
 
 if __name__ == "__main__":
@@ -26,6 +26,12 @@ generated_parameters = {
         section_title=None,
         description='Skip visualisation steps',
     ),
+    'skip_preflight': NextflowParameter(
+        type=typing.Optional[bool],
+        default=None,
+        section_title=None,
+        description='Skip estimating the size of every sample from its FASTQ files, which scales the resources of the aligners and fusion callers',
+    ),
     'input': NextflowParameter(
         type=typing.Optional[LatchFile],
         default=None,
@@ -56,6 +62,18 @@ generated_parameters = {
         section_title=None,
         description='Specifies which analysis type for the pipeline - either build references or analyse data',
     ),
+    'convert2bed': NextflowParameter(
+        type=typing.Optional[bool],
+        default=None,
+        section_title=None,
+        description='Build the rRNA BED with convert2bed instead of using the BED written by RRNA_TRANSCRIPTS',
+    ),
+    'verify_reference_checksums': NextflowParameter(
+        type=typing.Optional[bool],
+        default=None,
+        section_title=None,
+        description='Also compare the SHA-256 checksums of the references reused from genomes_base with their manifests (REFERENCE_VERIFY), failing the run if any differs',
+    ),
     'cosmic_username': NextflowParameter(
         type=typing.Optional[str],
         default=None,
@@ -212,6 +230,12 @@ generated_parameters = {
         section_title=None,
         description='Path to HGNC timestamp file for database retrieval',
     ),
+    'hgnc_index': NextflowParameter(
+        type=typing.Optional[str],
+        default=None,
+        section_title=None,
+        description='Path to prebuilt HGNC lookup, used instead of hgnc_ref when present',
+    ),
     'qiagen': NextflowParameter(
         type=typing.Optional[bool],
         default=None,
@@ -266,6 +290,18 @@ generated_parameters = {
         section_title=None,
         description='Path to fusions to add to the input of fusioninspector',
     ),
+    'vcf_collect_batch_size': NextflowParameter(
+        type=typing.Optional[int],
+        default=None,
+        section_title=None,
+        description='Number of samples collected into VCFs per VCF_COLLECT task, 0 runs one task per sample',
+    ),
+    'vcf_collect_cache': NextflowParameter(
+        type=typing.Optional[str],
+        default=None,
+        section_title=None,
+        description='Directory caching the parsed VCF_COLLECT inputs across runs, so reruns only parse the inputs that changed',
+    ),
     'fastp_trim': NextflowParameter(
         type=typing.Optional[bool],
         default=None,
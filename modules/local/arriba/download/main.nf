@@ -2,18 +2,20 @@ process ARRIBA_DOWNLOAD {
     tag "arriba"
     label 'process_low'
 
-    conda "bioconda::gnu-wget=1.18"
+    conda "conda-forge::pandas=1.5.2"
     container "${ workflow.containerEngine == 'singularity' && !task.ext.singularity_pull_docker_container ?
-        'https://depot.galaxyproject.org/singularity/gnu-wget:1.18--h5bf99c6_5' :
-        'quay.io/biocontainers/gnu-wget:1.18--h5bf99c6_5' }"
+        'https://depot.galaxyproject.org/singularity/pandas:1.5.2' :
+        'quay.io/biocontainers/pandas:1.5.2' }"
 
     output:
     path "versions.yml"   , emit: versions
     path "*"              , emit: reference
 
-    script:
+    script: // This script is bundled with the pipeline, in nf-core/rnafusion/bin/
+    def args = task.ext.args ?: ''
+    def partial_dir = task.ext.partial_dir ? "--partial_dir ${task.ext.partial_dir}" : ''
     """
-    wget https://github.com/suhrig/arriba/releases/download/v2.4.0/arriba_v2.4.0.tar.gz -O arriba_v2.4.0.tar.gz
+    download_references.py https://github.com/suhrig/arriba/releases/download/v2.4.0/arriba_v2.4.0.tar.gz $partial_dir $args
     tar -xzvf arriba_v2.4.0.tar.gz
     rm arriba_v2.4.0.tar.gz
     mv arriba_v2.4.0/database/* .
@@ -21,7 +23,7 @@ process ARRIBA_DOWNLOAD {
 
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
-        wget: \$(echo wget -V 2>&1 | grep "GNU Wget" | cut -d" " -f3 > versions.yml)
+        python: \$(python --version | sed 's/Python //g')
     END_VERSIONS
     """
 
@@ -35,7 +37,7 @@ process ARRIBA_DOWNLOAD {
 
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
-        wget: \$(echo wget -V 2>&1 | grep "GNU Wget" | cut -d" " -f3 > versions.yml)
+        python: \$(python --version | sed 's/Python //g')
     END_VERSIONS
     """
 }
@@ -2,10 +2,10 @@ process ENSEMBL_DOWNLOAD {
     tag "ensembl"
     label 'process_low'
 
-    conda "bioconda::gnu-wget=1.18"
+    conda "conda-forge::pandas=1.5.2"
     container "${ workflow.containerEngine == 'singularity' && !task.ext.singularity_pull_docker_container ?
-        'https://depot.galaxyproject.org/singularity/gnu-wget:1.18--h5bf99c6_5' :
-        'quay.io/biocontainers/gnu-wget:1.18--h5bf99c6_5' }"
+        'https://depot.galaxyproject.org/singularity/pandas:1.5.2' :
+        'quay.io/biocontainers/pandas:1.5.2' }"
 
     input:
     val ensembl_version
@@ -20,24 +20,31 @@ process ENSEMBL_DOWNLOAD {
     path "versions.yml"                                                                                                                       , emit: versions
 
 
-    script:
+    script: // This script is bundled with the pipeline, in nf-core/rnafusion/bin/
+    def args = task.ext.args ?: ''
+    def partial_dir = task.ext.partial_dir ? "--partial_dir ${task.ext.partial_dir}" : ''
+    def base_url = "https://ftp.ensembl.org/pub/release-${ensembl_version}"
     """
-    wget ftp://ftp.ensembl.org/pub/release-${ensembl_version}/fasta/homo_sapiens/dna/Homo_sapiens.${params.genome}.dna.chromosome.{1..22}.fa.gz
-    wget ftp://ftp.ensembl.org/pub/release-${ensembl_version}/fasta/homo_sapiens/dna/Homo_sapiens.${params.genome}.dna.chromosome.{MT,X,Y}.fa.gz
-
-    wget ftp://ftp.ensembl.org/pub/release-${ensembl_version}/gtf/homo_sapiens/Homo_sapiens.${params.genome}.${ensembl_version}.gtf.gz
-    wget ftp://ftp.ensembl.org/pub/release-${ensembl_version}/gtf/homo_sapiens/Homo_sapiens.${params.genome}.${ensembl_version}.chr.gtf.gz
-    wget ftp://ftp.ensembl.org/pub/release-${ensembl_version}/fasta/homo_sapiens/cdna/Homo_sapiens.${params.genome}.cdna.all.fa.gz -O Homo_sapiens.${params.genome}.${ensembl_version}.cdna.all.fa.gz
+    download_references.py \\
+        ${base_url}/fasta/homo_sapiens/dna/Homo_sapiens.${params.genome}.dna.chromosome.{1..22}.fa.gz \\
+        ${base_url}/fasta/homo_sapiens/dna/Homo_sapiens.${params.genome}.dna.chromosome.{MT,X,Y}.fa.gz \\
+        ${base_url}/gtf/homo_sapiens/Homo_sapiens.${params.genome}.${ensembl_version}.gtf.gz \\
+        ${base_url}/gtf/homo_sapiens/Homo_sapiens.${params.genome}.${ensembl_version}.chr.gtf.gz \\
+        ${base_url}/fasta/homo_sapiens/cdna/Homo_sapiens.${params.genome}.cdna.all.fa.gz \\
+        --checksums ${base_url}/fasta/homo_sapiens/dna/CHECKSUMS \\
+        --checksums ${base_url}/gtf/homo_sapiens/CHECKSUMS \\
+        --checksums ${base_url}/fasta/homo_sapiens/cdna/CHECKSUMS \\
+        $partial_dir \\
+        $args
+    mv Homo_sapiens.${params.genome}.cdna.all.fa.gz Homo_sapiens.${params.genome}.${ensembl_version}.cdna.all.fa.gz
 
     gunzip -c Homo_sapiens.${params.genome}.dna.chromosome.* > Homo_sapiens.${params.genome}.${ensembl_version}.all.fa
     gunzip Homo_sapiens.${params.genome}.${ensembl_version}.gtf.gz
     gunzip Homo_sapiens.${params.genome}.${ensembl_version}.chr.gtf.gz
 
-
-
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
-        wget: \$(echo wget -V 2>&1 | grep "GNU Wget" | cut -d" " -f3 > versions.yml)
+        python: \$(python --version | sed 's/Python //g')
     END_VERSIONS
     """
 
@@ -50,7 +57,7 @@ process ENSEMBL_DOWNLOAD {
 
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
-        wget: \$(echo wget -V 2>&1 | grep "GNU Wget" | cut -d" " -f3 > versions.yml)
+        python: \$(python --version | sed 's/Python //g')
     END_VERSIONS
     """
 
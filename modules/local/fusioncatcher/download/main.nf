@@ -20,10 +20,10 @@ process FUSIONCATCHER_DOWNLOAD {
     def url = "http://sourceforge.net/projects/fusioncatcher/files/data/human_${human_version}.tar.gz.aa"
     """
     if wget --spider "$url" 2>/dev/null; then
-        wget $args $url
-        wget $args http://sourceforge.net/projects/fusioncatcher/files/data/human_${human_version}.tar.gz.ab
-        wget $args http://sourceforge.net/projects/fusioncatcher/files/data/human_${human_version}.tar.gz.ac
-        wget $args http://sourceforge.net/projects/fusioncatcher/files/data/human_${human_version}.tar.gz.ad
+        wget --continue --tries=10 $args $url
+        wget --continue --tries=10 $args http://sourceforge.net/projects/fusioncatcher/files/data/human_${human_version}.tar.gz.ab
+        wget --continue --tries=10 $args http://sourceforge.net/projects/fusioncatcher/files/data/human_${human_version}.tar.gz.ac
+        wget --continue --tries=10 $args http://sourceforge.net/projects/fusioncatcher/files/data/human_${human_version}.tar.gz.ad
         cat human_${human_version}.tar.gz.* | tar xz
         rm human_${human_version}.tar*
     else
@@ -0,0 +1,39 @@
+process HGNC_INDEX {
+    tag "hgnc"
+    label 'process_single'
+
+    conda "conda-forge::pandas=1.5.2"
+    container "${ workflow.containerEngine == 'singularity' && !task.ext.singularity_pull_docker_container ?
+        'https://depot.galaxyproject.org/singularity/pandas:1.5.2' :
+        'quay.io/biocontainers/pandas:1.5.2' }"
+
+    input:
+    path hgnc_ref
+
+    output:
+    path "*.npz"          , emit: hgnc_index
+    path "versions.yml"   , emit: versions
+
+    when:
+    task.ext.when == null || task.ext.when
+
+    script: // This script is bundled with the pipeline, in nf-core/rnafusion/bin/
+    """
+    vcf_collect.py --hgnc $hgnc_ref --build_hgnc_index ${hgnc_ref.baseName}.npz
+
+    cat <<-END_VERSIONS > versions.yml
+    "${task.process}":
+        python: \$(python --version | sed 's/Python //g')
+    END_VERSIONS
+    """
+
+    stub:
+    """
+    touch ${hgnc_ref.baseName}.npz
+
+    cat <<-END_VERSIONS > versions.yml
+    "${task.process}":
+        python: \$(python --version | sed 's/Python //g')
+    END_VERSIONS
+    """
+}
@@ -2,10 +2,10 @@ process HGNC_DOWNLOAD {
     tag "hgnc"
     label 'process_low'
 
-    conda "bioconda::gnu-wget=1.18"
+    conda "conda-forge::pandas=1.5.2"
     container "${ workflow.containerEngine == 'singularity' && !task.ext.singularity_pull_docker_container ?
-        'https://depot.galaxyproject.org/singularity/gnu-wget:1.18--h5bf99c6_5' :
-        'quay.io/biocontainers/gnu-wget:1.18--h5bf99c6_5' }"
+        'https://depot.galaxyproject.org/singularity/pandas:1.5.2' :
+        'quay.io/biocontainers/pandas:1.5.2' }"
 
     input:
 
@@ -16,14 +16,16 @@ process HGNC_DOWNLOAD {
     path "versions.yml"   , emit: versions
 
 
-    script:
+    script: // This script is bundled with the pipeline, in nf-core/rnafusion/bin/
+    def args = task.ext.args ?: ''
+    def partial_dir = task.ext.partial_dir ? "--partial_dir ${task.ext.partial_dir}" : ''
     """
-    wget https://ftp.ebi.ac.uk/pub/databases/genenames/hgnc/tsv/hgnc_complete_set.txt
+    download_references.py https://ftp.ebi.ac.uk/pub/databases/genenames/hgnc/tsv/hgnc_complete_set.txt $partial_dir $args
     date +%Y-%m-%d/%H:%M  > HGNC-DB-timestamp.txt
 
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
-        wget: \$(echo wget -V 2>&1 | grep "GNU Wget" | cut -d" " -f3 > versions.yml)
+        python: \$(python --version | sed 's/Python //g')
     END_VERSIONS
     """
 
@@ -34,7 +36,7 @@ process HGNC_DOWNLOAD {
 
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
-        wget: \$(echo wget -V 2>&1 | grep "GNU Wget" | cut -d" " -f3 > versions.yml)
+        python: \$(python --version | sed 's/Python //g')
     END_VERSIONS
     """
 
@@ -0,0 +1,47 @@
+process REFERENCE_MANIFEST {
+    tag "$component"
+    label 'process_medium'
+
+    conda "conda-forge::pandas=1.5.2"
+    container "${ workflow.containerEngine == 'singularity' && !task.ext.singularity_pull_docker_container ?
+        'https://depot.galaxyproject.org/singularity/pandas:1.5.2' :
+        'quay.io/biocontainers/pandas:1.5.2' }"
+
+    input:
+    tuple val(component), val(location), val(provenance), path(items, stageAs: 'items/*')
+
+    output:
+    path "${component}.json"  , emit: manifest
+    path "versions.yml"       , emit: versions
+
+    when:
+    task.ext.when == null || task.ext.when
+
+    script: // This script is bundled with the pipeline, in nf-core/rnafusion/bin/
+    def args = task.ext.args ?: ''
+    def provenance_args = provenance.collect { key, value -> "--provenance '${key}=${value}'" }.join(' ')
+    """
+    reference_manifest.py record items/* \\
+        --component $component \\
+        --location '$location' \\
+        $provenance_args \\
+        --threads $task.cpus \\
+        --out ${component}.json \\
+        $args
+
+    cat <<-END_VERSIONS > versions.yml
+    "${task.process}":
+        python: \$(python --version | sed 's/Python //g')
+    END_VERSIONS
+    """
+
+    stub:
+    """
+    touch ${component}.json
+
+    cat <<-END_VERSIONS > versions.yml
+    "${task.process}":
+        python: \$(python --version | sed 's/Python //g')
+    END_VERSIONS
+    """
+}
@@ -1,6 +1,6 @@
 process RRNA_TRANSCRIPTS {
     tag "$meta.id"
-    label 'process_single'
+    label 'process_low'
 
     conda "conda-forge::python=3.8.3"
 
@@ -14,6 +14,7 @@ process RRNA_TRANSCRIPTS {
 
     output:
         tuple val(meta), path("*rrna_intervals.gtf")   , emit: rrna_gtf
+        tuple val(meta), path("*rrna_intervals.bed")   , emit: rrna_bed
         path "versions.yml"                            , emit: versions
 
 
@@ -23,7 +24,9 @@ process RRNA_TRANSCRIPTS {
     script: // This script is bundled with the pipeline, in nf-core/rnafusion/bin/
     def prefix = task.ext.prefix ?: "${meta.id}"
     """
-    get_rrna_transcripts.py $gtf ${prefix}_rrna_intervals.gtf
+    get_rrna_transcripts.py $gtf ${prefix}_rrna_intervals.gtf \\
+        --bed ${prefix}_rrna_intervals.bed \\
+        --threads $task.cpus
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
         python: \$(python --version | sed 's/Python //g')
@@ -34,6 +37,7 @@ process RRNA_TRANSCRIPTS {
     def prefix = task.ext.prefix ?: "${meta.id}"
     """
     touch ${prefix}_rrna_intervals.gtf
+    touch ${prefix}_rrna_intervals.bed
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
         python: \$(python --version | sed 's/Python //g')
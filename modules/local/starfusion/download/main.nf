@@ -9,9 +9,12 @@ process STARFUSION_DOWNLOAD {
     path "ctat_genome_lib_build_dir/ref_annot.gtf", emit: chrgtf
 
 
-    script:
+    script: // This script is bundled with the pipeline, in nf-core/rnafusion/bin/
+    def args = task.ext.args ?: ''
+    def partial_dir = task.ext.partial_dir ? "--partial_dir ${task.ext.partial_dir}" : ''
+    def url = "https://data.broadinstitute.org/Trinity/CTAT_RESOURCE_LIB/__genome_libs_StarFv1.10/GRCh38_gencode_v37_CTAT_lib_Mar012021.plug-n-play.tar.gz"
     """
-    wget https://data.broadinstitute.org/Trinity/CTAT_RESOURCE_LIB/__genome_libs_StarFv1.10/GRCh38_gencode_v37_CTAT_lib_Mar012021.plug-n-play.tar.gz --no-check-certificate
+    download_references.py $url --checksums ${url}.md5 --no_check_certificate $partial_dir $args
 
     tar xvf GRCh38_gencode_v37_CTAT_lib_Mar012021.plug-n-play.tar.gz
 
@@ -0,0 +1,80 @@
+process VCF_COLLECT_BATCH {
+    tag "${metas.size()} samples"
+    label 'process_medium'
+
+    conda "conda-forge::pandas=1.5.2"
+    container "${ workflow.containerEngine == 'singularity' && !task.ext.singularity_pull_docker_container ?
+        'https://depot.galaxyproject.org/singularity/pandas:1.5.2' :
+        'quay.io/biocontainers/pandas:1.5.2' }"
+
+    input:
+    tuple val(metas), path(fusioninspector_tsv, stageAs: "fusioninspector*/*"), path(fusioninspector_gtf_tsv, stageAs: "gtf*/*"), path(fusionreport_report, stageAs: "fusionreport*/*"), path(fusionreport_csv, stageAs: "fusionreport_csv*/*")
+    tuple val(meta2),  path(hgnc_ref)
+    tuple val(meta3),  path(hgnc_date)
+
+    output:
+    path "versions.yml"                                , emit: versions
+    path "manifest.tsv"                                , emit: manifest
+    tuple val(metas), path("*_fusion_data.vcf.gz")     , emit: vcf
+    tuple val(metas), path("*_fusion_data.vcf.gz.tbi") , emit: tbi
+    tuple val(metas), path("*_cohort.vcf.gz")          , emit: merged_vcf
+    tuple val(metas), path("*_cohort.vcf.gz.tbi")      , emit: merged_tbi
+    tuple val(metas), path("*_cohort_matrix.npz")      , emit: matrix
+    tuple val(metas), path("*.profile.json")           , optional: true, emit: profile
+
+    when:
+    task.ext.when == null || task.ext.when
+
+    script:
+    def args = task.ext.args ?: ''
+    def cache = task.ext.cache_dir ? "--cache_dir ${task.ext.cache_dir}" : ''
+    // The prebuilt HGNC lookup is staged next to the TSV, vcf_collect.py only reads it if it was built from that TSV
+    def hgnc_tsv = [hgnc_ref].flatten().find { !it.name.endsWith('.npz') }
+    def prefix = task.ext.prefix ?: "${metas[0].id}"
+    def manifest = manifestLines(metas, fusioninspector_tsv, fusioninspector_gtf_tsv, fusionreport_report, fusionreport_csv)
+    """
+    printf '%s\\n' $manifest > manifest.tsv
+
+    vcf_collect.py --manifest manifest.tsv --hgnc $hgnc_tsv --out . --workers $task.cpus --tabix \\
+        --merged_vcf ${prefix}_cohort.vcf.gz \\
+        --matrix ${prefix}_cohort_matrix.npz \\
+        $cache \\
+        $args
+
+    cat <<-END_VERSIONS > versions.yml
+    "${task.process}":
+        python: \$(python --version | sed 's/Python //g')
+        HGNC DB retrieval: \$(cat $hgnc_date)
+    END_VERSIONS
+    """
+
+    stub:
+    def prefix = task.ext.prefix ?: "${metas[0].id}"
+    def manifest = manifestLines(metas, fusioninspector_tsv, fusioninspector_gtf_tsv, fusionreport_report, fusionreport_csv)
+    """
+    printf '%s\\n' $manifest > manifest.tsv
+    ${metas.collect { "echo \"\" | gzip > ${it.id}_fusion_data.vcf.gz; touch ${it.id}_fusion_data.vcf.gz.tbi" }.join('\n    ')}
+    echo "" | gzip > ${prefix}_cohort.vcf.gz
+    touch ${prefix}_cohort.vcf.gz.tbi
+    touch ${prefix}_cohort_matrix.npz
+
+    cat <<-END_VERSIONS > versions.yml
+    "${task.process}":
+        python: \$(python --version | sed 's/Python //g')
+    END_VERSIONS
+    """
+}
+
+//
+// Lines of the tab separated manifest of the samples of a batch, a header and one line per
+// sample, each quoted as one shell argument for printf
+//
+def manifestLines(metas, fusioninspector_tsv, fusioninspector_gtf_tsv, fusionreport_report, fusionreport_csv) {
+    def header = ['sample', 'fusioninspector', 'fusioninspector_gtf', 'fusionreport', 'fusionreport_csv']
+    // A batch of one sample stages single files rather than lists
+    def rows = [metas, fusioninspector_tsv, fusioninspector_gtf_tsv, fusionreport_report, fusionreport_csv]
+        .collect { it instanceof List ? it : [it] }
+        .transpose()
+        .collect { meta, tsv, gtf, report, csv -> [meta.id, tsv, gtf, report, csv] }
+    return ([header] + rows).collect { "'${it.join('\t')}'" }.join(' ')
+}
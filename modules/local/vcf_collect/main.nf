@@ -13,17 +13,23 @@ process VCF_COLLECT {
     tuple val(meta3),  path(hgnc_date)
 
     output:
-    path "versions.yml"              , emit: versions
-    tuple val(meta), path("*vcf.gz") , emit: vcf
+    path "versions.yml"                                    , emit: versions
+    tuple val(meta), path("*vcf.gz")                       , emit: vcf
+    tuple val(meta), path("*vcf.gz.tbi")                   , emit: tbi
+    tuple val(meta), path("*.parquet")     , optional: true, emit: parquet
+    tuple val(meta), path("*.profile.json"), optional: true, emit: profile
 
     when:
     task.ext.when == null || task.ext.when
 
     script:
+    def args = task.ext.args ?: ''
+    def cache = task.ext.cache_dir ? "--cache_dir ${task.ext.cache_dir}" : ''
+    // The prebuilt HGNC lookup is staged next to the TSV, vcf_collect.py only reads it if it was built from that TSV
+    def hgnc_tsv = [hgnc_ref].flatten().find { !it.name.endsWith('.npz') }
     def prefix = task.ext.prefix ?: "${meta.id}"
     """
-    vcf_collect.py --fusioninspector $fusioninspector_tsv --fusionreport $fusionreport_report --fusioninspector_gtf $fusioninspector_gtf_tsv --fusionreport_csv $fusionreport_csv --hgnc $hgnc_ref --sample ${prefix} --out ${prefix}_fusion_data.vcf
-    gzip ${prefix}_fusion_data.vcf
+    vcf_collect.py --fusioninspector $fusioninspector_tsv --fusionreport $fusionreport_report --fusioninspector_gtf $fusioninspector_gtf_tsv --fusionreport_csv $fusionreport_csv --hgnc $hgnc_tsv --sample ${prefix} --out ${prefix}_fusion_data.vcf.gz --tabix $cache $args
 
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
@@ -35,7 +41,8 @@ process VCF_COLLECT {
     stub:
     def prefix = task.ext.prefix ?: "${meta.id}"
     """
-    touch ${prefix}.vcf
+    echo "" | gzip > ${prefix}_fusion_data.vcf.gz
+    touch ${prefix}_fusion_data.vcf.gz.tbi
 
     cat <<-END_VERSIONS > versions.yml
     "${task.process}":
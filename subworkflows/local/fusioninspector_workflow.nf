@@ -2,6 +2,7 @@ include { AGAT_CONVERTSPGFF2TSV     }                     from '../../modules/nf
 include { ARRIBA_VISUALISATION     }                      from '../../modules/local/arriba/visualisation/main'
 include { CAT_CAT }                                       from '../../modules/nf-core/cat/cat/main'
 include { VCF_COLLECT }                                   from '../../modules/local/vcf_collect/main'
+include { VCF_COLLECT_BATCH }                             from '../../modules/local/vcf_collect/batch/main'
 include { FUSIONINSPECTOR     }                           from '../../modules/local/fusioninspector/main'
 
 workflow FUSIONINSPECTOR_WORKFLOW {
@@ -48,8 +49,16 @@ workflow FUSIONINSPECTOR_WORKFLOW {
         ch_versions = ch_versions.mix(AGAT_CONVERTSPGFF2TSV.out.versions)
 
         fusion_data = FUSIONINSPECTOR.out.tsv_coding_effect.join(AGAT_CONVERTSPGFF2TSV.out.tsv).join(fusionreport_out).join(fusionreport_csv)
-        VCF_COLLECT(fusion_data, ch_hgnc_ref, ch_hgnc_date)
-        ch_versions = ch_versions.mix(VCF_COLLECT.out.versions)
+        if (params.vcf_collect_batch_size > 0) {
+            fusion_batches = fusion_data
+                .collate(params.vcf_collect_batch_size)
+                .map { batch -> batch.transpose() }
+            VCF_COLLECT_BATCH(fusion_batches, ch_hgnc_ref, ch_hgnc_date)
+            ch_versions = ch_versions.mix(VCF_COLLECT_BATCH.out.versions)
+        } else {
+            VCF_COLLECT(fusion_data, ch_hgnc_ref, ch_hgnc_date)
+            ch_versions = ch_versions.mix(VCF_COLLECT.out.versions)
+        }
 
         if ((params.starfusion || params.all || params.stringtie) && !params.fusioninspector_only && !params.skip_vis) {
             ch_bam_sorted_indexed_fusions = bam_sorted_indexed.join(FUSIONINSPECTOR.out.tsv)
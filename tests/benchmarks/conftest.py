@@ -0,0 +1,90 @@
+"""
+Benchmarks of the bin/ scripts on synthetic inputs, run with pytest-benchmark:
+
+    python -m pytest tests/benchmarks --benchmark-autosave
+    python -m pytest tests/benchmarks --bench-fusions 1e2,1e4,1e6 --bench-gtf-lines 3.4e6 --benchmark-compare
+
+Every benchmark also records the peak traced memory of one extra run as the
+``peak_memory_mib`` extra info, which is saved and compared along with the timings.
+The directory is skipped when pytest-benchmark is not installed.
+"""
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "bin"))
+
+import synthetic  # noqa: E402
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    collect_ignore_glob = ["test_*.py"]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("rnafusion benchmarks")
+    group.addoption(
+        "--bench-fusions",
+        default="1e2,1e3",
+        help="Comma separated numbers of synthetic fusions to benchmark vcf_collect with (default 1e2,1e3).",
+    )
+    group.addoption(
+        "--bench-gtf-lines",
+        default="1e5",
+        help="Comma separated GTF sizes in lines to benchmark get_rrna_transcripts with, "
+        "3.4e6 is about a full human GTF (default 1e5).",
+    )
+    group.addoption(
+        "--bench-rounds", type=int, default=3, help="Timed rounds of every benchmark (default 3)."
+    )
+
+
+def parse_scales(value):
+    return [int(float(scale)) for scale in value.split(",") if scale]
+
+
+def pytest_generate_tests(metafunc):
+    if "n_fusions" in metafunc.fixturenames:
+        scales = parse_scales(metafunc.config.getoption("bench_fusions", "1e2,1e3"))
+        metafunc.parametrize("n_fusions", scales, ids=[f"{n:g}fusions" for n in scales], scope="session")
+    if "gtf_lines" in metafunc.fixturenames:
+        scales = parse_scales(metafunc.config.getoption("bench_gtf_lines", "1e5"))
+        metafunc.parametrize("gtf_lines", scales, ids=[f"{n:g}lines" for n in scales], scope="session")
+
+
+@pytest.fixture(scope="session")
+def fusion_inputs(n_fusions, tmp_path_factory):
+    """Synthetic vcf_collect inputs of one sample, generated once per scale."""
+    return synthetic.write_fusion_inputs(tmp_path_factory.mktemp(f"fusions_{n_fusions}"), n_fusions)
+
+
+@pytest.fixture(scope="session")
+def gtf(gtf_lines, tmp_path_factory):
+    """Synthetic Ensembl-like GTF, generated once per scale."""
+    return synthetic.write_gtf(tmp_path_factory.mktemp(f"gtf_{gtf_lines}") / "synthetic.gtf", gtf_lines)
+
+
+@pytest.fixture
+def measure(benchmark, request):
+    """
+    Benchmark a function, then run it once more under tracemalloc to record its peak
+    memory. Returns the result of the last run.
+    """
+
+    def run(function, *args, **kwargs):
+        benchmark.pedantic(
+            function, args=args, kwargs=kwargs, rounds=request.config.getoption("bench_rounds", 3), iterations=1
+        )
+        tracemalloc.start()
+        try:
+            result = function(*args, **kwargs)
+            benchmark.extra_info["peak_memory_mib"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        finally:
+            tracemalloc.stop()
+        return result
+
+    return run
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Synthetic inputs for the bin/ script benchmarks.
+
+Writes FusionInspector coding-effect TSVs, fusion-report index.html and CSV, FusionInspector
+(AGAT) GTF TSVs, HGNC complete set tables and Ensembl-like GTFs at any scale. Files are
+streamed row by row so full-genome scales do not need to fit in memory, and the same seed
+always gives the same files.
+
+Example: python tests/benchmarks/synthetic.py --fusions 1e6 --gtf-lines 3.4e6 --out synthetic/
+"""
+
+import argparse
+import csv
+import json
+import random
+from pathlib import Path
+
+CHROMOSOMES = [str(i) for i in range(1, 23)] + ["X", "Y", "MT"]
+TOOLS = ["arriba", "fusioncatcher", "starfusion"]
+FEATURES = ["gene", "transcript", "exon", "CDS", "start_codon", "stop_codon", "five_prime_utr", "three_prime_utr"]
+BIOTYPES = ["protein_coding"] * 90 + ["lncRNA"] * 7 + ["rRNA", "rRNA_pseudogene", "Mt_rRNA"]
+ANNOTATIONS = ['["INTRACHROMOSOMAL[chr1:0.5Mb]","Cosmic"]', "[]", '["ChimerKB"]', "."]
+
+FUSIONINSPECTOR_COLUMNS = [
+    "#FusionName",
+    "JunctionReadCount",
+    "SpanningFragCount",
+    "est_J",
+    "est_S",
+    "LeftGene",
+    "LeftLocalBreakpoint",
+    "LeftBreakpoint",
+    "RightGene",
+    "RightLocalBreakpoint",
+    "RightBreakpoint",
+    "SpliceType",
+    "LargeAnchorSupport",
+    "NumCounterFusionLeft",
+    "NumCounterFusionRight",
+    "FAR_left",
+    "FAR_right",
+    "LeftBreakDinuc",
+    "LeftBreakEntropy",
+    "RightBreakDinuc",
+    "RightBreakEntropy",
+    "FFPM",
+    "microh_brkpt_dist",
+    "num_microh_near_brkpt",
+    "annots",
+    "CDS_LEFT_ID",
+    "CDS_LEFT_RANGE",
+    "CDS_RIGHT_ID",
+    "CDS_RIGHT_RANGE",
+    "PROT_FUSION_TYPE",
+    "FUSION_MODEL",
+    "FUSION_CDS",
+    "FUSION_TRANSL",
+    "PFAM_LEFT",
+    "PFAM_RIGHT",
+]
+GTF_TSV_COLUMNS = [
+    "seqname",
+    "source_tag",
+    "primary_tag",
+    "start",
+    "end",
+    "score",
+    "strand",
+    "frame",
+    "gene_id",
+    "transcript_id",
+    "transcript_version",
+    "exon_number",
+    "orig_coord_info",
+]
+# The HGNC complete set columns, in release order; only a few carry synthetic values
+HGNC_COLUMNS = (
+    "hgnc_id symbol name locus_group locus_type status location location_sortable alias_symbol alias_name "
+    "prev_symbol prev_name gene_group gene_group_id date_approved_reserved date_symbol_changed "
+    "date_name_changed date_modified entrez_id ensembl_gene_id vega_id ucsc_id ena refseq_accession ccds_id "
+    "uniprot_ids pubmed_id mgd_id rgd_id lsdb cosmic omim_id mirbase homeodb snornabase bioparadigms_slc "
+    "orphanet pseudogene.org horde_id merops imgt iuphar kznf_gene_id mamit-trnadb cd lncrnadb enzyme_id "
+    "intermediate_filament_db agr mane_select gencc"
+).split()
+
+
+def write_fusion_inputs(out_dir, n_fusions, seed=0, exons_per_transcript=6):
+    """
+    Write the vcf_collect inputs of one sample with about n_fusions fusions.
+
+    Most fusions are in both FusionInspector and fusion-report, some in only one of them,
+    so every merge branch of vcf_collect is exercised. Returns the paths keyed like the
+    vcf_collect.py options.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rnd = random.Random(seed)
+    n_fusions = int(n_fusions)
+    n_genes = max(20, n_fusions // 2)
+    paths = {
+        "fusioninspector": out_dir / "fusioninspector.FusionInspector.fusions.abridged.coding_effect.tsv",
+        "fusioninspector_gtf": out_dir / "fusioninspector.gtf.tsv",
+        "fusionreport": out_dir / "index.html",
+        "fusionreport_csv": out_dir / "fusionreport.fusions.csv",
+        "hgnc": out_dir / "hgnc_complete_set.txt",
+    }
+    write_hgnc(paths["hgnc"], n_genes)
+
+    with open(paths["fusioninspector"], "w", newline="") as fi, open(
+        paths["fusioninspector_gtf"], "w", newline=""
+    ) as gtf, open(paths["fusionreport_csv"], "w", newline="") as report_csv, open(
+        paths["fusionreport"], "w"
+    ) as html:
+        fi_writer = csv.DictWriter(fi, FUSIONINSPECTOR_COLUMNS, delimiter="\t")
+        gtf_writer = csv.writer(gtf, delimiter="\t")
+        csv_writer = csv.DictWriter(report_csv, ["Fusion", "arriba", "fusioncatcher", "starfusion"])
+        fi_writer.writeheader()
+        gtf_writer.writerow(GTF_TSV_COLUMNS)
+        csv_writer.writeheader()
+        html.write("<html>\n<body>\n")
+        html.write('<script type="text/javascript" name="fusion_list">')
+        html.write('const fusions = {"name": "fusion_list", "rows": [')
+
+        written = set()
+        first_row = True
+        for k in range(n_fusions):
+            gene_a, gene_b = rnd.sample(range(n_genes), 2)
+            fusion = f"GENE{gene_a}--GENE{gene_b}"
+            if fusion in written:
+                continue
+            written.add(fusion)
+            chrom_a, chrom_b = rnd.choice(CHROMOSOMES), rnd.choice(CHROMOSOMES)
+            pos_a, pos_b = rnd.randint(1000, 10**8), rnd.randint(1000, 10**8)
+            strand_a, strand_b = rnd.choice("+-"), rnd.choice("+-")
+            in_fusioninspector = rnd.random() < 0.8
+            in_fusionreport = rnd.random() < 0.9 or not in_fusioninspector
+            transcript_a, transcript_b = f"ENST{2 * k:011d}", f"ENST{2 * k + 1:011d}"
+
+            if in_fusioninspector:
+                cds = "".join(rnd.choices("ACGT", k=rnd.randint(300, 3000)))
+                for _ in range(rnd.choice([1, 1, 2])):
+                    fi_writer.writerow(
+                        {
+                            "#FusionName": fusion,
+                            "JunctionReadCount": rnd.randint(0, 100),
+                            "SpanningFragCount": rnd.randint(0, 50),
+                            "est_J": 1.0,
+                            "est_S": 0.0,
+                            "LeftGene": f"GENE{gene_a}^{ensembl_gene_id(gene_a) if rnd.random() < 0.9 else 'ENSG.1'}",
+                            "LeftLocalBreakpoint": 1,
+                            "LeftBreakpoint": f"chr{chrom_a}:{pos_a}:{strand_a}",
+                            "RightGene": f"GENE{gene_b}^{ensembl_gene_id(gene_b)}",
+                            "RightLocalBreakpoint": 2,
+                            "RightBreakpoint": f"chr{chrom_b}:{pos_b}:{strand_b}",
+                            "SpliceType": "ONLY_REF_SPLICE",
+                            "LargeAnchorSupport": "YES_LDAS",
+                            "NumCounterFusionLeft": rnd.randint(0, 10),
+                            "NumCounterFusionRight": rnd.randint(0, 10),
+                            "FAR_left": round(rnd.random() * 50, 2),
+                            "FAR_right": round(rnd.random() * 50, 2),
+                            "LeftBreakDinuc": "GT",
+                            "LeftBreakEntropy": 1.8,
+                            "RightBreakDinuc": "AG",
+                            "RightBreakEntropy": 1.9,
+                            "FFPM": round(rnd.random() * 10, 4),
+                            "microh_brkpt_dist": rnd.randint(0, 500),
+                            "num_microh_near_brkpt": rnd.randint(0, 3),
+                            "annots": rnd.choice(ANNOTATIONS),
+                            "CDS_LEFT_ID": transcript_a if rnd.random() < 0.8 else ".",
+                            "CDS_LEFT_RANGE": "1-150",
+                            "CDS_RIGHT_ID": transcript_b if rnd.random() < 0.8 else ".",
+                            "CDS_RIGHT_RANGE": "151-300",
+                            "PROT_FUSION_TYPE": rnd.choice(["INFRAME", "FRAMESHIFT", "."]),
+                            "FUSION_MODEL": f"chr{chrom_a}|+|[0]{pos_a - 150}-{pos_a}[0]<==>"
+                            f"chr{chrom_b}|+|[0]{pos_b}-{pos_b + 150}[0]",
+                            "FUSION_CDS": cds,
+                            "FUSION_TRANSL": "M" + "".join(rnd.choices("ACDEFGHIKLMNPQRSTVWY", k=len(cds) // 3)),
+                            "PFAM_LEFT": ".",
+                            "PFAM_RIGHT": "PF00069|Pkinase|1-270|1.2e-60",
+                        }
+                    )
+                for transcript, chrom, pos in ((transcript_a, chrom_a, pos_a), (transcript_b, chrom_b, pos_b)):
+                    start = pos - rnd.randint(0, 20000)
+                    for exon in range(1, exons_per_transcript + 1):
+                        exon_start = start + (exon - 1) * 5000
+                        gtf_writer.writerow(
+                            [
+                                fusion,
+                                "FusionInspector",
+                                "exon",
+                                exon_start,
+                                exon_start + 3000,
+                                ".",
+                                "+",
+                                ".",
+                                f"{fusion}^{transcript.replace('ENST', 'ENSG')}",
+                                f"{fusion}^{transcript}",
+                                rnd.choice([1, 2, 3]),
+                                exon,
+                                f"chr{chrom},{exon_start},{exon_start + 3000},+",
+                            ]
+                        )
+
+            if in_fusionreport:
+                row = {"fusion": fusion}
+                row.update({tool: rnd.choice(["true", "false"]) for tool in TOOLS if rnd.random() < 0.9})
+                row["found_db"] = rnd.choice([[], ["mitelman"], ["cosmic", "mitelman"]])
+                row["tools_hits"] = rnd.randint(1, 3)
+                row["score"] = round(rnd.random(), 3)
+                html.write(("" if first_row else ", ") + json.dumps(row))
+                first_row = False
+                row = {"Fusion": fusion}
+                for tool in TOOLS:
+                    draw = rnd.random()
+                    if draw < 0.2:
+                        row[tool] = f"position: {chrom_a}:{pos_a}#{chrom_b}:{pos_b},junction: 3"
+                    elif draw < 0.4:
+                        row[tool] = f"position: {chrom_a}:{pos_a}:{strand_a}#{chrom_b}:{pos_b}:{strand_b},junction: 3"
+                    elif draw < 0.6:
+                        row[tool] = "true"
+                csv_writer.writerow(row)
+
+        html.write('], "tools": ["arriba", "fusioncatcher", "starfusion"]};</script>\n</body>\n</html>\n')
+    return paths
+
+
+def ensembl_gene_id(gene):
+    """Ensembl gene id of a synthetic gene."""
+    return f"ENSG{gene:011d}"
+
+
+def write_hgnc(path, n_genes):
+    """
+    Write an HGNC complete set table for the synthetic genes. Every 13th gene is left out
+    and every 7th has no Ensembl id, so lookups by symbol and misses are exercised too.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, HGNC_COLUMNS, delimiter="\t", restval="")
+        writer.writeheader()
+        for gene in range(n_genes):
+            if gene % 13 == 0:
+                continue
+            row = {column: f"{column}_{gene}" for column in HGNC_COLUMNS[6:]}
+            row.update(
+                {
+                    "hgnc_id": f"HGNC:{gene + 1}",
+                    "symbol": f"GENE{gene}",
+                    "name": f"synthetic gene {gene}",
+                    "locus_group": "protein-coding gene",
+                    "locus_type": "gene with protein product",
+                    "status": "Approved",
+                    "entrez_id": gene + 1,
+                    "ensembl_gene_id": ensembl_gene_id(gene) if gene % 7 else "",
+                }
+            )
+            writer.writerow(row)
+    return Path(path)
+
+
+def write_gtf(path, n_lines, seed=0):
+    """
+    Write an Ensembl-like GTF of n_lines records (3.4e6 is about a full human GTF),
+    a few percent of them with rRNA, Mt_rRNA or rRNA_pseudogene transcript biotypes.
+    """
+    rnd = random.Random(seed)
+    with open(path, "w") as f:
+        f.write("#!genome-build GRCh38.p14\n#!genome-version GRCh38\n")
+        for i in range(int(n_lines)):
+            biotype = rnd.choice(BIOTYPES)
+            start = rnd.randint(1, 2 * 10**8)
+            f.write(
+                f"{rnd.choice(CHROMOSOMES)}\tensembl_havana\t{rnd.choice(FEATURES)}\t{start}\t"
+                f"{start + rnd.randint(50, 5000)}\t.\t{rnd.choice('+-')}\t.\t"
+                f'gene_id "ENSG{i:011d}"; gene_version "5"; transcript_id "ENST{i:011d}"; '
+                f'transcript_version "2"; exon_number "3"; gene_name "GENE{i}"; '
+                f'gene_source "ensembl_havana"; gene_biotype "{biotype}"; '
+                f'transcript_name "GENE{i}-201"; transcript_source "ensembl_havana"; '
+                f'transcript_biotype "{biotype}"; exon_id "ENSE{i:011d}"; exon_version "1"; '
+                f'tag "basic"; transcript_support_level "1";\n'
+            )
+    return Path(path)
+
+
+def parse_args(argv=None):
+    """Define and immediately parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Write synthetic inputs for the bin/ script benchmarks.")
+    parser.add_argument("--fusions", type=float, default=1e3, help="Number of fusions (default 1e3).")
+    parser.add_argument("--gtf-lines", type=float, default=0, help="Also write a GTF with this many lines.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default 0).")
+    parser.add_argument("--out", type=Path, required=True, help="Output directory.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Coordinate argument parsing and program execution."""
+    args = parse_args(argv)
+    write_fusion_inputs(args.out, args.fusions, args.seed)
+    if args.gtf_lines:
+        write_gtf(args.out / "synthetic.gtf", args.gtf_lines, args.seed)
+
+
+if __name__ == "__main__":
+    main()
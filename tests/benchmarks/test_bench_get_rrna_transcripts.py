@@ -0,0 +1,28 @@
+"""
+Runtime and peak memory of get_rrna_transcripts.py on Ensembl-like GTFs.
+"""
+
+import gzip
+import shutil
+
+import pytest
+
+import get_rrna_transcripts
+
+
+@pytest.mark.parametrize("bed", [False, True], ids=["gtf", "gtf+bed"])
+def test_get_rrna_intervals(measure, gtf, tmp_path, bed):
+    measure(
+        get_rrna_transcripts.get_rrna_intervals,
+        gtf,
+        tmp_path / "rrna.gtf",
+        tmp_path / "rrna.bed" if bed else None,
+    )
+    assert (tmp_path / "rrna.gtf").stat().st_size
+
+
+def test_get_rrna_intervals_gzip(measure, gtf, tmp_path):
+    gtf_gz = tmp_path / "synthetic.gtf.gz"
+    with open(gtf, "rb") as f_in, gzip.open(gtf_gz, "wb", compresslevel=1) as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    measure(get_rrna_transcripts.get_rrna_intervals, gtf_gz, tmp_path / "rrna.gtf", tmp_path / "rrna.bed")
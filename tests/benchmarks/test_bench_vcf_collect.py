@@ -0,0 +1,82 @@
+"""
+Runtime and peak memory of vcf_collect.py, end to end and per public function.
+"""
+
+import pytest
+
+import vcf_collect
+
+FUSION_SOURCES = [
+    ("fusioninspector", vcf_collect.build_fusioninspector_dataframe),
+    ("fusionreport", vcf_collect.read_build_fusionreport),
+    ("fusionreport_csv", vcf_collect.read_fusionreport_csv),
+    ("hgnc", vcf_collect.build_hgnc_dataframe),
+    ("fusioninspector_gtf", vcf_collect.build_gtf_dataframe),
+]
+
+
+@pytest.fixture(scope="session")
+def records(fusion_inputs, tmp_path_factory):
+    """VCF records of the synthetic sample."""
+    return run_vcf_collect(fusion_inputs, tmp_path_factory.mktemp("records") / "sample.vcf")
+
+
+def run_vcf_collect(inputs, out_file, **kwargs):
+    return vcf_collect.vcf_collect(
+        inputs["fusioninspector"],
+        inputs["fusionreport"],
+        inputs["fusioninspector_gtf"],
+        inputs["fusionreport_csv"],
+        inputs["hgnc"],
+        "sample",
+        out_file,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("source,reader", FUSION_SOURCES, ids=[source for source, _ in FUSION_SOURCES])
+def test_read(measure, fusion_inputs, source, reader):
+    assert len(measure(reader, fusion_inputs[source]))
+
+
+def test_exon_index(measure, fusion_inputs):
+    gtf_df = vcf_collect.build_gtf_dataframe(fusion_inputs["fusioninspector_gtf"])
+    measure(vcf_collect.ExonIndex, gtf_df)
+
+
+@pytest.mark.parametrize("out_name,tabix", [("sample.vcf", False), ("sample.vcf.gz", True)], ids=["plain", "bgzf"])
+def test_vcf_collect(measure, fusion_inputs, tmp_path, out_name, tabix):
+    assert len(measure(run_vcf_collect, fusion_inputs, tmp_path / out_name, tabix=tabix))
+
+
+@pytest.mark.parametrize("chunk_size", [100, 1000])
+def test_vcf_collect_chunked(measure, fusion_inputs, tmp_path, chunk_size):
+    measure(
+        vcf_collect.vcf_collect_chunked,
+        fusion_inputs["fusioninspector"],
+        fusion_inputs["fusionreport"],
+        fusion_inputs["fusioninspector_gtf"],
+        fusion_inputs["fusionreport_csv"],
+        fusion_inputs["hgnc"],
+        "sample",
+        tmp_path / "sample.vcf",
+        chunk_size=chunk_size,
+    )
+    assert (tmp_path / "sample.vcf").stat().st_size
+
+
+@pytest.mark.parametrize("out_name,tabix", [("sample.vcf", False), ("sample.vcf.gz", True)], ids=["plain", "bgzf"])
+def test_write_vcf(measure, records, tmp_path, out_name, tabix):
+    measure(vcf_collect.write_vcf, records, vcf_collect.header_def("sample"), tmp_path / out_name, index=tabix)
+
+
+def test_merge_cohort_records(measure, records):
+    cohort = {f"sample{i}": records.sample(frac=0.8, random_state=i) for i in range(4)}
+    sites, _ = measure(vcf_collect.merge_cohort_records, cohort)
+    assert len(sites)
+
+
+def test_write_cohort_matrix(measure, records, tmp_path):
+    cohort = {f"sample{i}": records.sample(frac=0.8, random_state=i) for i in range(4)}
+    sites, counts = vcf_collect.merge_cohort_records(cohort)
+    measure(vcf_collect.write_cohort_matrix, sites, counts, list(cohort), tmp_path / "matrix.npz")
@@ -0,0 +1,142 @@
+"""
+Runtime and peak memory of the vcf_collect.py kernels next to the implementations they
+replaced, on the same synthetic inputs. Every pair is also checked to give equal results.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import vcf_collect
+
+from test_bench_vcf_collect import run_vcf_collect
+
+
+@pytest.fixture(scope="session")
+def prepared(fusion_inputs, tmp_path_factory):
+    """VCF records of the synthetic sample, with the ALT, INFO and Sample columns removed."""
+    records = run_vcf_collect(fusion_inputs, tmp_path_factory.mktemp("prepared") / "sample.vcf")
+    return records, records.drop(columns=["ALT", "INFO", "Sample"])
+
+
+def iterrows_records(df):
+    """ALT, INFO and Sample columns built row by row, as before the columnar builders."""
+    df = df.copy()
+    df["ALT"] = ""
+    df["INFO"] = ""
+    df["Sample"] = ""
+    for index, row in df.iterrows():
+        if row["Strand1"] == "-" and row["Strand2"] == "-":
+            df.loc[index, "ALT"] = f'[{row["ChromosomeB"]}:{row["PosB"]}[N'
+        elif row["Strand1"] == "+" and row["Strand2"] == "-":
+            df.loc[index, "ALT"] = f'N]{row["ChromosomeB"]}:{row["PosB"]}]'
+        elif row["Strand1"] == "-" and row["Strand2"] == "+":
+            df.loc[index, "ALT"] = f'N]{row["ChromosomeB"]}:{row["PosB"]}]'
+        else:
+            df.loc[index, "ALT"] = f'N[{row["ChromosomeB"]}:{row["PosB"]}['
+
+        df.loc[index, "INFO"] = (
+            f"SVTYPE=BND;CHRA={row['ChromosomeA']};CHRB={row['ChromosomeB']};GENEA={row['GeneA']};"
+            f"GENEB={row['GeneB']};POSA={row['PosA']};POSB={row['PosB']};"
+            f"ORIENTATION={row['Strand1']},{row['Strand2']};FOUND_DB={row['FOUND_DB']};"
+            f"FOUND_IN={row['FOUND_IN']};TOOL_HITS={row['TOOLS_HITS']};SCORE={row['SCORE']};"
+            f"FRAME_STATUS={row['PROT_FUSION_TYPE']};"
+            f"TRANSCRIPT_ID_A={row['CDS_LEFT_ID']};TRANSCRIPT_ID_B={row['CDS_RIGHT_ID']};"
+            f"TRANSCRIPT_VERSION_A={row['Left_transcript_version']};"
+            f"TRANSCRIPT_VERSION_B={row['Right_transcript_version']};"
+            f"HGNC_ID_A={row['Left_hgnc_id']};HGNC_ID_B={row['Right_hgnc_id']};"
+            f"EXON_NUMBER_A={row['Left_exon_number']};EXON_NUMBER_B={row['Right_exon_number']};"
+            f"ANNOTATIONS={row['annots']}"
+        )
+        df.loc[index, "Sample"] = f"./1:{row['JunctionReadCount']}:{row['SpanningFragCount']}:{row['FFPM']}"
+    return df[["ALT", "INFO", "Sample"]]
+
+
+def columnar_records(df):
+    """ALT, INFO and Sample columns built as in column_manipulation."""
+    return pd.DataFrame(
+        {
+            "ALT": vcf_collect.build_alt(df["Strand1"], df["Strand2"], df["ChromosomeB"], df["PosB"]),
+            "INFO": vcf_collect.build_info(df),
+            "Sample": "./1:" + df["JunctionReadCount"] + ":" + df["SpanningFragCount"] + ":" + df["FFPM"],
+        }
+    )
+
+
+@pytest.mark.benchmark(group="vcf_records")
+@pytest.mark.parametrize("builder", [iterrows_records, columnar_records], ids=["iterrows", "columnar"])
+def test_vcf_records(measure, prepared, builder):
+    records, df = prepared
+    built = measure(builder, df)
+    pd.testing.assert_frame_equal(built.astype(object), records[["ALT", "INFO", "Sample"]].astype(object))
+
+
+@pytest.fixture(scope="session")
+def breakpoints(prepared, fusion_inputs):
+    """Left breakpoints of the synthetic records, and copies moved off their exons, with the exon index."""
+    records, _ = prepared
+    exact = pd.DataFrame({"CDS_LEFT_ID": records["CDS_LEFT_ID"], "PosA": records["PosA"].astype(int)})
+    moved = exact.assign(PosA=exact["PosA"] + 5000)
+    df = pd.concat([exact, moved], ignore_index=True)
+    return df, vcf_collect.build_exon_index(fusion_inputs["fusioninspector_gtf"])
+
+
+def merge_filter_exons(df, exon_index):
+    """Exons containing each breakpoint by merging every exon of the transcript, then filtering."""
+    all_df = df.merge(exon_index.gtf_df, how="left", left_on="CDS_LEFT_ID", right_on="Transcript_id")
+    all_df[["PosA", "orig_start", "orig_end"]] = all_df[["PosA", "orig_start", "orig_end"]].fillna(0).astype(int)
+    return all_df[
+        ((all_df["PosA"] >= all_df["orig_start"]) & (all_df["PosA"] <= all_df["orig_end"]))
+        | ((all_df["orig_start"] == 0) & (all_df["orig_end"] == 0))
+    ].reset_index(drop=True)
+
+
+def index_exons(df, exon_index):
+    """Exons containing each breakpoint from the sorted interval index."""
+    return exon_index.resolve(df, "CDS_LEFT_ID", "PosA")
+
+
+@pytest.mark.benchmark(group="resolve_exons")
+@pytest.mark.parametrize("resolver", [merge_filter_exons, index_exons], ids=["merge_filter", "exon_index"])
+def test_resolve_exons(measure, breakpoints, resolver):
+    df, exon_index = breakpoints
+    resolved = measure(resolver, df, exon_index)
+    pd.testing.assert_frame_equal(resolved, merge_filter_exons(df, exon_index))
+
+
+@pytest.fixture(scope="session")
+def version_gaps(n_fusions):
+    """Exon numbers and transcript versions with gaps, several rows per breakpoint."""
+    rng = np.random.default_rng(n_fusions)
+    n_rows = 10 * n_fusions
+    df = pd.DataFrame(
+        {
+            "PosA": rng.integers(0, 2 * n_fusions, n_rows),
+            "exon_number": rng.integers(1, 30, n_rows).astype(float),
+            "transcript_version": rng.integers(1, 15, n_rows).astype(float),
+        }
+    )
+    df[["exon_number", "transcript_version"]] = df[["exon_number", "transcript_version"]].mask(
+        rng.random((n_rows, 2)) < 0.4
+    )
+    return df
+
+
+def lambda_fill(df):
+    """Gaps filled by a forward then backward fill of each group in Python, one column at a time."""
+    filled = pd.DataFrame(index=df.index)
+    for column in ["exon_number", "transcript_version"]:
+        filled[column] = df.groupby("PosA")[column].transform(lambda x: x.ffill().bfill())
+    return filled
+
+
+def grouped_fill(df):
+    """Gaps filled by the grouped ffill/bfill kernel."""
+    return vcf_collect.fill_within_groups(df, "PosA", ["exon_number", "transcript_version"])
+
+
+@pytest.mark.benchmark(group="fill_versions")
+@pytest.mark.parametrize("filler", [lambda_fill, grouped_fill], ids=["lambda", "grouped"])
+def test_fill_versions(measure, version_gaps, filler):
+    filled = measure(filler, version_gaps)
+    pd.testing.assert_frame_equal(filled, lambda_fill(version_gaps))
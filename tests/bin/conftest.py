@@ -0,0 +1,10 @@
+"""
+Unit tests of the bin/ scripts, on small inputs kept in tests/bin/data:
+
+    python -m pytest tests/bin
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "bin"))
@@ -0,0 +1,282 @@
+import hashlib
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import download_references as dl
+
+MIB = 2**20
+
+
+class Server:
+    """
+    Local stand-in for a reference host: serves files with byte ranges, keep-alive, an
+    optional redirect, and drops the first connections of a request when asked to.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        self.ranges = True
+        self.drop = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests.append((self.path, self.headers.get("Range")))
+                if self.path.startswith("/redirect/"):
+                    self.send_response(302)
+                    self.send_header("Location", self.path[len("/redirect") :])
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                data = server.files.get(self.path)
+                if data is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                match = re.fullmatch(r"bytes=(\d+)-(\d+)", self.headers.get("Range") or "")
+                if match and server.ranges:
+                    start, end = int(match.group(1)), min(int(match.group(2)), len(data) - 1)
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+                else:
+                    start, end = 0, len(data) - 1
+                    self.send_response(200)
+                body = data[start : end + 1]
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", f'"{hashlib.md5(data).hexdigest()}"')
+                self.end_headers()
+                with server.lock:
+                    drop = server.drop > 0 and len(body) > 1
+                    server.drop -= drop
+                if drop:
+                    # Send half of the body and hang up
+                    self.wfile.write(body[: len(body) // 2])
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def range_requests(self, path):
+        return [requested for served, requested in self.requests if served == path and requested != "bytes=0-0"]
+
+
+@pytest.fixture
+def server():
+    server = Server()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+def payload(size, seed=0):
+    return bytes((i * 7 + seed) % 251 for i in range(size))
+
+
+def test_parallel_ranges(server, tmp_path):
+    data = payload(5 * MIB + 123)
+    server.files["/ref/genome.fa.gz"] = data
+    report = dl.download([server.url("/ref/genome.fa.gz")], tmp_path, connections=4, chunk_size=MIB, delay=0)
+
+    assert (tmp_path / "genome.fa.gz").read_bytes() == data
+    assert not list(tmp_path.glob("*.part*"))
+    assert len(server.range_requests("/ref/genome.fa.gz")) == 6
+    assert report["files"][0]["fetched"] == len(data)
+    assert report["files"][0]["mib_per_second"] > 0
+    # Keep-alive connections are reused across the ranges
+    assert report["connections"] <= 4
+
+
+def test_resume_from_partial_file(server, tmp_path):
+    data = payload(4 * MIB, seed=1)
+    server.files["/genome.fa"] = data
+    url = server.url("/genome.fa")
+
+    remote = dl.probe(url)
+    item = dl.Download(url, tmp_path / "genome.fa", tmp_path, MIB)
+    item.open(remote)
+    pools = dl.Pools()
+    for chunk in item.chunks()[:3]:
+        item.fetch(pools, chunk)
+    item.close()
+    server.requests.clear()
+
+    report = dl.download([url], tmp_path, connections=2, chunk_size=MIB, delay=0)
+
+    assert (tmp_path / "genome.fa").read_bytes() == data
+    assert server.range_requests("/genome.fa") == [f"bytes={3 * MIB}-{4 * MIB - 1}"]
+    assert report["files"][0]["resumed"] == 3 * MIB
+    assert report["files"][0]["fetched"] == MIB
+
+
+def test_resume_in_new_out_dir(server, tmp_path):
+    # A retried task runs in a new work directory and resumes from the persistent partial_dir
+    data = payload(4 * MIB, seed=1)
+    server.files["/genome.fa"] = data
+    url = server.url("/genome.fa")
+
+    item = dl.Download(url, tmp_path / "attempt1" / "genome.fa", tmp_path / "partial", MIB)
+    item.open(dl.probe(url))
+    item.fetch(dl.Pools(), item.chunks()[0])
+    item.close()
+
+    (tmp_path / "attempt2").mkdir()
+    report = dl.download(
+        [url], tmp_path / "attempt2", partial_dir=tmp_path / "partial", connections=2, chunk_size=MIB, delay=0
+    )
+
+    assert (tmp_path / "attempt2" / "genome.fa").read_bytes() == data
+    assert report["files"][0]["resumed"] == MIB
+    assert not list((tmp_path / "partial").iterdir())
+
+def test_restart_when_remote_changed(server, tmp_path):
+    server.files["/genome.fa"] = payload(2 * MIB, seed=1)
+    url = server.url("/genome.fa")
+    item = dl.Download(url, tmp_path / "genome.fa", tmp_path, MIB)
+    item.open(dl.probe(url))
+    item.fetch(dl.Pools(), item.chunks()[0])
+    item.close()
+
+    data = payload(2 * MIB, seed=2)
+    server.files["/genome.fa"] = data
+    report = dl.download([url], tmp_path, connections=2, chunk_size=MIB, delay=0)
+
+    assert (tmp_path / "genome.fa").read_bytes() == data
+    assert report["files"][0]["resumed"] == 0
+
+
+def test_retry_dropped_connections(server, tmp_path):
+    data = payload(3 * MIB, seed=3)
+    server.files["/fusioncatcher.tar.gz.aa"] = data
+    server.drop = 2
+    dl.download([server.url("/fusioncatcher.tar.gz.aa")], tmp_path, connections=3, chunk_size=MIB, delay=0)
+
+    assert (tmp_path / "fusioncatcher.tar.gz.aa").read_bytes() == data
+    assert len(server.range_requests("/fusioncatcher.tar.gz.aa")) == 5
+
+
+def test_without_ranges(server, tmp_path):
+    data = payload(MIB + 1, seed=4)
+    server.files["/hgnc_complete_set.txt"] = data
+    server.ranges = False
+    dl.download([server.url("/hgnc_complete_set.txt")], tmp_path, chunk_size=MIB // 4, delay=0)
+
+    assert (tmp_path / "hgnc_complete_set.txt").read_bytes() == data
+    assert server.range_requests("/hgnc_complete_set.txt") == [None]
+
+
+def test_redirect(server, tmp_path):
+    data = payload(MIB, seed=5)
+    server.files["/release/arriba.tar.gz"] = data
+    dl.download([server.url("/redirect/release/arriba.tar.gz")], tmp_path, chunk_size=MIB // 2, delay=0)
+
+    assert (tmp_path / "arriba.tar.gz").read_bytes() == data
+
+
+def test_md5_checksums(server, tmp_path):
+    data = payload(MIB, seed=6)
+    server.files["/ctat.tar.gz"] = data
+    server.files["/ctat.tar.gz.md5"] = f"{hashlib.md5(data).hexdigest()}  ctat.tar.gz\n".encode()
+    checksums = dl.read_checksums([server.url("/ctat.tar.gz.md5"), server.url("/missing.md5")], delay=0)
+    report = dl.download([server.url("/ctat.tar.gz")], tmp_path, checksums=checksums, delay=0)
+
+    assert report["files"][0]["verified"]
+    # A verified file already in place is not downloaded again
+    server.requests.clear()
+    report = dl.download([server.url("/ctat.tar.gz")], tmp_path, checksums=checksums, delay=0)
+    assert report["skipped"] == ["ctat.tar.gz"]
+    assert server.range_requests("/ctat.tar.gz") == []
+
+
+def test_checksum_mismatch(server, tmp_path):
+    server.files["/ctat.tar.gz"] = payload(MIB, seed=7)
+    checksums = {"ctat.tar.gz": ("md5", "0" * 32)}
+    with pytest.raises(dl.DownloadError, match="md5 checksum"):
+        dl.download([server.url("/ctat.tar.gz")], tmp_path, checksums=checksums, delay=0)
+    assert not list(tmp_path.iterdir())
+
+
+def test_ensembl_checksums(server, tmp_path):
+    files = {f"Homo_sapiens.GRCh38.dna.chromosome.{n}.fa.gz": payload(300_000 + n, seed=n) for n in (1, 2)}
+    lines = []
+    for name, data in files.items():
+        server.files[f"/dna/{name}"] = data
+        (tmp_path / "expected").write_bytes(data)
+        lines.append(f"{dl.bsd_sum(tmp_path / 'expected')} {name}")
+    (tmp_path / "expected").unlink()
+    (tmp_path / "CHECKSUMS").write_text("\n".join(lines) + "\n")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+
+    report = dl.download(
+        [server.url(f"/dna/{name}") for name in files],
+        out_dir,
+        checksums=dl.read_checksums([str(tmp_path / "CHECKSUMS")]),
+        chunk_size=MIB // 8,
+        delay=0,
+    )
+
+    assert all(entry["verified"] for entry in report["files"])
+    for name, data in files.items():
+        assert (out_dir / name).read_bytes() == data
+
+
+def test_parse_checksums():
+    text = "\n".join(
+        [
+            "41240 2930 Homo_sapiens.GRCh38.102.gtf.gz",
+            f"{'a' * 32}  *ctat.tar.gz",
+            f"{'B' * 64}  dir/other.txt",
+            "not a checksum line",
+        ]
+    )
+    assert dl.parse_checksums(text) == {
+        "Homo_sapiens.GRCh38.102.gtf.gz": ("sum", "41240 2930"),
+        "ctat.tar.gz": ("md5", "a" * 32),
+        "other.txt": ("sha256", "b" * 64),
+    }
+    assert dl.parse_checksums(f"{'c' * 32}\n") == {"": ("md5", "c" * 32)}
+
+
+def test_main_report(server, tmp_path):
+    server.files["/hgnc_complete_set.txt"] = payload(1000)
+    argv = [server.url("/hgnc_complete_set.txt"), "--out_dir", str(tmp_path), "--report", str(tmp_path / "r.json")]
+    assert dl.main(argv) == 0
+    assert json.loads((tmp_path / "r.json").read_text())["files"][0]["size"] == 1000
+
+    with pytest.raises(SystemExit) as e:
+        dl.main([server.url("/missing.txt"), "--out_dir", str(tmp_path), "--retries", "0"])
+    assert e.value.code == 2
+
+
+def test_bsd_sum_without_binary(tmp_path, monkeypatch):
+    data = payload(3 * MIB + 17, seed=8) + bytes(range(256)) * 5
+    (tmp_path / "chromosome.fa.gz").write_bytes(data)
+    checksum = 0
+    for byte in data:
+        checksum = ((checksum >> 1) + ((checksum & 1) << 15) + byte) & 0xFFFF
+    expected = f"{checksum} {(len(data) + 1023) // 1024}"
+    if dl.shutil.which("sum"):
+        assert dl.bsd_sum(tmp_path / "chromosome.fa.gz") == expected
+
+    monkeypatch.setattr(dl.shutil, "which", lambda name: None)
+    assert dl.bsd_sum(tmp_path / "chromosome.fa.gz") == expected
@@ -0,0 +1,117 @@
+import gzip
+import json
+import random
+import struct
+import zlib
+
+import pytest
+
+import fastq_preflight as fp
+
+KIB = 2**10
+
+
+def fastq_records(n_reads, read_length, seed=0, length_jitter=0):
+    """Synthetic FASTQ text of n_reads reads with Illumina-like names and qualities."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(n_reads):
+        length = read_length - rng.randint(0, length_jitter)
+        seq = "".join(rng.choice("ACGT") for _ in range(length))
+        # Qualities may start with "@", the preflight must not take them for a header
+        qual = "".join(rng.choice("@ACFGHIJ#") for _ in range(length))
+        records.append(f"@A00123:8:H2YLLDSXY:1:1101:{1000 + i}:{2000 + i % 977} 1:N:0:ACGTACGT\n{seq}\n+\n{qual}\n")
+    return "".join(records).encode()
+
+
+def write_bgzf(path, data, block_size=60 * KIB):
+    """data as BGZF, gzip members of at most 64 KiB with their size in a BC extra field."""
+    with open(path, "wb") as f:
+        for start in range(0, len(data), block_size):
+            block = data[start : start + block_size]
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+            deflated = compressor.compress(block) + compressor.flush()
+            header = b"\x1f\x8b\x08\x04" + b"\x00" * 4 + b"\x00\xff" + struct.pack("<H", 6)
+            extra = b"BC" + struct.pack("<HH", 2, len(header) + 6 + len(deflated) + 8 - 1)
+            f.write(header + extra + deflated + struct.pack("<II", zlib.crc32(block), len(block)))
+        # BGZF end of file marker
+        f.write(bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000"))
+
+
+@pytest.fixture(scope="module")
+def reads():
+    return fastq_records(60_000, 100, seed=1, length_jitter=5)
+
+
+def assert_within(estimate, truth, error=fp.ESTIMATE_ERROR):
+    assert abs(estimate - truth) <= error * truth, f"{estimate} is not within {error:.0%} of {truth}"
+
+
+def test_gzip_estimate(tmp_path, reads):
+    fastq = tmp_path / "sample_1.fastq.gz"
+    fastq.write_bytes(gzip.compress(reads))
+    estimate = fp.estimate_file(fastq, sample_bytes=256 * KIB)
+
+    assert not estimate["bgzf"]
+    assert estimate["sampled_reads"] < 60_000
+    assert_within(estimate["reads"], 60_000)
+    assert_within(estimate["read_length"], (100 + 95) / 2)
+
+
+def test_bgzf_estimate(tmp_path, reads):
+    fastq = tmp_path / "sample_1.fastq.gz"
+    write_bgzf(fastq, reads)
+    estimate = fp.estimate_file(fastq, sample_bytes=64 * KIB, n_samples=8)
+
+    assert estimate["bgzf"]
+    assert_within(estimate["reads"], 60_000)
+
+
+def test_bgzf_samples_whole_file(tmp_path):
+    # Reads get longer along the file, only samples spread over it see that
+    data = fastq_records(20_000, 50, seed=2) + fastq_records(20_000, 150, seed=3)
+    fastq = tmp_path / "runs.fastq.gz"
+    write_bgzf(fastq, data)
+    truth = 20_000 * 50 + 20_000 * 150
+
+    estimate = fp.estimate_file(fastq, sample_bytes=64 * KIB, n_samples=16)
+    assert_within(estimate["bases"], truth, 0.1)
+
+
+def test_small_file_is_exact(tmp_path):
+    fastq = tmp_path / "tiny.fastq.gz"
+    fastq.write_bytes(gzip.compress(fastq_records(500, 76)))
+    estimate = fp.estimate_file(fastq)
+
+    assert estimate["reads"] == 500
+    assert estimate["bases"] == 500 * 76
+
+
+def test_resync_skips_partial_record():
+    data = fastq_records(10, 20, seed=4)
+    n_records, bases, _ = fp.count_records(data[37:], resync=True)
+    assert n_records == 9
+    assert bases == 9 * 20
+
+
+def test_preflight_tiers(tmp_path):
+    r1, r2 = tmp_path / "s_1.fastq.gz", tmp_path / "s_2.fastq.gz"
+    r1.write_bytes(gzip.compress(fastq_records(1000, 150, seed=5)))
+    r2.write_bytes(gzip.compress(fastq_records(1000, 150, seed=6)))
+    estimates = fp.preflight("s", [r1, r2])
+
+    assert estimates["reads"] == 1000
+    assert estimates["bases"] == 2 * 1000 * 150
+    assert estimates["tier"] == "small"
+    assert [fp.tier_of(bases) for bases in (1e9, 5e9, 20e9, 60e9)] == ["small", "medium", "large", "xlarge"]
+
+
+def test_main(tmp_path):
+    fastq = tmp_path / "s_1.fastq.gz"
+    fastq.write_bytes(gzip.compress(fastq_records(100, 50)))
+    assert fp.main([str(fastq), "--sample", "s", "--out", str(tmp_path / "s.json")]) == 0
+    assert json.loads((tmp_path / "s.json").read_text())["tier"] == "small"
+
+    with pytest.raises(SystemExit) as e:
+        fp.main([str(tmp_path / "missing.fastq.gz"), "--sample", "s", "--out", str(tmp_path / "m.json")])
+    assert e.value.code == 2
@@ -0,0 +1,73 @@
+import gzip
+
+import pytest
+
+import get_rrna_transcripts
+
+HEADER = b"#!genome-build GRCh38\n"
+CODING = b'1\tensembl\texon\t100\t200\t.\t+\t.\tgene_id "G1"; transcript_biotype "protein_coding";\n'
+RRNA = b'2\tensembl\texon\t5000\t5100\t.\t-\t.\tgene_id "G2"; transcript_biotype "rRNA";\n'
+# Matches both the # search and the biotype
+RRNA_HASH = b'1\tensembl\texon\t300\t400\t.\t+\t.\tgene_id "G3"; transcript_biotype "rRNA"; tag "#1";\n'
+MT_RRNA = b'MT\tensembl\texon\t10\t80\t.\t+\t.\tgene_id "G4"; transcript_biotype "Mt_rRNA";\n'
+OTHER_CHROMOSOME = b'X\tensembl\texon\t1\t50\t.\t+\t.\tgene_id "G6"; transcript_biotype "rRNA";\n'
+PSEUDOGENE = b'1\tensembl\texon\t250\t260\t.\t-\t.\tgene_id "G5"; transcript_biotype "rRNA_pseudogene";\n'
+
+GTF = HEADER + CODING + RRNA + RRNA_HASH + MT_RRNA + OTHER_CHROMOSOME + PSEUDOGENE
+
+
+@pytest.fixture
+def gtf(tmp_path):
+    """A small GTF, repeated so that it spans many ranges of a few bytes."""
+    gtf = tmp_path / "genes.gtf"
+    gtf.write_bytes(GTF * 20)
+    return gtf
+
+
+def get_rrna_intervals(file_in, out_dir, **kwargs):
+    out_dir.mkdir()
+    get_rrna_transcripts.get_rrna_intervals(file_in, out_dir / "rrna.gtf", out_dir / "rrna.bed", **kwargs)
+    return (out_dir / "rrna.gtf").read_bytes(), (out_dir / "rrna.bed").read_bytes()
+
+
+def test_get_rrna_intervals(tmp_path):
+    gtf = tmp_path / "genes.gtf"
+    gtf.write_bytes(GTF)
+    rrna_gtf, rrna_bed = get_rrna_intervals(gtf, tmp_path / "out")
+
+    assert rrna_gtf == RRNA + RRNA_HASH + MT_RRNA + PSEUDOGENE
+    assert [line.split(b"\t")[:9] for line in rrna_bed.splitlines()] == [
+        [b"1", b"249", b"260", b"G5", b".", b"-", b"ensembl", b"exon", b"."],
+        [b"1", b"299", b"400", b"G3", b".", b"+", b"ensembl", b"exon", b"."],
+        [b"2", b"4999", b"5100", b"G2", b".", b"-", b"ensembl", b"exon", b"."],
+        [b"MT", b"9", b"80", b"G4", b".", b"+", b"ensembl", b"exon", b"."],
+    ]
+    assert rrna_bed.splitlines()[1].split(b"\t")[9] == RRNA_HASH.split(b"\t")[8].rstrip(b"\n")
+
+
+@pytest.mark.parametrize("chunk_size", [5, 37, 1 << 20])
+def test_threads_match_single(gtf, tmp_path, chunk_size):
+    single = get_rrna_intervals(gtf, tmp_path / "single")
+    threaded = get_rrna_intervals(gtf, tmp_path / "threaded", threads=3, chunk_size=chunk_size)
+
+    assert threaded == single
+    assert single[0] == (RRNA + RRNA_HASH + MT_RRNA + PSEUDOGENE) * 20
+
+
+@pytest.mark.parametrize("chunk_size", [5, 1 << 20])
+def test_gzip(gtf, tmp_path, chunk_size):
+    gtf_gz = tmp_path / "genes.gtf.gz"
+    gtf_gz.write_bytes(gzip.compress(gtf.read_bytes()))
+
+    assert get_rrna_intervals(gtf_gz, tmp_path / "gzip", threads=3, chunk_size=chunk_size) == get_rrna_intervals(
+        gtf, tmp_path / "plain"
+    )
+
+
+def test_no_trailing_newline(tmp_path):
+    gtf = tmp_path / "genes.gtf"
+    gtf.write_bytes(GTF.rstrip(b"\n"))
+
+    for threads in [1, 2]:
+        rrna_gtf, _ = get_rrna_intervals(gtf, tmp_path / f"threads{threads}", threads=threads, chunk_size=7)
+        assert rrna_gtf == RRNA + RRNA_HASH + MT_RRNA + PSEUDOGENE.rstrip(b"\n")
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+import reference_manifest as rm
+
+PROVENANCE = {"genome": "GRCh38", "ensembl_version": "102"}
+
+
+@pytest.fixture
+def genomes_base(tmp_path):
+    """A genomes_base with the recorded manifests of a file component and a directory component."""
+    ensembl = tmp_path / "ensembl"
+    ensembl.mkdir()
+    (ensembl / "genome.fa").write_text(">1\nACGT\n")
+    (ensembl / "genes.gtf").write_text("1\tensembl\tgene\t1\t4\t.\t+\t.\tgene_id \"G1\";\n")
+    star = tmp_path / "star"
+    (star / "index" / "sub").mkdir(parents=True)
+    (star / "index" / "SA").write_bytes(b"\x00" * 1000)
+    (star / "index" / "sub" / "chrName.txt").write_text("1\n")
+
+    (tmp_path / rm.MANIFEST_DIR).mkdir()
+    rm.record(
+        "ensembl",
+        "ensembl",
+        [ensembl / "genome.fa", ensembl / "genes.gtf"],
+        PROVENANCE,
+        tmp_path / rm.MANIFEST_DIR / "ensembl.json",
+    )
+    rm.record("star", "star", [star / "index"], PROVENANCE, tmp_path / rm.MANIFEST_DIR / "star.json")
+    return tmp_path
+
+
+def verify(genomes_base, provenance=PROVENANCE, checksum=True):
+    return rm.verify(genomes_base, rm.read_manifests(genomes_base), provenance, checksum=checksum)
+
+
+def test_record(genomes_base):
+    manifest = json.loads((genomes_base / rm.MANIFEST_DIR / "star.json").read_text())
+    assert manifest["schema"] == rm.SCHEMA
+    assert manifest["provenance"] == PROVENANCE
+    assert manifest["items"]["index"]["type"] == "dir"
+    assert manifest["items"]["index"]["files"] == 2
+    assert manifest["items"]["index"]["size"] == 1002
+    ensembl = json.loads((genomes_base / rm.MANIFEST_DIR / "ensembl.json").read_text())
+    assert ensembl["items"]["genome.fa"] == {
+        "type": "file",
+        "size": 8,
+        "sha256": rm.file_digest(genomes_base / "ensembl" / "genome.fa"),
+    }
+
+
+def test_verify_valid(genomes_base):
+    assert verify(genomes_base) == {"ensembl": [], "star": []}
+
+
+def test_missing_item(genomes_base):
+    (genomes_base / "ensembl" / "genes.gtf").unlink()
+    assert verify(genomes_base) == {"ensembl": ["genes.gtf is missing"], "star": []}
+
+
+def test_size_mismatch(genomes_base):
+    (genomes_base / "star" / "index" / "SA").write_bytes(b"\x00" * 10)
+    problems = verify(genomes_base, checksum=False)
+    assert problems["ensembl"] == []
+    assert problems["star"] == ["index size is 12, not 1002"]
+
+
+def test_checksum_mismatch(genomes_base):
+    # Same sizes, different contents, only found by the checksums
+    (genomes_base / "ensembl" / "genome.fa").write_text(">1\nACGA\n")
+    (genomes_base / "star" / "index" / "sub" / "chrName.txt").write_text("2\n")
+    assert verify(genomes_base, checksum=False) == {"ensembl": [], "star": []}
+
+    problems = verify(genomes_base)
+    assert len(problems["ensembl"]) == 1 and problems["ensembl"][0].startswith("genome.fa sha256 is ")
+    assert len(problems["star"]) == 1 and problems["star"][0].startswith("index sha256 is ")
+
+
+def test_provenance_mismatch(genomes_base):
+    problems = verify(genomes_base, {"genome": "GRCh38", "ensembl_version": 110})
+    assert problems == {
+        "ensembl": ["ensembl_version is '102', not 110"],
+        "star": ["ensembl_version is '102', not 110"],
+    }
+    # Settings a component was not recorded with do not invalidate it
+    assert verify(genomes_base, {"read_length": 100}) == {"ensembl": [], "star": []}
+
+
+def test_main(genomes_base, tmp_path, capsys):
+    (genomes_base / "ensembl" / "genes.gtf").unlink()
+    valid = tmp_path / "valid.txt"
+    argv = ["verify", "--genomes_base", str(genomes_base), "--checksum", "--valid", str(valid)]
+    assert rm.main(argv + ["--provenance", "genome=GRCh38"]) == 1
+    assert valid.read_text() == "star\n"
+    assert "ensembl\tinvalid\tgenes.gtf is missing" in capsys.readouterr().out
+    assert rm.main(argv + ["star"]) == 0
+
+    with pytest.raises(SystemExit) as e:
+        rm.main(argv + ["--provenance", "genome"])
+    assert e.value.code == 2
+    with pytest.raises(SystemExit) as e:
+        rm.main(["record", str(tmp_path / "missing.fa"), "--component", "x", "--out", str(tmp_path / "x.json")])
+    assert e.value.code == 2
@@ -0,0 +1,170 @@
+import gzip
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+import vcf_collect
+
+DATA = Path(__file__).parent / "data" / "vcf_collect"
+
+STAGES = [
+    "read_fusioninspector",
+    "parse_fusionreport_html",
+    "load_hgnc",
+    "read_gtf",
+    "parse_fusionreport_csv",
+    "merge_hgnc",
+    "resolve_left_exons",
+    "resolve_right_exons",
+    "combine_fusionreport_csv",
+    "format_records",
+    "write_vcf",
+]
+
+
+def run_vcf_collect(out_file, collect=vcf_collect.vcf_collect, fusioninspector=None, **kwargs):
+    return collect(
+        fusioninspector or DATA / "fusioninspector.FusionInspector.fusions.abridged.coding_effect.tsv",
+        DATA / "index.html",
+        DATA / "fusioninspector.gtf.tsv",
+        DATA / "fusionreport.fusions.csv",
+        DATA / "hgnc_complete_set.txt",
+        "sample",
+        out_file,
+        **kwargs,
+    )
+
+
+def test_golden_vcf(tmp_path):
+    # sample.vcf was written by vcf_collect.py before any of the performance work
+    run_vcf_collect(tmp_path / "sample.vcf")
+    assert (tmp_path / "sample.vcf").read_bytes() == (DATA / "sample.vcf").read_bytes()
+
+
+def test_stage_records(tmp_path):
+    monitor = vcf_collect.StageMonitor(max_memory=1024)
+    records = run_vcf_collect(tmp_path / "sample.vcf", monitor=monitor)
+
+    assert [stage["name"] for stage in monitor.stages] == STAGES
+    assert not tracemalloc.is_tracing()
+    for stage in monitor.stages:
+        assert stage["rows"] >= 0
+        assert stage["wall_seconds"] >= 0 and stage["cpu_seconds"] >= 0
+        assert stage["max_rss_mib"] > 0
+        assert 0 <= stage["peak_traced_mib"] <= 1024
+    assert monitor.stages[-1]["rows"] == len(records) == 20
+
+
+def test_stage_over_budget(tmp_path):
+    monitor = vcf_collect.StageMonitor(max_memory=0.01)
+    try:
+        with pytest.raises(MemoryError, match="Stage read_fusioninspector peaked at .* above the budget of 0.01 MiB"):
+            run_vcf_collect(tmp_path / "sample.vcf", monitor=monitor)
+    finally:
+        monitor.stop()
+    assert [stage["name"] for stage in monitor.stages] == ["read_fusioninspector"]
+    assert not (tmp_path / "sample.vcf").exists()
+
+
+def test_stage_within_budget():
+    monitor = vcf_collect.StageMonitor(max_memory=64)
+    try:
+        with monitor.stage("allocate") as stage:
+            stage["rows"] = len(bytearray(8 * 2**20))
+    finally:
+        monitor.stop()
+    assert monitor.stages[0]["rows"] == 8 * 2**20
+    assert 8 <= monitor.stages[0]["peak_traced_mib"] <= 64
+
+
+def test_parse_cache(tmp_path):
+    cache = vcf_collect.ParseCache(tmp_path / "cache")
+    first = run_vcf_collect(tmp_path / "first.vcf", cache=cache)
+    assert (cache.hits, cache.misses) == (0, 5)
+
+    rerun = vcf_collect.ParseCache(tmp_path / "cache")
+    second = run_vcf_collect(tmp_path / "second.vcf", cache=rerun)
+    assert (rerun.hits, rerun.misses) == (5, 0)
+    assert (tmp_path / "first.vcf").read_bytes() == (tmp_path / "second.vcf").read_bytes()
+    assert first.equals(second)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [b"", b"not a pickle", b"\x80\x05\x95\x10\x00", b"\x80\x04cno_such_module\nParsed\n."],
+    ids=["empty", "garbage", "truncated", "unimportable"],
+)
+def test_parse_cache_bad_entry(tmp_path, content):
+    cache = vcf_collect.ParseCache(tmp_path / "cache")
+    file = DATA / "hgnc_complete_set.txt"
+    expected = cache.load("hgnc", file, vcf_collect.build_hgnc_dataframe)
+    (entry,) = (tmp_path / "cache").glob("hgnc-*.pkl")
+    entry.write_bytes(content)
+
+    rerun = vcf_collect.ParseCache(tmp_path / "cache")
+    assert rerun.load("hgnc", file, vcf_collect.build_hgnc_dataframe).equals(expected)
+    assert (rerun.hits, rerun.misses) == (0, 1)
+    # The bad entry was replaced by a readable one
+    again = vcf_collect.ParseCache(tmp_path / "cache")
+    assert again.load("hgnc", file, vcf_collect.build_hgnc_dataframe).equals(expected)
+    assert again.hits == 1
+
+
+@pytest.fixture(params=["fusioninspector", "header_only"])
+def fusioninspector(request, tmp_path):
+    """The FusionInspector TSV of the fixtures, or its header only, leaving the fusion-report fusions."""
+    tsv = DATA / "fusioninspector.FusionInspector.fusions.abridged.coding_effect.tsv"
+    if request.param == "fusioninspector":
+        return tsv
+    header_only = tmp_path / "header_only.tsv"
+    with open(tsv) as f:
+        header_only.write_text(f.readline())
+    return header_only
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1000])
+@pytest.mark.parametrize("out_name,tabix", [("sample.vcf", False), ("sample.vcf.gz", True)], ids=["plain", "bgzf"])
+def test_chunked_matches_single(tmp_path, fusioninspector, chunk_size, out_name, tabix):
+    (tmp_path / "single").mkdir()
+    (tmp_path / "chunked").mkdir()
+    records = run_vcf_collect(tmp_path / "single" / out_name, fusioninspector=fusioninspector, tabix=tabix)
+    run_vcf_collect(
+        tmp_path / "chunked" / out_name,
+        collect=vcf_collect.vcf_collect_chunked,
+        fusioninspector=fusioninspector,
+        tabix=tabix,
+        chunk_size=chunk_size,
+    )
+
+    assert len(records) > 1
+    if tabix:
+        single = gzip.decompress((tmp_path / "single" / out_name).read_bytes())
+        chunked = gzip.decompress((tmp_path / "chunked" / out_name).read_bytes())
+    else:
+        single = (tmp_path / "single" / out_name).read_bytes()
+        chunked = (tmp_path / "chunked" / out_name).read_bytes()
+    assert chunked == single
+
+
+def test_hgnc_index(tmp_path):
+    tsv = tmp_path / "hgnc_complete_set.txt"
+    tsv.write_bytes((DATA / "hgnc_complete_set.txt").read_bytes())
+    expected = vcf_collect.read_hgnc_tsv(tsv).reset_index(drop=True)
+    vcf_collect.main(["--hgnc", str(tsv), "--build_hgnc_index", str(tmp_path / "hgnc_complete_set.npz")])
+
+    assert vcf_collect.find_hgnc_index(tsv) == tmp_path / "hgnc_complete_set.npz"
+    assert vcf_collect.build_hgnc_dataframe(tsv).equals(expected)
+
+
+def test_hgnc_index_stale(tmp_path, caplog):
+    tsv = tmp_path / "hgnc_complete_set.txt"
+    tsv.write_bytes((DATA / "hgnc_complete_set.txt").read_bytes())
+    vcf_collect.main(["--hgnc", str(tsv), "--build_hgnc_index", str(tmp_path / "hgnc_complete_set.npz")])
+    # A newer HGNC release copied in after the lookup was built, whatever the mtimes say
+    lines = tsv.read_text().splitlines(keepends=True)
+    tsv.write_text("".join(lines[:1] + lines[2:]))
+
+    assert vcf_collect.find_hgnc_index(tsv) is None
+    assert "was not built from the current" in caplog.text
+    assert vcf_collect.build_hgnc_dataframe(tsv).equals(vcf_collect.read_hgnc_tsv(tsv))
@@ -0,0 +1,10 @@
+"""
+Unit tests of the Latch wrapper helpers in wf/ that do not need the Latch SDK:
+
+    python -m pytest tests/wf
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
@@ -0,0 +1,90 @@
+"""
+Live log uploads of wf/log_upload.py into a local directory standing in for the remote log
+directory.
+"""
+
+import time
+
+import pytest
+
+from wf.log_upload import LogUploader, directory_upload
+
+
+def parts(remote):
+    return sorted((remote / "nextflow.log.parts").glob("*.log"))
+
+
+def joined(remote):
+    return b"".join(part.read_bytes() for part in parts(remote))
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_uploads_new_lines_while_running(tmp_path):
+    log, remote = tmp_path / ".nextflow.log", tmp_path / "remote"
+    with LogUploader(log, directory_upload(remote), interval=0.02):
+        with open(log, "w") as f:
+            f.write("launching\n")
+            f.flush()
+            wait_for(lambda: joined(remote) == b"launching\n")
+            f.write("task 1 submitted\ntask 1 comp")
+            f.flush()
+            wait_for(lambda: len(parts(remote)) == 2)
+            # Only complete lines are uploaded while the log is written
+            assert joined(remote) == b"launching\ntask 1 submitted\n"
+            f.write("leted\nexecution complete")
+
+    assert joined(remote) == log.read_bytes() == (remote / "nextflow.log").read_bytes()
+    assert log.read_bytes().endswith(b"execution complete")
+
+
+def test_retries_failed_uploads(tmp_path):
+    log, remote = tmp_path / ".nextflow.log", tmp_path / "remote"
+    log.write_text("line 1\nline 2\n")
+    upload = directory_upload(remote)
+    calls = []
+
+    def flaky(src, name):
+        calls.append(name)
+        if len(calls) <= 2:
+            raise OSError("connection reset")
+        upload(src, name)
+
+    uploader = LogUploader(log, flaky, interval=0.01, max_interval=0.04)
+    assert not uploader.sync()
+    assert not uploader.sync()
+    assert uploader.sync()
+    assert (uploader.failures, uploader.parts) == (2, 1)
+    # The failed lines are sent again as the same part
+    assert calls == ["nextflow.log.parts/00001.log"] * 3
+    uploader.close()
+    assert joined(remote) == log.read_bytes()
+
+
+def test_backs_off_while_uploads_fail(tmp_path):
+    log = tmp_path / ".nextflow.log"
+    log.write_text("line\n")
+    calls = []
+
+    def failing(src, name):
+        calls.append(time.monotonic())
+        raise OSError("unavailable")
+
+    uploader = LogUploader(log, failing, interval=0.02, max_interval=0.16)
+    uploader.start()
+    wait_for(lambda: len(calls) >= 4)
+    with pytest.raises(OSError):
+        uploader.close()
+    gaps = [later - earlier for earlier, later in zip(calls, calls[1:4])]
+    assert gaps[1] > gaps[0] * 1.5 and gaps[2] > gaps[1] * 1.5
+
+
+def test_close_without_log(tmp_path):
+    remote = tmp_path / "remote"
+    LogUploader(tmp_path / ".nextflow.log", directory_upload(remote), interval=0.01).close()
+    assert not remote.exists()
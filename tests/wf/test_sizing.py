@@ -0,0 +1,109 @@
+"""
+Storage estimates of wf/sizing.py, and provisioning against a local stand-in of the Nextflow
+dispatcher.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from wf import sizing
+
+GIB = 2**30
+
+
+@pytest.fixture
+def samplesheet(tmp_path):
+    path = tmp_path / "samplesheet.csv"
+    path.write_text(
+        "sample,fastq_1,fastq_2,strandedness\n"
+        "a,a_1.fastq.gz,a_2.fastq.gz,forward\n"
+        "b,b_1.fastq.gz,b_2.fastq.gz,reverse\n"
+        "b,b_3.fastq.gz,,reverse\n"
+    )
+    return path
+
+
+@pytest.fixture
+def dispatcher():
+    """Stand-in dispatcher recording provision-storage requests, yields (url, requests)."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            received.append((self.path, self.headers["Authorization"], body))
+            payload = json.dumps({"name": f"pvc-{body['storage_gib']}"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}", received
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize(
+    "flags,tools",
+    [
+        ({}, ["fusionreport", "fusioninspector"]),
+        ({"arriba": True}, ["arriba", "fusionreport", "fusioninspector"]),
+        ({"all": True}, sizing.CALLERS + ["fusionreport", "fusioninspector"]),
+        ({"all": True, "fusioninspector_only": True}, ["fusioninspector"]),
+    ],
+)
+def test_enabled_tools(flags, tools):
+    assert sizing.enabled_tools(**flags) == tools
+
+
+def test_read_samplesheet(samplesheet):
+    assert sizing.read_samplesheet(samplesheet) == {
+        "a": ["a_1.fastq.gz", "a_2.fastq.gz"],
+        "b": ["b_1.fastq.gz", "b_2.fastq.gz", "b_3.fastq.gz"],
+    }
+
+
+def test_sample_sizes_gib(samplesheet):
+    sizes = {"a_1.fastq.gz": 2 * GIB, "a_2.fastq.gz": 2 * GIB, "b_1.fastq.gz": GIB, "b_2.fastq.gz": None}
+
+    def size(path):
+        if path not in sizes:
+            raise FileNotFoundError(path)
+        return sizes[path]
+
+    assert sizing.sample_sizes_gib(sizing.read_samplesheet(samplesheet), size) == [
+        4.0,
+        1 + 2 * sizing.DEFAULT_FASTQ_GIB,
+    ]
+
+
+def test_estimate_storage_gib():
+    arriba = sizing.enabled_tools(arriba=True)
+    callers = sizing.enabled_tools(all=True)
+
+    assert sizing.estimate_storage_gib([], []) == sizing.MIN_STORAGE_GIB
+    # references: ensembl 4 + STAR 32 + CTAT 34 + fusion-report 1, scratch: 10 * (1 + 3 + 1.5)
+    assert sizing.estimate_storage_gib([10], arriba) == 160
+    assert sizing.estimate_storage_gib([10], arriba, build_references=True) == 250
+    assert sizing.estimate_storage_gib([10], callers) > sizing.estimate_storage_gib([10], arriba)
+    assert sizing.estimate_storage_gib([5] * 10, callers) > sizing.estimate_storage_gib([5], callers)
+    assert sizing.estimate_storage_gib([10**6], callers) == sizing.MAX_STORAGE_GIB
+
+
+def test_provision_storage(dispatcher):
+    pytest.importorskip("requests")
+    url, received = dispatcher
+    assert sizing.provision_storage("token", 160, url) == "pvc-160"
+    assert received == [("/provision-storage", "Latch-Execution-Token token", {"storage_gib": 160})]
@@ -0,0 +1,99 @@
+"""
+Parsing of recorded Nextflow trace files and label right-sizing of wf/trace_report.py.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from wf import trace_report
+
+DATA = Path(__file__).parent / "data"
+ROOT = Path(__file__).resolve().parents[2]
+GB = 2**30
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [("72 GB", 72 * GB), ("512 MB", 512 * 2**20), ("1.5 KB", 1536), ("1024", 1024), ("-", None), ("", None)],
+)
+def test_parse_memory(text, expected):
+    assert trace_report.parse_memory(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [("1h 5m 2s", 3902), ("45.2s", 45.2), ("345ms", 0.345), ("1d 8h", 115200), ("57600000", 57600), ("-", None)],
+)
+def test_parse_duration(text, expected):
+    assert trace_report.parse_duration(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", ["lots", "3 parsecs", "1h 2x"])
+def test_parse_invalid(text):
+    with pytest.raises(ValueError):
+        trace_report.parse_duration(text)
+
+
+def test_read_trace():
+    human = trace_report.read_trace(DATA / "execution_trace.txt")
+    raw = trace_report.read_trace(DATA / "execution_trace_raw.txt")
+    assert [task.process for task in human][:2] == ["STAR_FOR_ARRIBA", "ARRIBA"]
+    assert human[0].memory == raw[0].memory == 72 * GB
+    assert human[0].time == raw[0].time == 16 * 3600
+    assert human[0].realtime == 58 * 60 + 10
+    assert raw[0].realtime == 3600
+    assert raw[0].cpu_percent == 1011.0
+
+
+def test_process_labels():
+    labels = trace_report.process_labels(ROOT)
+    assert labels["VCF_COLLECT"] == "process_single"
+    assert labels["STAR_ALIGN"] == labels["STAR_FOR_ARRIBA"] == "process_high"
+
+
+def test_summarize():
+    tasks = trace_report.read_trace(DATA / "execution_trace.txt")
+    summary = {row["process"]: row for row in trace_report.summarize(tasks)}
+    inspector = summary["FUSIONINSPECTOR"]
+    assert (inspector["tasks"], inspector["failed"]) == (2, 1)
+    # requests of first attempts only, usage of finished tasks only
+    assert (inspector["requested_cpus"], inspector["requested_memory"]) == (12, 72 * GB)
+    assert inspector["max_peak_rss"] == round(80.4 * GB)
+    assert summary["FASTQC"]["read_bytes"] == round(2.5 * GB)
+
+
+def test_recommend():
+    tasks = [
+        task for name in ("execution_trace.txt", "execution_trace_raw.txt") for task in trace_report.read_trace(DATA / name)
+    ]
+    recommendations = {rec.label: rec for rec in trace_report.recommend(tasks, trace_report.process_labels(ROOT))}
+
+    high = recommendations["process_high"]
+    assert high.processes == ["FUSIONINSPECTOR", "STAR_FOR_ARRIBA"]
+    assert high.tasks == 3
+    assert (high.requested_cpus, high.requested_memory, high.requested_time) == (12, 72 * GB, 16 * 3600)
+    assert high.used_memory == round(80.4 * GB)
+    assert high.memory == 97 * GB
+    assert high.cpus == 10
+    assert high.time == 4 * 3600
+
+    single = recommendations["process_single"]
+    assert (single.tasks, single.cpus, single.memory, single.time) == (2, 1, GB, 3600)
+
+
+def test_write_report(tmp_path):
+    traces = [DATA / "execution_trace_raw.txt", DATA / "execution_trace.txt"]
+    recommendations = trace_report.write_report(tmp_path / "report.json", traces, ROOT)
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["schema"] == "rnafusion.resource_report"
+    assert [row["process"] for row in report["processes"]] == [
+        "ARRIBA",
+        "FASTQC",
+        "FUSIONINSPECTOR",
+        "STAR_FOR_ARRIBA",
+        "VCF_COLLECT",
+    ]
+    assert [label["label"] for label in report["labels"]] == [rec.label for rec in recommendations]
+    assert "process_high (3 tasks" in trace_report.format_recommendations(recommendations)
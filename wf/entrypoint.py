@@ -1,7 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
+import hashlib
 import os
 import subprocess
+import tempfile
+import time
 import requests
 import shutil
 from pathlib import Path
@@ -21,43 +25,149 @@ from flytekit.core.annotation import FlyteAnnotation
 
 from latch_cli.services.register.utils import import_module_by_path
 
+from wf.log_upload import LogUploader
+from wf.sizing import (
+    DISPATCHER_URL,
+    enabled_tools,
+    estimate_storage_gib,
+    provision_storage,
+    read_samplesheet,
+    sample_sizes_gib,
+)
+from wf.trace_report import format_recommendations, write_report
+
 meta = Path("latch_metadata") / "__init__.py"
 import_module_by_path(meta)
 import latch_metadata
 
+def fastq_size(path: str) -> typing.Optional[int]:
+    if path.startswith("latch://"):
+        return LPath(path).size()
+    if "://" in path:
+        return None
+    return os.path.getsize(path)
+
+
 @custom_task(cpu=0.25, memory=0.5, storage_gib=1)
-def initialize() -> str:
+def initialize(input: typing.Optional[LatchFile], build_references: typing.Optional[bool], all: typing.Optional[bool], arriba: typing.Optional[bool], fusioncatcher: typing.Optional[bool], fusioninspector_only: typing.Optional[bool], starfusion: typing.Optional[bool], stringtie: typing.Optional[bool]) -> str:
     token = os.environ.get("FLYTE_INTERNAL_EXECUTION_ID")
     if token is None:
         raise RuntimeError("failed to get execution token")
 
-    headers = {"Authorization": f"Latch-Execution-Token {token}"}
+    tools = enabled_tools(all, arriba, starfusion, fusioncatcher, stringtie, fusioninspector_only)
+    samples = read_samplesheet(input.local_path) if input is not None else {}
+    sample_gib = sample_sizes_gib(samples, fastq_size)
+    storage_gib = estimate_storage_gib(sample_gib, tools, bool(build_references))
+    print(
+        f"Estimated {storage_gib} GiB of shared storage for {len(samples)} samples "
+        f"({sum(sample_gib):.1f} GiB of FASTQ) running {', '.join(tools)}"
+    )
 
     print("Provisioning shared storage volume... ", end="")
-    resp = requests.post(
-        "http://nf-dispatcher-service.flyte.svc.cluster.local/provision-storage",
-        headers=headers,
-        json={
-            "storage_gib": 100,
-        }
-    )
-    resp.raise_for_status()
+    name = provision_storage(token, storage_gib, os.environ.get("NF_DISPATCHER_URL", DISPATCHER_URL))
     print("Done.")
 
-    return resp.json()["name"]
+    return name
 
 
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 
+def stage_file(src: Path, dst: Path) -> typing.Optional[int]:
+    """
+    Copy src to dst unless dst already holds the same file, judged by size and mtime or,
+    when only the mtime differs, by content. Returns the bytes copied, or None for a
+    dangling symlink.
+    """
+    try:
+        src_stat = src.stat()
+    except FileNotFoundError:
+        return None
+    try:
+        dst_stat = dst.stat()
+    except FileNotFoundError:
+        dst_stat = None
 
+    if dst_stat is not None and dst_stat.st_size == src_stat.st_size:
+        if dst_stat.st_mtime_ns == src_stat.st_mtime_ns:
+            return 0
+        if file_digest(src) == file_digest(dst):
+            os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+            return 0
 
-@nextflow_runtime_task(cpu=4, memory=8, storage_gib=100)
-def nextflow_runtime(pvc_name: str, skip_qc: typing.Optional[bool], skip_vis: typing.Optional[bool], input: typing.Optional[LatchFile], outdir: typing_extensions.Annotated[LatchDir, FlyteAnnotation({'output': True})], email: typing.Optional[str], multiqc_title: typing.Optional[str], build_references: typing.Optional[bool], cosmic_username: typing.Optional[str], cosmic_passwd: typing.Optional[str], genomes_base: str, starfusion_build: typing.Optional[bool], all: typing.Optional[bool], arriba: typing.Optional[bool], arriba_ref: typing.Optional[str], arriba_ref_blacklist: typing.Optional[str], arriba_ref_cytobands: typing.Optional[str], arriba_ref_known_fusions: typing.Optional[str], arriba_ref_protein_domains: typing.Optional[str], arriba_fusions: typing.Optional[str], ensembl_ref: typing.Optional[str], fusioncatcher: typing.Optional[bool], fusioncatcher_fusions: typing.Optional[str], fusioncatcher_limitSjdbInsertNsj: typing.Optional[int], fusioncatcher_ref: typing.Optional[str], fusioninspector_limitSjdbInsertNsj: typing.Optional[int], fusioninspector_only: typing.Optional[bool], fusioninspector_fusions: typing.Optional[str], fusionreport: typing.Optional[bool], fusionreport_ref: typing.Optional[str], hgnc_ref: typing.Optional[str], hgnc_date: typing.Optional[str], qiagen: typing.Optional[bool], starfusion: typing.Optional[bool], starfusion_fusions: typing.Optional[str], starfusion_ref: typing.Optional[str], starindex: typing.Optional[bool], starindex_ref: typing.Optional[str], stringtie: typing.Optional[bool], tools_cutoff: typing.Optional[int], whitelist: typing.Optional[str], fastp_trim: typing.Optional[bool], trim_tail: typing.Optional[int], adapter_fasta: typing.Optional[str], cram: typing.Optional[str], genome: typing.Optional[str], fasta: typing.Optional[LatchFile], fai: typing.Optional[LatchFile], gtf: typing.Optional[LatchFile], chrgtf: typing.Optional[LatchFile], transcript: typing.Optional[LatchFile], refflat: typing.Optional[LatchFile], rrna_intervals: typing.Optional[LatchFile], multiqc_methods_description: typing.Optional[str], ensembl_version: typing.Optional[int], read_length: typing.Optional[int]) -> None:
-    try:
-        shared_dir = Path("/nf-workdir")
+    shutil.copy2(src, dst)
+    return src_stat.st_size
 
 
+def stage_workdir(src: Path, dst: Path, ignore: typing.Collection[str], workers: int = 16) -> None:
+    """
+    Mirror src into dst like shutil.copytree(dirs_exist_ok=True), skipping entries named
+    in ignore at any depth, but copying only new or changed files, with a thread pool.
+    """
+    start = time.monotonic()
+    pairs = []
+    for dirpath, dirnames, filenames in os.walk(src, followlinks=True):
+        dirnames[:] = [name for name in dirnames if name not in ignore]
+        target = dst / Path(dirpath).relative_to(src)
+        target.mkdir(parents=True, exist_ok=True)
+        pairs.extend(
+            (Path(dirpath) / name, target / name) for name in filenames if name not in ignore
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        copied = list(pool.map(lambda pair: stage_file(*pair), pairs))
+
+    sizes = [size for size in copied if size]
+    unchanged = sum(1 for size in copied if size == 0)
+    print(
+        f"Staged {src} to {dst}: copied {len(sizes)} files ({sum(sizes) / 2**20:.1f} MiB), "
+        f"{unchanged} unchanged, in {time.monotonic() - start:.1f}s",
+        flush=True,
+    )
 
+
+
+
+
+
+def upload_resource_report(trace_file: Path, root: Path, name: str) -> None:
+    """
+    Upload the trace of this run with a per-process resource report, recommending cpus,
+    memory and time per process label from the traces of all runs uploaded so far.
+    """
+    log_dir = urljoins("latch:///your_log_dir/nf_nf_core_rnafusion", name)
+    history = LPath(urljoins("latch:///your_log_dir/nf_nf_core_rnafusion", "traces"))
+    LPath(urljoins(history.path, f"{name}.txt")).upload_from(trace_file)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        traces = [
+            remote.download(Path(tmp) / remote.name())
+            for remote in history.iterdir()
+            if remote.name() != f"{name}.txt"
+        ]
+        # The per-process summary describes the last trace, this run
+        report = root / "resource_report.json"
+        recommendations = write_report(report, [*traces, trace_file], root)
+
+    print(f"Resource usage per label over {len(traces) + 1} runs:")
+    print(format_recommendations(recommendations))
+    remote = LPath(urljoins(log_dir, "resource_report.json"))
+    print(f"Uploading resource report to {remote.path}")
+    remote.upload_from(report)
+    LPath(urljoins(log_dir, "execution_trace.txt")).upload_from(trace_file)
+
+
+@nextflow_runtime_task(cpu=4, memory=8, storage_gib=100)
+def nextflow_runtime(pvc_name: str, skip_qc: typing.Optional[bool], skip_vis: typing.Optional[bool], skip_preflight: typing.Optional[bool], input: typing.Optional[LatchFile], outdir: typing_extensions.Annotated[LatchDir, FlyteAnnotation({'output': True})], email: typing.Optional[str], multiqc_title: typing.Optional[str], build_references: typing.Optional[bool], convert2bed: typing.Optional[bool], verify_reference_checksums: typing.Optional[bool], cosmic_username: typing.Optional[str], cosmic_passwd: typing.Optional[str], genomes_base: str, starfusion_build: typing.Optional[bool], all: typing.Optional[bool], arriba: typing.Optional[bool], arriba_ref: typing.Optional[str], arriba_ref_blacklist: typing.Optional[str], arriba_ref_cytobands: typing.Optional[str], arriba_ref_known_fusions: typing.Optional[str], arriba_ref_protein_domains: typing.Optional[str], arriba_fusions: typing.Optional[str], ensembl_ref: typing.Optional[str], fusioncatcher: typing.Optional[bool], fusioncatcher_fusions: typing.Optional[str], fusioncatcher_limitSjdbInsertNsj: typing.Optional[int], fusioncatcher_ref: typing.Optional[str], fusioninspector_limitSjdbInsertNsj: typing.Optional[int], fusioninspector_only: typing.Optional[bool], fusioninspector_fusions: typing.Optional[str], fusionreport: typing.Optional[bool], fusionreport_ref: typing.Optional[str], hgnc_ref: typing.Optional[str], hgnc_date: typing.Optional[str], hgnc_index: typing.Optional[str], qiagen: typing.Optional[bool], starfusion: typing.Optional[bool], starfusion_fusions: typing.Optional[str], starfusion_ref: typing.Optional[str], starindex: typing.Optional[bool], starindex_ref: typing.Optional[str], stringtie: typing.Optional[bool], tools_cutoff: typing.Optional[int], whitelist: typing.Optional[str], vcf_collect_batch_size: typing.Optional[int], vcf_collect_cache: typing.Optional[str], fastp_trim: typing.Optional[bool], trim_tail: typing.Optional[int], adapter_fasta: typing.Optional[str], cram: typing.Optional[str], genome: typing.Optional[str], fasta: typing.Optional[LatchFile], fai: typing.Optional[LatchFile], gtf: typing.Optional[LatchFile], chrgtf: typing.Optional[LatchFile], transcript: typing.Optional[LatchFile], refflat: typing.Optional[LatchFile], rrna_intervals: typing.Optional[LatchFile], multiqc_methods_description: typing.Optional[str], ensembl_version: typing.Optional[int], read_length: typing.Optional[int]) -> None:
+    log_uploader = None
+    try:
+        shared_dir = Path("/nf-workdir")
+        trace_file = shared_dir / "execution_trace.txt"
         ignore_list = [
             "latch",
             ".latch",
@@ -70,13 +180,7 @@ def nextflow_runtime(pvc_name: str, skip_qc: typing.Optional[bool], skip_vis: ty
             "mambaforge",
         ]
 
-        shutil.copytree(
-            Path("/root"),
-            shared_dir,
-            ignore=lambda src, names: ignore_list,
-            ignore_dangling_symlinks=True,
-            dirs_exist_ok=True,
-        )
+        stage_workdir(Path("/root"), shared_dir, ignore_list)
 
         cmd = [
             "/root/nextflow",
@@ -88,13 +192,18 @@ def nextflow_runtime(pvc_name: str, skip_qc: typing.Optional[bool], skip_vis: ty
             "docker",
             "-c",
             "latch.config",
+            "-with-trace",
+            str(trace_file),
                 *get_flag('skip_qc', skip_qc),
                 *get_flag('skip_vis', skip_vis),
+                *get_flag('skip_preflight', skip_preflight),
                 *get_flag('input', input),
                 *get_flag('outdir', outdir),
                 *get_flag('email', email),
                 *get_flag('multiqc_title', multiqc_title),
                 *get_flag('build_references', build_references),
+                *get_flag('convert2bed', convert2bed),
+                *get_flag('verify_reference_checksums', verify_reference_checksums),
                 *get_flag('cosmic_username', cosmic_username),
                 *get_flag('cosmic_passwd', cosmic_passwd),
                 *get_flag('genomes_base', genomes_base),
@@ -121,6 +230,7 @@ def nextflow_runtime(pvc_name: str, skip_qc: typing.Optional[bool], skip_vis: ty
                 *get_flag('fusionreport_ref', fusionreport_ref),
                 *get_flag('hgnc_ref', hgnc_ref),
                 *get_flag('hgnc_date', hgnc_date),
+                *get_flag('hgnc_index', hgnc_index),
                 *get_flag('qiagen', qiagen),
                 *get_flag('starfusion', starfusion),
                 *get_flag('starfusion_fusions', starfusion_fusions),
@@ -130,6 +240,8 @@ def nextflow_runtime(pvc_name: str, skip_qc: typing.Optional[bool], skip_vis: ty
                 *get_flag('stringtie', stringtie),
                 *get_flag('tools_cutoff', tools_cutoff),
                 *get_flag('whitelist', whitelist),
+                *get_flag('vcf_collect_batch_size', vcf_collect_batch_size),
+                *get_flag('vcf_collect_cache', vcf_collect_cache),
                 *get_flag('fastp_trim', fastp_trim),
                 *get_flag('trim_tail', trim_tail),
                 *get_flag('adapter_fasta', adapter_fasta),
@@ -156,6 +268,19 @@ def nextflow_runtime(pvc_name: str, skip_qc: typing.Optional[bool], skip_vis: ty
             "K8S_STORAGE_CLAIM_NAME": pvc_name,
             "NXF_DISABLE_CHECK_LATEST": "true",
         }
+
+        name = _get_execution_name()
+        if name is None:
+            print("Skipping logs upload, failed to get execution name")
+        else:
+            log_dir = urljoins("latch:///your_log_dir/nf_nf_core_rnafusion", name)
+            log_uploader = LogUploader(
+                shared_dir / ".nextflow.log",
+                lambda src, path: LPath(urljoins(log_dir, path)).upload_from(src),
+            )
+            print(f"Uploading new .nextflow.log lines to {log_dir}/nextflow.log.parts every {log_uploader.interval}s")
+            log_uploader.start()
+
         subprocess.run(
             cmd,
             env=env,
@@ -165,26 +290,28 @@ def nextflow_runtime(pvc_name: str, skip_qc: typing.Optional[bool], skip_vis: ty
     finally:
         print()
 
-        nextflow_log = shared_dir / ".nextflow.log"
-        if nextflow_log.exists():
-            name = _get_execution_name()
-            if name is None:
-                print("Skipping logs upload, failed to get execution name")
-            else:
-                remote = LPath(urljoins("latch:///your_log_dir/nf_nf_core_rnafusion", name, "nextflow.log"))
-                print(f"Uploading .nextflow.log to {remote.path}")
-                remote.upload_from(nextflow_log)
+        if log_uploader is not None:
+            print(f"Uploading .nextflow.log to {log_dir}/nextflow.log")
+            try:
+                log_uploader.close()
+            except Exception as e:
+                print(f"Failed to upload .nextflow.log: {e}")
 
+            if trace_file.exists():
+                try:
+                    upload_resource_report(trace_file, shared_dir, name)
+                except Exception as e:
+                    print(f"Skipping resource report: {e}")
 
 
 @workflow(metadata._nextflow_metadata)
-def nf_nf_core_rnafusion(skip_qc: typing.Optional[bool], skip_vis: typing.Optional[bool], input: typing.Optional[LatchFile], outdir: typing_extensions.Annotated[LatchDir, FlyteAnnotation({'output': True})], email: typing.Optional[str], multiqc_title: typing.Optional[str], build_references: typing.Optional[bool], cosmic_username: typing.Optional[str], cosmic_passwd: typing.Optional[str], genomes_base: str, starfusion_build: typing.Optional[bool], all: typing.Optional[bool], arriba: typing.Optional[bool], arriba_ref: typing.Optional[str], arriba_ref_blacklist: typing.Optional[str], arriba_ref_cytobands: typing.Optional[str], arriba_ref_known_fusions: typing.Optional[str], arriba_ref_protein_domains: typing.Optional[str], arriba_fusions: typing.Optional[str], ensembl_ref: typing.Optional[str], fusioncatcher: typing.Optional[bool], fusioncatcher_fusions: typing.Optional[str], fusioncatcher_limitSjdbInsertNsj: typing.Optional[int], fusioncatcher_ref: typing.Optional[str], fusioninspector_limitSjdbInsertNsj: typing.Optional[int], fusioninspector_only: typing.Optional[bool], fusioninspector_fusions: typing.Optional[str], fusionreport: typing.Optional[bool], fusionreport_ref: typing.Optional[str], hgnc_ref: typing.Optional[str], hgnc_date: typing.Optional[str], qiagen: typing.Optional[bool], starfusion: typing.Optional[bool], starfusion_fusions: typing.Optional[str], starfusion_ref: typing.Optional[str], starindex: typing.Optional[bool], starindex_ref: typing.Optional[str], stringtie: typing.Optional[bool], tools_cutoff: typing.Optional[int], whitelist: typing.Optional[str], fastp_trim: typing.Optional[bool], trim_tail: typing.Optional[int], adapter_fasta: typing.Optional[str], cram: typing.Optional[str], genome: typing.Optional[str], fasta: typing.Optional[LatchFile], fai: typing.Optional[LatchFile], gtf: typing.Optional[LatchFile], chrgtf: typing.Optional[LatchFile], transcript: typing.Optional[LatchFile], refflat: typing.Optional[LatchFile], rrna_intervals: typing.Optional[LatchFile], multiqc_methods_description: typing.Optional[str], ensembl_version: typing.Optional[int] = 102, read_length: typing.Optional[int] = 100) -> None:
+def nf_nf_core_rnafusion(skip_qc: typing.Optional[bool], skip_vis: typing.Optional[bool], skip_preflight: typing.Optional[bool], input: typing.Optional[LatchFile], outdir: typing_extensions.Annotated[LatchDir, FlyteAnnotation({'output': True})], email: typing.Optional[str], multiqc_title: typing.Optional[str], build_references: typing.Optional[bool], convert2bed: typing.Optional[bool], verify_reference_checksums: typing.Optional[bool], cosmic_username: typing.Optional[str], cosmic_passwd: typing.Optional[str], genomes_base: str, starfusion_build: typing.Optional[bool], all: typing.Optional[bool], arriba: typing.Optional[bool], arriba_ref: typing.Optional[str], arriba_ref_blacklist: typing.Optional[str], arriba_ref_cytobands: typing.Optional[str], arriba_ref_known_fusions: typing.Optional[str], arriba_ref_protein_domains: typing.Optional[str], arriba_fusions: typing.Optional[str], ensembl_ref: typing.Optional[str], fusioncatcher: typing.Optional[bool], fusioncatcher_fusions: typing.Optional[str], fusioncatcher_limitSjdbInsertNsj: typing.Optional[int], fusioncatcher_ref: typing.Optional[str], fusioninspector_limitSjdbInsertNsj: typing.Optional[int], fusioninspector_only: typing.Optional[bool], fusioninspector_fusions: typing.Optional[str], fusionreport: typing.Optional[bool], fusionreport_ref: typing.Optional[str], hgnc_ref: typing.Optional[str], hgnc_date: typing.Optional[str], hgnc_index: typing.Optional[str], qiagen: typing.Optional[bool], starfusion: typing.Optional[bool], starfusion_fusions: typing.Optional[str], starfusion_ref: typing.Optional[str], starindex: typing.Optional[bool], starindex_ref: typing.Optional[str], stringtie: typing.Optional[bool], tools_cutoff: typing.Optional[int], whitelist: typing.Optional[str], vcf_collect_batch_size: typing.Optional[int], vcf_collect_cache: typing.Optional[str], fastp_trim: typing.Optional[bool], trim_tail: typing.Optional[int], adapter_fasta: typing.Optional[str], cram: typing.Optional[str], genome: typing.Optional[str], fasta: typing.Optional[LatchFile], fai: typing.Optional[LatchFile], gtf: typing.Optional[LatchFile], chrgtf: typing.Optional[LatchFile], transcript: typing.Optional[LatchFile], refflat: typing.Optional[LatchFile], rrna_intervals: typing.Optional[LatchFile], multiqc_methods_description: typing.Optional[str], ensembl_version: typing.Optional[int] = 102, read_length: typing.Optional[int] = 100) -> None:
     """
     nf-core/rnafusion
 
     Sample Description
     """
 
-    pvc_name: str = initialize()
-    nextflow_runtime(pvc_name=pvc_name, skip_qc=skip_qc, skip_vis=skip_vis, input=input, outdir=outdir, email=email, multiqc_title=multiqc_title, build_references=build_references, cosmic_username=cosmic_username, cosmic_passwd=cosmic_passwd, genomes_base=genomes_base, ensembl_version=ensembl_version, starfusion_build=starfusion_build, read_length=read_length, all=all, arriba=arriba, arriba_ref=arriba_ref, arriba_ref_blacklist=arriba_ref_blacklist, arriba_ref_cytobands=arriba_ref_cytobands, arriba_ref_known_fusions=arriba_ref_known_fusions, arriba_ref_protein_domains=arriba_ref_protein_domains, arriba_fusions=arriba_fusions, ensembl_ref=ensembl_ref, fusioncatcher=fusioncatcher, fusioncatcher_fusions=fusioncatcher_fusions, fusioncatcher_limitSjdbInsertNsj=fusioncatcher_limitSjdbInsertNsj, fusioncatcher_ref=fusioncatcher_ref, fusioninspector_limitSjdbInsertNsj=fusioninspector_limitSjdbInsertNsj, fusioninspector_only=fusioninspector_only, fusioninspector_fusions=fusioninspector_fusions, fusionreport=fusionreport, fusionreport_ref=fusionreport_ref, hgnc_ref=hgnc_ref, hgnc_date=hgnc_date, qiagen=qiagen, starfusion=starfusion, starfusion_fusions=starfusion_fusions, starfusion_ref=starfusion_ref, starindex=starindex, starindex_ref=starindex_ref, stringtie=stringtie, tools_cutoff=tools_cutoff, whitelist=whitelist, fastp_trim=fastp_trim, trim_tail=trim_tail, adapter_fasta=adapter_fasta, cram=cram, genome=genome, fasta=fasta, fai=fai, gtf=gtf, chrgtf=chrgtf, transcript=transcript, refflat=refflat, rrna_intervals=rrna_intervals, multiqc_methods_description=multiqc_methods_description)
+    pvc_name: str = initialize(input=input, build_references=build_references, all=all, arriba=arriba, fusioncatcher=fusioncatcher, fusioninspector_only=fusioninspector_only, starfusion=starfusion, stringtie=stringtie)
+    nextflow_runtime(pvc_name=pvc_name, skip_qc=skip_qc, skip_vis=skip_vis, skip_preflight=skip_preflight, input=input, outdir=outdir, email=email, multiqc_title=multiqc_title, build_references=build_references, convert2bed=convert2bed, verify_reference_checksums=verify_reference_checksums, cosmic_username=cosmic_username, cosmic_passwd=cosmic_passwd, genomes_base=genomes_base, ensembl_version=ensembl_version, starfusion_build=starfusion_build, read_length=read_length, all=all, arriba=arriba, arriba_ref=arriba_ref, arriba_ref_blacklist=arriba_ref_blacklist, arriba_ref_cytobands=arriba_ref_cytobands, arriba_ref_known_fusions=arriba_ref_known_fusions, arriba_ref_protein_domains=arriba_ref_protein_domains, arriba_fusions=arriba_fusions, ensembl_ref=ensembl_ref, fusioncatcher=fusioncatcher, fusioncatcher_fusions=fusioncatcher_fusions, fusioncatcher_limitSjdbInsertNsj=fusioncatcher_limitSjdbInsertNsj, fusioncatcher_ref=fusioncatcher_ref, fusioninspector_limitSjdbInsertNsj=fusioninspector_limitSjdbInsertNsj, fusioninspector_only=fusioninspector_only, fusioninspector_fusions=fusioninspector_fusions, fusionreport=fusionreport, fusionreport_ref=fusionreport_ref, hgnc_ref=hgnc_ref, hgnc_date=hgnc_date, hgnc_index=hgnc_index, qiagen=qiagen, starfusion=starfusion, starfusion_fusions=starfusion_fusions, starfusion_ref=starfusion_ref, starindex=starindex, starindex_ref=starindex_ref, stringtie=stringtie, tools_cutoff=tools_cutoff, whitelist=whitelist, vcf_collect_batch_size=vcf_collect_batch_size, vcf_collect_cache=vcf_collect_cache, fastp_trim=fastp_trim, trim_tail=trim_tail, adapter_fasta=adapter_fasta, cram=cram, genome=genome, fasta=fasta, fai=fai, gtf=gtf, chrgtf=chrgtf, transcript=transcript, refflat=refflat, rrna_intervals=rrna_intervals, multiqc_methods_description=multiqc_methods_description)
 
@@ -0,0 +1,111 @@
+"""
+Upload a growing log file while the process writing it runs: a background thread tails the
+file and uploads the lines added since the last upload as numbered parts, backing off while
+uploads fail, and a final flush uploads the remaining lines and the complete log.
+"""
+
+import tempfile
+import threading
+import typing
+from pathlib import Path
+
+# upload(src, name) copies the local file src to the remote path name, relative to the log directory
+Upload = typing.Callable[[Path, str], None]
+
+
+class LogUploader:
+    """
+    Tail log_file and upload its new lines every interval seconds as
+    <name>.parts/00001.log, 00002.log, ..., so the log of a long or evicted run can be
+    followed and recovered from its parts. Failed uploads are retried with the same lines
+    after twice the interval, up to max_interval. close() uploads the rest of the log and
+    the complete file as <name>.
+
+    Use as a context manager around the process writing the log.
+    """
+
+    def __init__(
+        self,
+        log_file: Path,
+        upload: Upload,
+        interval: float = 60,
+        max_interval: float = 900,
+        name: typing.Optional[str] = None,
+    ):
+        self.log_file = Path(log_file)
+        self.upload = upload
+        self.interval = interval
+        self.max_interval = max_interval
+        self.name = name or self.log_file.name.lstrip(".")
+        self.offset = 0
+        self.parts = 0
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"upload {self.name}", daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the uploads in the background and upload what is left."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.sync(final=True)
+        if self.log_file.exists():
+            self.upload(self.log_file, self.name)
+
+    def _run(self) -> None:
+        delay = self.interval
+        while not self._stop.wait(delay):
+            if self.sync():
+                delay = self.interval
+            else:
+                delay = min(delay * 2, self.max_interval)
+
+    def sync(self, final: bool = False) -> bool:
+        """
+        Upload the complete lines added since the last upload as the next part, or every
+        remaining byte when final. Returns False when the upload failed.
+        """
+        try:
+            with open(self.log_file, "rb") as f:
+                f.seek(self.offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return True
+        if not final:
+            chunk = chunk[: chunk.rfind(b"\n") + 1]
+        if not chunk:
+            return True
+
+        with tempfile.NamedTemporaryFile(suffix=".log") as part:
+            part.write(chunk)
+            part.flush()
+            try:
+                self.upload(Path(part.name), f"{self.name}.parts/{self.parts + 1:05d}.log")
+            except Exception as e:
+                self.failures += 1
+                print(f"Failed to upload {self.log_file} ({self.failures} failures so far): {e}", flush=True)
+                return False
+        self.offset += len(chunk)
+        self.parts += 1
+        return True
+
+
+def directory_upload(directory: Path) -> Upload:
+    """Upload into a local directory standing in for the remote log directory."""
+
+    def upload(src: Path, name: str) -> None:
+        dst = Path(directory) / name
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        dst.write_bytes(Path(src).read_bytes())
+
+    return upload
@@ -0,0 +1,132 @@
+"""
+Estimate the shared storage volume of an nf-core/rnafusion run on Latch from the samplesheet,
+the FASTQ sizes and the enabled fusion callers.
+
+The model is deliberately coarse: every tool needs its references staged into the shared
+work directory once, plus scratch space proportional to the gzipped FASTQ input of each
+sample (alignments, decompressed reads, intermediate BAMs).
+"""
+
+import csv
+import math
+import typing
+from dataclasses import dataclass
+
+DISPATCHER_URL = "http://nf-dispatcher-service.flyte.svc.cluster.local"
+
+# GiB of references staged into the work directory, shared between the callers using them
+REFERENCE_GIB = {
+    "ensembl": 4,
+    "star_index": 32,
+    "ctat_genome_lib": 34,
+    "fusioncatcher": 26,
+    "fusionreport": 1,
+}
+
+# GiB of FASTQ assumed for inputs whose size cannot be read
+DEFAULT_FASTQ_GIB = 5.0
+
+MIN_STORAGE_GIB = 50
+MAX_STORAGE_GIB = 4900
+STORAGE_HEADROOM = 1.25
+
+
+@dataclass(frozen=True)
+class Footprint:
+    references: typing.Tuple[str, ...]
+    # scratch GiB per GiB of gzipped FASTQ of a sample
+    scratch_ratio: float
+
+
+FOOTPRINTS = {
+    "arriba": Footprint(("ensembl", "star_index"), 3.0),
+    "starfusion": Footprint(("ensembl", "ctat_genome_lib"), 3.0),
+    "fusioncatcher": Footprint(("fusioncatcher",), 6.0),
+    "stringtie": Footprint(("ensembl", "star_index"), 0.5),
+    "fusioninspector": Footprint(("ctat_genome_lib",), 1.5),
+    "fusionreport": Footprint(("fusionreport",), 0.0),
+}
+
+CALLERS = ["arriba", "starfusion", "fusioncatcher", "stringtie"]
+
+
+def enabled_tools(
+    all: typing.Optional[bool] = None,
+    arriba: typing.Optional[bool] = None,
+    starfusion: typing.Optional[bool] = None,
+    fusioncatcher: typing.Optional[bool] = None,
+    stringtie: typing.Optional[bool] = None,
+    fusioninspector_only: typing.Optional[bool] = None,
+) -> typing.List[str]:
+    """
+    Tools a run executes given its parameters. FusionInspector follows every run, and
+    fusion-report collects the callers unless only FusionInspector runs.
+    """
+    if fusioninspector_only:
+        return ["fusioninspector"]
+    flags = {"arriba": arriba, "starfusion": starfusion, "fusioncatcher": fusioncatcher, "stringtie": stringtie}
+    tools = [tool for tool in CALLERS if all or flags[tool]]
+    return tools + ["fusionreport", "fusioninspector"]
+
+
+def read_samplesheet(path) -> typing.Dict[str, typing.List[str]]:
+    """FASTQ paths of every sample of a samplesheet, by sample name."""
+    samples = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            fastqs = [row.get(column) for column in ("fastq_1", "fastq_2")]
+            samples.setdefault(row["sample"], []).extend(fastq for fastq in fastqs if fastq)
+    return samples
+
+
+def sample_sizes_gib(
+    samples: typing.Dict[str, typing.List[str]], size: typing.Callable[[str], typing.Optional[int]]
+) -> typing.List[float]:
+    """
+    Gzipped FASTQ GiB of every sample, reading file sizes with size(path), which returns
+    None for files it cannot size; those count as DEFAULT_FASTQ_GIB.
+    """
+    sizes = []
+    for fastqs in samples.values():
+        total = 0.0
+        for fastq in fastqs:
+            try:
+                n_bytes = size(fastq)
+            except OSError:
+                n_bytes = None
+            total += DEFAULT_FASTQ_GIB if n_bytes is None else n_bytes / 2**30
+        sizes.append(total)
+    return sizes
+
+
+def estimate_storage_gib(
+    sample_gib: typing.Sequence[float], tools: typing.Sequence[str], build_references: bool = False
+) -> int:
+    """
+    GiB of shared storage for the references and the scratch space of the tools over all
+    samples, rounded up to 10 GiB. Building references needs about twice their size while
+    the indexes are generated.
+    """
+    footprints = [FOOTPRINTS[tool] for tool in tools]
+    references = {reference for footprint in footprints for reference in footprint.references}
+    reference_gib = sum(REFERENCE_GIB[reference] for reference in references)
+    if build_references:
+        reference_gib *= 2
+    # Inputs are staged once, each tool adds its own scratch space on top
+    scratch_gib = sum(sample_gib) * (1 + sum(footprint.scratch_ratio for footprint in footprints))
+
+    storage_gib = math.ceil((reference_gib + scratch_gib) * STORAGE_HEADROOM / 10) * 10
+    return min(max(storage_gib, MIN_STORAGE_GIB), MAX_STORAGE_GIB)
+
+
+def provision_storage(token: str, storage_gib: int, url: str = DISPATCHER_URL) -> str:
+    """Ask the Nextflow dispatcher for a shared volume of storage_gib and return its name."""
+    import requests
+
+    resp = requests.post(
+        f"{url}/provision-storage",
+        headers={"Authorization": f"Latch-Execution-Token {token}"},
+        json={"storage_gib": storage_gib},
+    )
+    resp.raise_for_status()
+    return resp.json()["name"]
@@ -0,0 +1,267 @@
+"""
+Summarize Nextflow trace files into per-process resource usage, and recommend right-sized
+cpus, memory and time for every process label from the tasks of one or more runs.
+
+Reads traces written with the default human readable units ("1.2 GB", "3m 4s", "98.5%") as
+well as raw ones (trace.raw = true: bytes and milliseconds). Tasks are matched to the
+labels of their modules by scanning the pipeline sources for process definitions and
+`include { X as Y }` aliases.
+"""
+
+import csv
+import json
+import math
+import re
+import statistics
+import typing
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+# Statuses whose measurements describe a finished task
+MEASURED = {"COMPLETED", "CACHED"}
+
+# Headroom of the recommendations over the largest usage seen
+MEMORY_HEADROOM = 1.2
+TIME_HEADROOM = 1.5
+
+MEMORY_UNITS = {"B": 1, "KB": 2**10, "MB": 2**20, "GB": 2**30, "TB": 2**40, "PB": 2**50}
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+@dataclass
+class Task:
+    process: str
+    status: str
+    attempt: int
+    cpus: typing.Optional[int]
+    memory: typing.Optional[int]
+    time: typing.Optional[float]
+    realtime: typing.Optional[float]
+    cpu_percent: typing.Optional[float]
+    peak_rss: typing.Optional[int]
+    rchar: typing.Optional[int]
+    wchar: typing.Optional[int]
+
+
+@dataclass
+class Recommendation:
+    label: str
+    processes: typing.List[str]
+    tasks: int
+    requested_cpus: typing.Optional[int]
+    requested_memory: typing.Optional[int]
+    requested_time: typing.Optional[float]
+    used_cpus: typing.Optional[float]
+    used_memory: typing.Optional[int]
+    used_time: typing.Optional[float]
+    cpus: typing.Optional[int]
+    memory: typing.Optional[int]
+    time: typing.Optional[float]
+
+
+def parse_memory(text: str) -> typing.Optional[int]:
+    """Bytes of a trace memory value, "1.2 GB" or a raw byte count; None for "-"."""
+    text = (text or "").strip()
+    if text in ("", "-"):
+        return None
+    match = re.fullmatch(r"([\d.]+)\s*([KMGTP]?B)?", text, re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Not a memory value: {text!r}")
+    return round(float(match.group(1)) * MEMORY_UNITS[(match.group(2) or "B").upper()])
+
+
+def parse_duration(text: str) -> typing.Optional[float]:
+    """Seconds of a trace duration, "1h 2m 3s", "345ms" or raw milliseconds; None for "-"."""
+    text = (text or "").strip()
+    if text in ("", "-"):
+        return None
+    if re.fullmatch(r"[\d.]+", text):
+        return float(text) / 1000
+    parts = re.findall(r"([\d.]+)\s*(ms|d|h|m|s)", text)
+    if not parts or "".join(f"{value}{unit}" for value, unit in parts) != re.sub(r"\s", "", text):
+        raise ValueError(f"Not a duration: {text!r}")
+    return sum(float(value) * DURATION_UNITS[unit] for value, unit in parts)
+
+
+def parse_percent(text: str) -> typing.Optional[float]:
+    text = (text or "").strip().rstrip("%")
+    return None if text in ("", "-") else float(text)
+
+
+def parse_int(text: str) -> typing.Optional[int]:
+    text = (text or "").strip()
+    return None if text in ("", "-") else int(text)
+
+
+def process_name(row: typing.Dict[str, str]) -> str:
+    """Simple process name of a trace row, without its workflow path and tag."""
+    name = row.get("process") or re.sub(r"\s*\(.*\)$", "", row["name"])
+    return name.rsplit(":", 1)[-1]
+
+
+def read_trace(path) -> typing.List[Task]:
+    """Tasks of a Nextflow trace file."""
+    tasks = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f, delimiter="\t"):
+            tasks.append(
+                Task(
+                    process=process_name(row),
+                    status=row.get("status", ""),
+                    attempt=parse_int(row.get("attempt")) or 1,
+                    cpus=parse_int(row.get("cpus")),
+                    memory=parse_memory(row.get("memory")),
+                    time=parse_duration(row.get("time")),
+                    realtime=parse_duration(row.get("realtime")),
+                    cpu_percent=parse_percent(row.get("%cpu")),
+                    peak_rss=parse_memory(row.get("peak_rss")),
+                    rchar=parse_memory(row.get("rchar")),
+                    wchar=parse_memory(row.get("wchar")),
+                )
+            )
+    return tasks
+
+
+def process_labels(root) -> typing.Dict[str, str]:
+    """
+    Resource label (process_low, process_high, ...) of every process and include alias
+    of the pipeline sources under root.
+    """
+    root = Path(root)
+    labels = {}
+    for module in root.glob("modules/**/main.nf"):
+        text = module.read_text()
+        process = re.search(r"^\s*process\s+(\w+)\s*\{", text, re.MULTILINE)
+        label = re.search(r"^\s*label\s+['\"](process_\w+)['\"]", text, re.MULTILINE)
+        if process and label:
+            labels[process.group(1)] = label.group(1)
+
+    for source in [*root.glob("workflows/**/*.nf"), *root.glob("subworkflows/**/*.nf")]:
+        for include in re.finditer(r"include\s*\{([^}]*)\}", source.read_text()):
+            for name, alias in re.findall(r"(\w+)\s+as\s+(\w+)", include.group(1)):
+                if name in labels:
+                    labels.setdefault(alias, labels[name])
+    return labels
+
+
+def summarize(tasks: typing.Sequence[Task]) -> typing.List[dict]:
+    """Per-process task counts, largest usage and total I/O, with the resources requested."""
+    by_process = defaultdict(list)
+    for task in tasks:
+        by_process[task.process].append(task)
+
+    summary = []
+    for process, runs in sorted(by_process.items()):
+        measured = [task for task in runs if task.status in MEASURED]
+        summary.append(
+            {
+                "process": process,
+                "tasks": len(runs),
+                "failed": sum(1 for task in runs if task.status == "FAILED"),
+                "requested_cpus": most_common(task.cpus for task in runs if task.attempt == 1),
+                "requested_memory": most_common(task.memory for task in runs if task.attempt == 1),
+                "requested_time": most_common(task.time for task in runs if task.attempt == 1),
+                "max_realtime": maximum(task.realtime for task in measured),
+                "max_cpu_percent": maximum(task.cpu_percent for task in measured),
+                "max_peak_rss": maximum(task.peak_rss for task in measured),
+                "read_bytes": sum(task.rchar or 0 for task in measured),
+                "write_bytes": sum(task.wchar or 0 for task in measured),
+            }
+        )
+    return summary
+
+
+def recommend(tasks: typing.Sequence[Task], labels: typing.Dict[str, str]) -> typing.List[Recommendation]:
+    """
+    Right-sized resources of every label from the finished tasks of its processes: the
+    cpus in use at the 95th percentile, and the largest peak RSS and run time with some
+    headroom.
+    """
+    by_label = defaultdict(list)
+    for task in tasks:
+        if task.status in MEASURED and task.process in labels:
+            by_label[labels[task.process]].append(task)
+
+    recommendations = []
+    for label, runs in sorted(by_label.items()):
+        cpus_used = sorted(task.cpu_percent / 100 for task in runs if task.cpu_percent is not None)
+        used_cpus = percentile(cpus_used, 95)
+        used_memory = maximum(task.peak_rss for task in runs)
+        used_time = maximum(task.realtime for task in runs)
+        recommendations.append(
+            Recommendation(
+                label=label,
+                processes=sorted({task.process for task in runs}),
+                tasks=len(runs),
+                requested_cpus=most_common(task.cpus for task in runs if task.attempt == 1),
+                requested_memory=most_common(task.memory for task in runs if task.attempt == 1),
+                requested_time=most_common(task.time for task in runs if task.attempt == 1),
+                used_cpus=used_cpus,
+                used_memory=used_memory,
+                used_time=used_time,
+                cpus=None if used_cpus is None else max(1, math.ceil(used_cpus)),
+                memory=None if used_memory is None else math.ceil(used_memory * MEMORY_HEADROOM / 2**30) * 2**30,
+                time=None if used_time is None else math.ceil(used_time * TIME_HEADROOM / 3600) * 3600,
+            )
+        )
+    return recommendations
+
+
+def most_common(values):
+    counts = Counter(value for value in values if value is not None)
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def maximum(values):
+    return max((value for value in values if value is not None), default=None)
+
+
+def percentile(values: typing.Sequence[float], q: float) -> typing.Optional[float]:
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def format_bytes(value: typing.Optional[int]) -> str:
+    return "-" if value is None else f"{value / 2**30:.1f} GB"
+
+
+def format_seconds(value: typing.Optional[float]) -> str:
+    return "-" if value is None else f"{value / 3600:.2f} h"
+
+
+def format_recommendations(recommendations: typing.Sequence[Recommendation]) -> str:
+    """One line per label comparing requested, used and recommended resources."""
+    lines = []
+    for rec in recommendations:
+        used_cpus = "-" if rec.used_cpus is None else f"{rec.used_cpus:.1f}"
+        lines.append(
+            f"{rec.label} ({rec.tasks} tasks of {', '.join(rec.processes)}): "
+            f"requested {rec.requested_cpus} cpus / {format_bytes(rec.requested_memory)} / "
+            f"{format_seconds(rec.requested_time)}, used {used_cpus} cpus / {format_bytes(rec.used_memory)} / "
+            f"{format_seconds(rec.used_time)}, recommended {rec.cpus} cpus / {format_bytes(rec.memory)} / "
+            f"{format_seconds(rec.time)}"
+        )
+    return "\n".join(lines)
+
+
+def write_report(out_file, traces: typing.Sequence, root) -> typing.List[Recommendation]:
+    """
+    Write the per-process summary of the last trace and the label recommendations over
+    all traces as JSON. Returns the recommendations.
+    """
+    runs = [read_trace(trace) for trace in traces]
+    recommendations = recommend([task for run in runs for task in run], process_labels(root))
+    report = {
+        "schema": "rnafusion.resource_report",
+        "schema_version": 1,
+        "traces": [str(trace) for trace in traces],
+        "processes": summarize(runs[-1]) if runs else [],
+        "labels": [asdict(rec) for rec in recommendations],
+    }
+    with open(out_file, "w") as f:
+        json.dump(report, f, indent=2)
+    return recommendations
@@ -9,11 +9,14 @@ include { ENSEMBL_DOWNLOAD }                from '../modules/local/ensembl/main'
 include { FUSIONCATCHER_DOWNLOAD }          from '../modules/local/fusioncatcher/download/main'
 include { FUSIONREPORT_DOWNLOAD }           from '../modules/local/fusionreport/download/main'
 include { HGNC_DOWNLOAD }                   from '../modules/local/hgnc/main'
+include { HGNC_INDEX }                      from '../modules/local/hgnc/index/main'
 include { STARFUSION_BUILD }                from '../modules/local/starfusion/build/main'
 include { STARFUSION_DOWNLOAD }             from '../modules/local/starfusion/download/main'
 include { GTF_TO_REFFLAT }                  from '../modules/local/uscs/custom_gtftogenepred/main'
 include { RRNA_TRANSCRIPTS }                from '../modules/local/rrnatranscripts/main'
 include { CONVERT2BED }                     from '../modules/local/convert2bed/main'
+include { REFERENCE_MANIFEST }              from '../modules/local/reference_manifest/main'
+include { REFERENCE_VERIFY }                from '../modules/local/reference_manifest/verify/main'
 /*
 ========================================================================================
     IMPORT NF-CORE MODULES/SUBWORKFLOWS
@@ -31,53 +34,203 @@ include { GATK4_BEDTOINTERVALLIST }         from '../modules/nf-core/gatk4/bedto
 ========================================================================================
 */
 
+//
+// Components of genomes_base that can be reused: their manifest was recorded with the same
+// provenance and all their items are present with the recorded sizes. Only sizes are compared
+// so that no reference file is read here; REFERENCE_VERIFY compares the checksums.
+//
+def validReferences(genomes_base, provenance) {
+    def valid = []
+    provenance.each { component, settings ->
+        def manifest_file = file("${genomes_base}/manifests/${component}.json")
+        if (!manifest_file.exists()) {
+            return
+        }
+        def manifest
+        try {
+            manifest = new groovy.json.JsonSlurper().parseText(manifest_file.text)
+        } catch (Exception e) {
+            log.warn "Skipping ${manifest_file}, not a reference manifest"
+            return
+        }
+        if (manifest?.schema != 'rnafusion.reference_manifest') {
+            return
+        }
+        def recorded = manifest.provenance ?: [:]
+        def same_provenance = settings.every { key, value -> recorded[key]?.toString() == value?.toString() }
+        def location = manifest.location ? "${genomes_base}/${manifest.location}" : genomes_base
+        def complete = same_provenance && manifest.items.every { name, item ->
+            def path = file("${location}/${name}")
+            if (item.type == 'dir') {
+                if (!path.isDirectory()) {
+                    return false
+                }
+                def files = []
+                path.eachFileRecurse(groovy.io.FileType.FILES) { files << it }
+                return files.sum(0L) { it.size() } == item.size && files.size() == item.files
+            }
+            return path.exists() && !path.isDirectory() && path.size() == item.size
+        }
+        if (complete) {
+            valid << component
+        } else if (same_provenance) {
+            log.info "Rebuilding the ${component} references, their files do not match ${manifest_file}"
+        }
+    }
+    return valid
+}
+
 workflow BUILD_REFERENCES {
 
     def fake_meta = [:]
     fake_meta.id = "Homo_sapiens.${params.genome}.${params.ensembl_version}"
-    ENSEMBL_DOWNLOAD( params.ensembl_version, params.genome, fake_meta )
-    HGNC_DOWNLOAD( )
-
 
-    SAMTOOLS_FAIDX(ENSEMBL_DOWNLOAD.out.fasta, [[],[]])
-    GATK4_CREATESEQUENCEDICTIONARY(ENSEMBL_DOWNLOAD.out.fasta)
+    // Settings each component is built with, it is only reused when built with the same
+    def provenance = [
+        ensembl       : [genome: params.genome, ensembl_version: params.ensembl_version],
+        hgnc          : [:],
+        star          : [genome: params.genome, ensembl_version: params.ensembl_version, read_length: params.read_length],
+        arriba        : [:],
+        fusioncatcher : [:],
+        starfusion    : [genome: params.genome, ensembl_version: params.ensembl_version, starfusion_build: params.starfusion_build],
+        fusionreport  : [qiagen: params.qiagen],
+    ]
+    // Components this run builds; the STAR-Fusion ref_annot.gtf is also reused for the refFlat
+    def enabled = [
+        ensembl       : true,
+        hgnc          : true,
+        star          : params.starindex || params.all || params.starfusion || params.arriba,
+        arriba        : params.arriba || params.all,
+        fusioncatcher : params.fusioncatcher || params.all,
+        starfusion    : params.starfusion || params.all || !params.starfusion_build,
+        fusionreport  : params.fusionreport || params.all,
+    ]
+    def valid = validReferences(params.genomes_base, provenance.findAll { component, settings -> enabled[component] })
+    if (valid) {
+        log.info "Reusing the ${valid.join(', ')} references of ${params.genomes_base}, their sizes match their manifests"
+        if (params.verify_reference_checksums) {
+            REFERENCE_VERIFY( file(params.genomes_base), valid )
+        }
+    }
+    // [ component, location under genomes_base, items ] of every component built
+    ch_built = Channel.empty()
 
-    RRNA_TRANSCRIPTS(ENSEMBL_DOWNLOAD.out.gtf)
-    CONVERT2BED(RRNA_TRANSCRIPTS.out.rrna_gtf)
+    if ('ensembl' in valid) {
+        ch_fasta  = Channel.value([fake_meta, file(params.fasta)])
+        ch_gtf    = Channel.value([fake_meta, file(params.gtf)])
+        ch_chrgtf = Channel.value([fake_meta, file(params.chrgtf)])
+    } else {
+        ENSEMBL_DOWNLOAD( params.ensembl_version, params.genome, fake_meta )
+        ch_fasta  = ENSEMBL_DOWNLOAD.out.fasta
+        ch_gtf    = ENSEMBL_DOWNLOAD.out.gtf
+        ch_chrgtf = ENSEMBL_DOWNLOAD.out.chrgtf
+
+        SAMTOOLS_FAIDX(ch_fasta, [[],[]])
+        GATK4_CREATESEQUENCEDICTIONARY(ch_fasta)
+
+        RRNA_TRANSCRIPTS(ch_gtf)
+        if (params.convert2bed) {
+            CONVERT2BED(RRNA_TRANSCRIPTS.out.rrna_gtf)
+            ch_rrna_bed = CONVERT2BED.out.bed
+        } else {
+            ch_rrna_bed = RRNA_TRANSCRIPTS.out.rrna_bed
+        }
 
-    GATK4_BEDTOINTERVALLIST(CONVERT2BED.out.bed, GATK4_CREATESEQUENCEDICTIONARY.out.dict)
+        GATK4_BEDTOINTERVALLIST(ch_rrna_bed, GATK4_CREATESEQUENCEDICTIONARY.out.dict)
+    }
 
+    if (!('hgnc' in valid)) {
+        HGNC_DOWNLOAD( )
+        HGNC_INDEX( HGNC_DOWNLOAD.out.hgnc_ref )
+        ch_built = ch_built.mix(
+            HGNC_DOWNLOAD.out.hgnc_ref.mix(HGNC_DOWNLOAD.out.hgnc_date, HGNC_INDEX.out.hgnc_index)
+                .collect()
+                .map { items -> ['hgnc', 'hgnc', items] }
+        )
+    }
 
-    if (params.starindex || params.all || params.starfusion || params.arriba) {
-        STAR_GENOMEGENERATE( ENSEMBL_DOWNLOAD.out.fasta, ENSEMBL_DOWNLOAD.out.gtf )
+    if ((params.starindex || params.all || params.starfusion || params.arriba) && !('star' in valid)) {
+        STAR_GENOMEGENERATE( ch_fasta, ch_gtf )
+        ch_built = ch_built.mix(STAR_GENOMEGENERATE.out.index.map { meta, index -> ['star', '', [index]] })
     }
 
-    if (params.arriba || params.all) {
+    if ((params.arriba || params.all) && !('arriba' in valid)) {
         ARRIBA_DOWNLOAD()
+        ch_built = ch_built.mix(
+            ARRIBA_DOWNLOAD.out.reference.flatten()
+                .filter { it.name != 'versions.yml' }
+                .collect()
+                .map { items -> ['arriba', 'arriba', items] }
+        )
     }
 
-    if (params.fusioncatcher || params.all) {
+    if ((params.fusioncatcher || params.all) && !('fusioncatcher' in valid)) {
         FUSIONCATCHER_DOWNLOAD()
+        ch_built = ch_built.mix(
+            FUSIONCATCHER_DOWNLOAD.out.reference.flatten()
+                .filter { it.name != 'versions.yml' }
+                .collect()
+                .map { items -> ['fusioncatcher', 'fusioncatcher', items] }
+        )
     }
 
-    if (params.starfusion || params.all) {
+    if ((params.starfusion || params.all) && !('starfusion' in valid)) {
         if (params.starfusion_build){
-            STARFUSION_BUILD( ENSEMBL_DOWNLOAD.out.fasta, ENSEMBL_DOWNLOAD.out.chrgtf )
+            STARFUSION_BUILD( ch_fasta, ch_chrgtf )
+            ch_built = ch_built.mix(
+                STARFUSION_BUILD.out.reference.flatten()
+                    .filter { it.name != 'versions.yml' }
+                    .collect()
+                    .map { items -> ['starfusion', 'starfusion', items] }
+            )
         } else {
             STARFUSION_DOWNLOAD()
+            ch_built = ch_built.mix(
+                STARFUSION_DOWNLOAD.out.reference.flatten()
+                    .collect()
+                    .map { items -> ['starfusion', 'starfusion/ctat_genome_lib_build_dir', items] }
+            )
         }
     }
 
-    if (params.starfusion_build){
-        GTF_TO_REFFLAT(ENSEMBL_DOWNLOAD.out.chrgtf)
-    } else {
-        GTF_TO_REFFLAT(STARFUSION_DOWNLOAD.out.chrgtf)
+    if (!('ensembl' in valid)) {
+        if (params.starfusion_build){
+            GTF_TO_REFFLAT(ch_chrgtf)
+        } else if ('starfusion' in valid) {
+            GTF_TO_REFFLAT(Channel.value([[id: 'ref_annot'], file("${params.starfusion_ref}/ref_annot.gtf")]))
+        } else {
+            GTF_TO_REFFLAT(STARFUSION_DOWNLOAD.out.chrgtf.map { gtf -> [[id: 'ref_annot'], gtf] })
+        }
+        ch_built = ch_built.mix(
+            ENSEMBL_DOWNLOAD.out.fasta
+                .mix(
+                    ENSEMBL_DOWNLOAD.out.gtf,
+                    ENSEMBL_DOWNLOAD.out.chrgtf,
+                    ENSEMBL_DOWNLOAD.out.transcript,
+                    SAMTOOLS_FAIDX.out.fai,
+                    GATK4_BEDTOINTERVALLIST.out.interval_list
+                )
+                .map { meta, item -> item }
+                .mix(GTF_TO_REFFLAT.out.refflat)
+                .collect()
+                .map { items -> ['ensembl', 'ensembl', items] }
+        )
     }
 
-    if (params.fusionreport || params.all) {
+    if ((params.fusionreport || params.all) && !('fusionreport' in valid)) {
         FUSIONREPORT_DOWNLOAD( params.cosmic_username, params.cosmic_passwd )
+        ch_built = ch_built.mix(
+            FUSIONREPORT_DOWNLOAD.out.reference.flatten()
+                .filter { it.name != 'versions.yml' }
+                .collect()
+                .map { items -> ['fusionreport', 'fusion_report_db', items] }
+        )
     }
 
+    REFERENCE_MANIFEST(
+        ch_built.map { component, location, items -> [component, location, provenance[component], items] }
+    )
+
 }
 
 /*
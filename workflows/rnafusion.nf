@@ -21,7 +21,7 @@ ch_arriba_ref_blacklist = Channel.fromPath(params.arriba_ref_blacklist).map { it
 ch_arriba_ref_known_fusions = Channel.fromPath(params.arriba_ref_known_fusions).map { it -> [[id:it.Name], it] }.collect()
 ch_arriba_ref_protein_domains = Channel.fromPath(params.arriba_ref_protein_domains).map { it -> [[id:it.Name], it] }.collect()
 ch_arriba_ref_cytobands = Channel.fromPath(params.arriba_ref_cytobands).map { it -> [[id:it.Name], it] }.collect()
-ch_hgnc_ref = Channel.fromPath(params.hgnc_ref).map { it -> [[id:it.Name], it] }.collect()
+ch_hgnc_ref = Channel.fromPath(params.hgnc_ref).map { it -> [[id:it.Name], params.hgnc_index && file(params.hgnc_index).exists() ? [it, file(params.hgnc_index)] : it] }.collect()
 ch_hgnc_date = Channel.fromPath(params.hgnc_date).map { it -> [[id:it.Name], it] }.collect()
 ch_fasta = Channel.fromPath(params.fasta).map { it -> [[id:it.Name], it] }.collect()
 ch_gtf = Channel.fromPath(params.gtf).map { it -> [[id:it.Name], it] }.collect()
@@ -49,6 +49,12 @@ include { FUSIONINSPECTOR_WORKFLOW      }   from '../subworkflows/local/fusionin
 include { FUSIONREPORT_WORKFLOW         }   from '../subworkflows/local/fusionreport_workflow'
 include { validateInputSamplesheet      }   from '../subworkflows/local/utils_nfcore_rnafusion_pipeline'
 
+//
+// MODULE: Local to the pipeline
+//
+
+include { FASTQ_PREFLIGHT               }   from '../modules/local/fastq_preflight/main'
+
 /*
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     IMPORT NF-CORE MODULES/SUBWORKFLOWS
@@ -113,17 +119,38 @@ workflow RNAFUSION {
     .set { ch_cat_fastq }
     ch_versions = ch_versions.mix(CAT_FASTQ.out.versions)
 
+    //
+    // MODULE: Estimate the reads of every sample from samples of its FastQ files, the size
+    // tier added to its meta scales the resources of the aligners and fusion callers
+    //
+    FASTQ_PREFLIGHT (
+        ch_cat_fastq
+    )
+    ch_versions = ch_versions.mix(FASTQ_PREFLIGHT.out.versions)
+
+    ch_cat_fastq
+        .join(FASTQ_PREFLIGHT.out.json, remainder: true)
+        .map {
+            meta, reads, preflight ->
+                if (!preflight) {
+                    return [ meta, reads ]
+                }
+                def estimates = new groovy.json.JsonSlurper().parseText(preflight.text)
+                return [ meta + [ tier: estimates.tier, read_count: estimates.reads, read_length: estimates.read_length ], reads ]
+        }
+        .set { ch_sized_fastq }
+
     //
     // MODULE: Run FastQC
     //
     FASTQC (
-        ch_cat_fastq
+        ch_sized_fastq
     )
     ch_multiqc_files = ch_multiqc_files.mix(FASTQC.out.zip.collect{it[1]})
     ch_versions = ch_versions.mix(FASTQC.out.versions)
 
     TRIM_WORKFLOW (
-        ch_cat_fastq
+        ch_sized_fastq
     )
     ch_reads_fusioncatcher = TRIM_WORKFLOW.out.ch_reads_fusioncatcher
     ch_reads_all = TRIM_WORKFLOW.out.ch_reads_all